@@ -6,6 +6,8 @@ from typing import Optional
 
 import click
 from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
 from werkzeug.exceptions import NotFound
 
 from configs import dify_config
@@ -22,8 +24,10 @@ from libs.rsa import generate_key_pair
 from models import Tenant
 from models.dataset import Dataset, DatasetCollectionBinding, DocumentSegment
 from models.dataset import Document as DatasetDocument
+from models.enums import WorkflowRunTriggeredFrom
 from models.model import Account, App, AppAnnotationSetting, AppMode, Conversation, MessageAnnotation
 from models.provider import Provider, ProviderModel
+from models.workflow import WorkflowGraph, WorkflowRun
 from services.account_service import RegisterService, TenantService
 
 
@@ -649,3 +653,46 @@ where sites.id is null limit 1000"""
                 break
 
     click.echo(click.style("Fix for missing app-related sites completed successfully!", fg="green"))
+
+
+@click.command("migrate-workflow-run-graphs", help="Move graphs of workflow runs into deduplicated graph snapshots.")
+@click.option("--batch-size", default=500, show_default=True, help="Number of workflow runs migrated per batch.")
+def migrate_workflow_run_graphs(batch_size: int):
+    """
+    Move the inline graphs of app workflow runs into shared graph snapshots.
+    Runs that are already migrated are skipped, so the command can be resumed.
+    """
+    click.echo(click.style("Starting migration of workflow run graphs.", fg="green"))
+
+    migrated_count = 0
+    while True:
+        with Session(db.engine) as session:
+            workflow_runs = session.execute(
+                select(WorkflowRun.id, WorkflowRun.graph)
+                .where(
+                    WorkflowRun.triggered_from == WorkflowRunTriggeredFrom.APP_RUN.value,
+                    WorkflowRun.graph.isnot(None),
+                    WorkflowRun.graph_hash.is_(None),
+                )
+                .limit(batch_size)
+            ).all()
+            if not workflow_runs:
+                break
+
+            graph_hashes: dict[str, str] = {}
+            for workflow_run_id, graph in workflow_runs:
+                if graph not in graph_hashes:
+                    graph_hashes[graph] = WorkflowGraph.save(session, graph)
+
+                session.execute(
+                    update(WorkflowRun)
+                    .where(WorkflowRun.id == workflow_run_id)
+                    .values(graph_hash=graph_hashes[graph], graph=None)
+                )
+
+            session.commit()
+
+        migrated_count += len(workflow_runs)
+        click.echo(f"Migrated {migrated_count} workflow runs.")
+
+    click.echo(click.style(f"Migration of workflow run graphs completed, {migrated_count} runs migrated.", fg="green"))
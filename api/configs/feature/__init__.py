@@ -5,6 +5,7 @@ from pydantic import (
     Field,
     HttpUrl,
     NegativeInt,
+    NonNegativeFloat,
     NonNegativeInt,
     PositiveFloat,
     PositiveInt,
@@ -61,6 +62,37 @@ class AppExecutionConfig(BaseSettings):
         description="Maximum number of concurrent active requests per app (0 for unlimited)",
         default=0,
     )
+    APP_MODEL_CACHE_TTL: NonNegativeInt = Field(
+        description="Seconds to keep app, site, tenant and app model config rows in a per-process cache (0 to disable)",
+        default=0,
+    )
+    APP_MODEL_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of rows kept in the per-process app model cache",
+        default=1024,
+    )
+    APP_WORKER_POOL_MAX_WORKERS: NonNegativeInt = Field(
+        description="Maximum number of app generate workers running at the same time per process"
+        " (0 to start a thread per request)",
+        default=0,
+    )
+    APP_WORKER_POOL_MAX_QUEUE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of app generate workers waiting for a thread before requests are rejected",
+        default=100,
+    )
+    APP_BLOCKING_INLINE_EXECUTION_ENABLED: bool = Field(
+        description="Run apps of blocking requests in the request thread instead of a worker thread,"
+        " APP_MAX_EXECUTION_TIME is not enforced for them",
+        default=False,
+    )
+    APP_STREAM_COALESCE_WINDOW_MS: NonNegativeInt = Field(
+        description="Milliseconds consecutive message chunks of streaming responses are merged for"
+        " before being sent as one event (0 to disable)",
+        default=0,
+    )
+    APP_STREAM_COALESCE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of characters of message chunks merged into one streaming event",
+        default=1024,
+    )
 
 
 class CodeExecutionSandboxConfig(BaseSettings):
@@ -389,6 +421,32 @@ class ModelLoadBalanceConfig(BaseSettings):
     )
 
 
+class TokenCountCacheConfig(BaseSettings):
+    """
+    Configuration for caching token counts of prompts
+    """
+
+    TOKEN_COUNT_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of prompt token counts cached per process (0 to disable)",
+        default=4096,
+    )
+
+    TOKEN_COUNT_CACHE_MIN_LENGTH: NonNegativeInt = Field(
+        description="Minimum length in characters of a text for its token count to be cached",
+        default=256,
+    )
+
+    TOKEN_COUNT_CACHE_REDIS_ENABLED: bool = Field(
+        description="Share cached token counts between processes through Redis",
+        default=False,
+    )
+
+    TOKEN_COUNT_CACHE_REDIS_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of token counts cached in Redis",
+        default=86400,
+    )
+
+
 class BillingConfig(BaseSettings):
     """
     Configuration for platform billing features
@@ -441,6 +499,11 @@ class WorkflowConfig(BaseSettings):
         default=200 * 1024,
     )
 
+    WORKFLOW_GRAPH_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of compiled workflow graphs cached per process (0 to disable)",
+        default=128,
+    )
+
 
 class WorkflowNodeExecutionConfig(BaseSettings):
     """
@@ -599,6 +662,16 @@ class RagEtlConfig(BaseSettings):
         default="database",
     )
 
+    KEYWORD_UPDATE_BATCH_SIZE: PositiveInt = Field(
+        description="Number of segments whose keywords are extracted and written together",
+        default=500,
+    )
+
+    KEYWORD_EXTRACT_MAX_WORKERS: NonNegativeInt = Field(
+        description="Maximum number of processes extracting keywords of large batches (0 or 1 to extract in process)",
+        default=0,
+    )
+
     UNSTRUCTURED_API_URL: Optional[str] = Field(
         description="API URL for Unstructured.io service",
         default=None,
@@ -650,6 +723,21 @@ class DataSetConfig(BaseSettings):
         default=30,
     )
 
+    MESSAGE_CLEAN_BATCH_SIZE: PositiveInt = Field(
+        description="Number of messages scanned, and deleted, per batch by the message cleanup task",
+        default=1000,
+    )
+
+    MESSAGE_CLEAN_BATCH_INTERVAL: NonNegativeFloat = Field(
+        description="Seconds the message cleanup task sleeps between batches",
+        default=0.1,
+    )
+
+    DATASET_CLEAN_BATCH_SIZE: PositiveInt = Field(
+        description="Number of documents or segments deleted per batch when cleaning a deleted dataset",
+        default=1000,
+    )
+
 
 class WorkspaceConfig(BaseSettings):
     """
@@ -677,6 +765,27 @@ class IndexingConfig(BaseSettings):
         default=50,
     )
 
+    INDEXING_ESTIMATE_SAMPLE_SIZE: NonNegativeInt = Field(
+        description="Maximum bytes of each uploaded text file split for indexing estimates, larger files are"
+        " extrapolated from their first bytes (0 to split whole files)",
+        default=1024 * 1024,
+    )
+
+    INDEXING_ESTIMATE_CACHE_TTL: NonNegativeInt = Field(
+        description="Seconds indexing estimates of uploaded files are cached for (0 to disable)",
+        default=600,
+    )
+
+    PDF_EXTRACT_MAX_WORKERS: NonNegativeInt = Field(
+        description="Maximum number of processes extracting pages of a large PDF file (0 or 1 to extract in process)",
+        default=0,
+    )
+
+    PDF_EXTRACT_CACHE_ENABLED: bool = Field(
+        description="Whether to cache the extracted text of uploaded PDF files in the storage, by page range",
+        default=False,
+    )
+
 
 class MultiModalTransferConfig(BaseSettings):
     MULTIMODAL_SEND_FORMAT: Literal["base64", "url"] = Field(
@@ -684,6 +793,16 @@ class MultiModalTransferConfig(BaseSettings):
         default="base64",
     )
 
+    MULTIMODAL_ENCODED_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum size in megabytes of base64 encoded files cached per process for prompts (0 to disable)",
+        default=64,
+    )
+
+    MULTIMODAL_IMAGE_DOWNSCALE_ENABLED: bool = Field(
+        description="Downscale images sent with low detail to the size models use for low detail before encoding",
+        default=False,
+    )
+
 
 class CeleryBeatConfig(BaseSettings):
     CELERY_BEAT_SCHEDULER_TIME: int = Field(
@@ -803,6 +922,7 @@ class FeatureConfig(
     PositionConfig,
     RagEtlConfig,
     SecurityConfig,
+    TokenCountCacheConfig,
     ToolConfig,
     UpdateConfig,
     WorkflowConfig,
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from pydantic import Field, NonNegativeInt
+from pydantic import Field, NonNegativeInt, PositiveInt
 from pydantic_settings import BaseSettings
 
 
@@ -191,6 +191,32 @@ class HostedFetchAppTemplateConfig(BaseSettings):
     )
 
 
+class HostedQuotaLedgerConfig(BaseSettings):
+    """
+    Configuration for the Redis ledger of hosted provider quota usage
+    """
+
+    HOSTED_QUOTA_LEDGER_ENABLED: bool = Field(
+        description="Reserve hosted provider quota in Redis and reconcile it to the database in batches",
+        default=False,
+    )
+
+    HOSTED_QUOTA_LEDGER_RECONCILE_INTERVAL: PositiveInt = Field(
+        description="Interval in seconds between reconciliations of the quota ledger to the database",
+        default=30,
+    )
+
+    HOSTED_QUOTA_LEDGER_RECONCILE_BATCH_SIZE: PositiveInt = Field(
+        description="Maximum number of ledger entries written to the database per batch",
+        default=500,
+    )
+
+    HOSTED_QUOTA_LEDGER_CACHE_TTL: PositiveInt = Field(
+        description="Time in seconds a settled ledger entry is kept before quota is reloaded from the database",
+        default=600,
+    )
+
+
 class HostedServiceConfig(
     # place the configs in alphabet order
     HostedAnthropicConfig,
@@ -198,6 +224,7 @@ class HostedServiceConfig(
     HostedFetchAppTemplateConfig,
     HostedMinmaxConfig,
     HostedOpenAiConfig,
+    HostedQuotaLedgerConfig,
     HostedSparkConfig,
     HostedZhipuAIConfig,
     # moderation
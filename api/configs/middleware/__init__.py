@@ -1,7 +1,7 @@
 from typing import Any, Literal, Optional
 from urllib.parse import quote_plus
 
-from pydantic import Field, NonNegativeInt, PositiveFloat, PositiveInt, computed_field
+from pydantic import Field, NonNegativeFloat, NonNegativeInt, PositiveFloat, PositiveInt, computed_field
 from pydantic_settings import BaseSettings
 
 from .cache.redis_config import RedisConfig
@@ -66,6 +66,31 @@ class StorageConfig(BaseSettings):
         deprecated=True,
     )
 
+    STORAGE_CACHE_ENABLED: bool = Field(
+        description="Enable a local disk cache for files loaded from storage.",
+        default=False,
+    )
+
+    STORAGE_CACHE_PATH: str = Field(
+        description="Local directory of the storage cache.",
+        default="storage_cache",
+    )
+
+    STORAGE_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum total size in megabytes of the files cached by each process in the storage cache.",
+        default=1024,
+    )
+
+    STORAGE_CACHE_MAX_FILE_SIZE: PositiveInt = Field(
+        description="Maximum size in megabytes of a single file kept in the storage cache.",
+        default=20,
+    )
+
+    STORAGE_CACHE_TTL: PositiveInt = Field(
+        description="Seconds a file is kept in the storage cache before it is loaded from storage again.",
+        default=3600,
+    )
+
 
 class VectorStoreConfig(BaseSettings):
     VECTOR_STORE: Optional[str] = Field(
@@ -79,6 +104,16 @@ class VectorStoreConfig(BaseSettings):
         default=False,
     )
 
+    VECTOR_CLIENT_HEALTH_CHECK_INTERVAL: NonNegativeFloat = Field(
+        description="Minimum seconds between health checks of shared vector store clients",
+        default=60,
+    )
+
+    VECTOR_INDEXING_PIPELINE_ENABLED: bool = Field(
+        description="Embed the next batch of documents while the previous one is written to the vector store",
+        default=True,
+    )
+
 
 class KeywordStoreConfig(BaseSettings):
     KEYWORD_STORE: str = Field(
@@ -93,6 +93,7 @@ class CompletionConversationApi(Resource):
         query = query.order_by(Conversation.created_at.desc())
 
         conversations = db.paginate(query, page=args["page"], per_page=args["limit"], error_out=False)
+        Conversation.preload_statistics(conversations.items)
 
         return conversations
 
@@ -267,6 +268,7 @@ class ChatConversationApi(Resource):
                 query = query.order_by(Conversation.created_at.desc())
 
         conversations = db.paginate(query, page=args["page"], per_page=args["limit"], error_out=False)
+        Conversation.preload_statistics(conversations.items)
         # if conversations.items:
         #     first_conversation = conversations.items[0]
         #     print(first_conversation.__dict__)
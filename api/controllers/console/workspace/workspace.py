@@ -205,7 +205,7 @@ class WebappLogoWorkspaceApi(Resource):
         try:
             upload_file = FileService.upload_file(
                 filename=file.filename,
-                content=file.read(),
+                content=file.stream,
                 mimetype=file.mimetype,
                 user=current_user,
             )
@@ -263,7 +263,7 @@ class DocumentAddByFileApi(DatasetApiResource):
 
         upload_file = FileService.upload_file(
             filename=file.filename,
-            content=file.read(),
+            content=file.stream,
             mimetype=file.mimetype,
             user=current_user,
             source="datasets",
@@ -349,7 +349,7 @@ class DocumentUpdateByFileApi(DatasetApiResource):
             try:
                 upload_file = FileService.upload_file(
                     filename=file.filename,
-                    content=file.read(),
+                    content=file.stream,
                     mimetype=file.mimetype,
                     user=current_user,
                     source="datasets",
@@ -1,6 +1,5 @@
 import contextvars
 import logging
-import threading
 import uuid
 from collections.abc import Generator, Mapping
 from typing import Any, Literal, Optional, Union, overload
@@ -261,9 +260,9 @@ class AdvancedChatAppGenerator(MessageBasedAppGenerator):
             message_id=message.id,
         )
 
-        # new thread
-        worker_thread = threading.Thread(
-            target=self._generate_worker,
+        # run the worker in the app worker pool, or inline with APP_BLOCKING_INLINE_EXECUTION_ENABLED
+        self._run_worker(
+            self._generate_worker,
             kwargs={
                 "flask_app": current_app._get_current_object(),  # type: ignore
                 "application_generate_entity": application_generate_entity,
@@ -272,10 +271,10 @@ class AdvancedChatAppGenerator(MessageBasedAppGenerator):
                 "message_id": message.id,
                 "context": contextvars.copy_context(),
             },
+            stream=stream,
+            queue_manager=queue_manager,
         )
 
-        worker_thread.start()
-
         # return response or stream generator
         response = self._handle_advanced_chat_response(
             application_generate_entity=application_generate_entity,
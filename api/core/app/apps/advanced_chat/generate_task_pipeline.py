@@ -615,9 +615,13 @@ class AdvancedChatAppGenerateTaskPipeline:
                     tts_publisher.publish(queue_message)
 
                 self._task_state.answer += delta_text
-                yield self._message_cycle_manager._message_to_stream_response(
-                    answer=delta_text, message_id=self._message_id, from_variable_selector=event.from_variable_selector
-                )
+                # blocking responses take the answer from the task state, chunks are not converted for them
+                if self._base_task_pipeline._stream:
+                    yield self._message_cycle_manager._message_to_stream_response(
+                        answer=delta_text,
+                        message_id=self._message_id,
+                        from_variable_selector=event.from_variable_selector,
+                    )
             elif isinstance(event, QueueMessageReplaceEvent):
                 # published by moderation
                 yield self._message_cycle_manager._message_replace_to_stream_response(answer=event.text)
@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import deque
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class AppQueueChannel(Generic[T]):
+    """
+    Channel passing queue messages from the app runner to the task pipeline.
+
+    Unlike `queue.Queue`, the consumer takes every message published since its last read at once,
+    so a burst of chunks costs one lock round trip and at most one wakeup instead of one per chunk.
+    The channel waits on a `threading.Condition`, which cooperates with gevent once it is patched.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._messages: deque[T] = deque()
+        self._waiting = False
+
+    def put(self, message: T) -> None:
+        with self._condition:
+            self._messages.append(message)
+            # messages published while the consumer is busy are picked up by its next read
+            if self._waiting:
+                self._condition.notify()
+
+    def get_batch(self, timeout: float) -> list[T]:
+        """
+        Take all published messages, waiting up to `timeout` seconds for one when there are none.
+
+        :param timeout: seconds to wait for a message
+        :return: messages in publish order, empty when none was published in time
+        """
+        with self._condition:
+            if not self._messages:
+                deadline = time.monotonic() + timeout
+                self._waiting = True
+                try:
+                    while not self._messages:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return []
+                        self._condition.wait(remaining)
+                finally:
+                    self._waiting = False
+
+            messages = list(self._messages)
+            self._messages.clear()
+            return messages
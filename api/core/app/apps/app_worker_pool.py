@@ -0,0 +1,150 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from configs import dify_config
+from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
+from core.errors.error import AppWorkerPoolFullError
+
+logger = logging.getLogger(__name__)
+
+# workers waiting longer than this for a thread are logged
+SLOW_QUEUE_WAIT_SECONDS = 1.0
+
+
+class AppWorkerPool:
+    """
+    Process-wide pool of threads running the workers of app generate requests.
+
+    With `APP_WORKER_POOL_MAX_WORKERS` set, at most that many workers run at the same time and at most
+    `APP_WORKER_POOL_MAX_QUEUE_SIZE` more wait for a thread. Requests beyond that are rejected with
+    `AppWorkerPoolFullError` instead of starting more threads. Without it, every worker gets a new
+    thread. The time workers wait for a thread is tracked in the pool statistics.
+
+    Workers that waited for a thread until their request gave up, i.e. for `APP_MAX_EXECUTION_TIME`
+    or until the listener of their queue manager stopped, are not run and are counted as rejected.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid = os.getpid()
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._total_queue_wait = 0.0
+        self._max_queue_wait = 0.0
+
+    def submit(
+        self,
+        worker: Callable[..., None],
+        kwargs: Mapping[str, Any],
+        queue_manager: Optional[AppQueueManager] = None,
+    ) -> None:
+        """
+        Run a worker in a thread of the pool.
+
+        :param worker: worker of an app generate request
+        :param kwargs: worker arguments
+        :param queue_manager: queue manager of the request, a worker whose request gave up is not run
+        :raises AppWorkerPoolFullError: when no more workers can be queued
+        """
+        max_workers = dify_config.APP_WORKER_POOL_MAX_WORKERS
+        if max_workers <= 0:
+            worker_thread = threading.Thread(target=worker, kwargs=kwargs)
+            worker_thread.start()
+            return
+
+        with self._lock:
+            self._reset_after_fork()
+            if self._queued + self._running >= max_workers + dify_config.APP_WORKER_POOL_MAX_QUEUE_SIZE:
+                self._rejected += 1
+                logger.warning(f"App worker rejected, {self._running} running and {self._queued} queued")
+                raise AppWorkerPoolFullError()
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="app_worker")
+            self._queued += 1
+            self._submitted += 1
+            executor = self._executor
+
+        executor.submit(self._run, worker, kwargs, queue_manager, time.perf_counter())
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get the usage of the pool and the time workers waited for a thread
+        """
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": dify_config.APP_WORKER_POOL_MAX_WORKERS,
+                "running": self._running,
+                "queued": self._queued,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "average_queue_wait": self._total_queue_wait / started if started else 0.0,
+                "max_queue_wait": self._max_queue_wait,
+            }
+
+    def _run(
+        self,
+        worker: Callable[..., None],
+        kwargs: Mapping[str, Any],
+        queue_manager: Optional[AppQueueManager],
+        submitted_at: float,
+    ) -> None:
+        queue_wait = time.perf_counter() - submitted_at
+        if queue_manager is not None and (
+            queue_wait >= dify_config.APP_MAX_EXECUTION_TIME or queue_manager.is_listen_stopped()
+        ):
+            # the request gave up waiting, running the worker would only spend quota on an unread response
+            with self._lock:
+                self._queued -= 1
+                self._rejected += 1
+            logger.warning(f"App worker skipped after waiting {queue_wait:.2f}s for a thread")
+            self._publish_rejection(queue_manager)
+            return
+
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._total_queue_wait += queue_wait
+            self._max_queue_wait = max(self._max_queue_wait, queue_wait)
+        if queue_wait >= SLOW_QUEUE_WAIT_SECONDS:
+            logger.warning(f"App worker waited {queue_wait:.2f}s for a thread")
+
+        try:
+            # threads are reused, every worker starts with empty context variables like in a new thread
+            contextvars.Context().run(worker, **kwargs)
+        except Exception:
+            logger.exception("App worker failed")
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    @staticmethod
+    def _publish_rejection(queue_manager: AppQueueManager) -> None:
+        try:
+            queue_manager.publish_error(AppWorkerPoolFullError(), PublishFrom.TASK_PIPELINE)
+        except Exception:
+            logger.exception("Failed to publish the rejection of an app worker")
+
+    def _reset_after_fork(self) -> None:
+        # threads of the parent process do not exist in a forked process
+        if self._pid != os.getpid():
+            self._executor = None
+            self._queued = 0
+            self._running = 0
+            self._pid = os.getpid()
+
+
+app_worker_pool = AppWorkerPool()
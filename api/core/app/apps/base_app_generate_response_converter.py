@@ -1,13 +1,33 @@
+import json
 import logging
+import time
 from abc import ABC, abstractmethod
-from collections.abc import Generator, Mapping
+from collections.abc import Generator, Iterable, Mapping
 from typing import Any, Union
 
+from configs import dify_config
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.entities.task_entities import AppBlockingResponse, AppStreamResponse
-from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
+from core.errors.error import (
+    AppWorkerPoolFullError,
+    ModelCurrentlyNotSupportError,
+    ProviderTokenNotInitError,
+    QuotaExceededError,
+)
 from core.model_runtime.errors.invoke import InvokeError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+# path of the text merged when consecutive chunks of these events are coalesced
+COALESCED_TEXT_PATHS: dict[str, tuple[str, ...]] = {
+    "message": ("answer",),
+    "agent_message": ("answer",),
+    "text_chunk": ("data", "text"),
+}
+
 
 class AppGenerateResponseConverter(ABC):
     _blocking_response_type: type[AppBlockingResponse]
@@ -22,28 +42,129 @@ class AppGenerateResponseConverter(ABC):
             if isinstance(response, AppBlockingResponse):
                 return cls.convert_blocking_full_response(response)
             else:
-
-                def _generate_full_response() -> Generator[str, Any, None]:
-                    for chunk in cls.convert_stream_full_response(response):
-                        if chunk == "ping":
-                            yield f"event: {chunk}\n\n"
-                        else:
-                            yield f"data: {chunk}\n\n"
-
-                return _generate_full_response()
+                return cls._generate_stream_events(cls.convert_stream_full_response(response))
         else:
             if isinstance(response, AppBlockingResponse):
                 return cls.convert_blocking_simple_response(response)
             else:
+                return cls._generate_stream_events(cls.convert_stream_simple_response(response))
+
+    @classmethod
+    def _generate_stream_events(cls, chunks: Iterable[Mapping[str, Any] | str]) -> Generator[str, None, None]:
+        """
+        Format stream chunks as server-sent events.
+
+        With `APP_STREAM_COALESCE_WINDOW_MS` set, consecutive message chunks are merged into one event.
+        """
+        if dify_config.APP_STREAM_COALESCE_WINDOW_MS > 0:
+            chunks = cls._coalesce_stream_chunks(
+                chunks,
+                window=dify_config.APP_STREAM_COALESCE_WINDOW_MS / 1000,
+                max_size=dify_config.APP_STREAM_COALESCE_MAX_SIZE,
+            )
+
+        for chunk in chunks:
+            if not isinstance(chunk, Mapping):
+                yield f"event: {chunk}\n\n"
+            else:
+                yield f"data: {cls._dump_stream_chunk(chunk)}\n\n"
+
+    @classmethod
+    def _coalesce_stream_chunks(
+        cls, chunks: Iterable[Mapping[str, Any] | str], window: float, max_size: int
+    ) -> Generator[Mapping[str, Any] | str, None, None]:
+        """
+        Merge the text of consecutive chunks of the same message.
 
-                def _generate_simple_response() -> Generator[str, Any, None]:
-                    for chunk in cls.convert_stream_simple_response(response):
-                        if chunk == "ping":
-                            yield f"event: {chunk}\n\n"
-                        else:
-                            yield f"data: {chunk}\n\n"
+        Merged chunks are sent once they are `window` seconds old or hold `max_size` characters, or
+        when a chunk of another event arrives, so the order of events is kept. As chunks are only
+        checked when they arrive, a chunk may wait for the next one longer than the window.
+        :param chunks: stream chunks
+        :param window: seconds chunks are merged for
+        :param max_size: maximum characters of merged text
+        """
+        pending: dict[str, Any] | None = None
+        pending_key: dict[str, Any] | None = None
+        pending_texts: list[str] = []
+        pending_size = 0
+        pending_since = 0.0
+
+        for chunk in chunks:
+            if not isinstance(chunk, Mapping):
+                # pings are sent as they are
+                if pending is not None:
+                    yield cls._merge_texts(pending, pending_texts)
+                    pending = None
+                yield chunk
+                continue
+
+            path = COALESCED_TEXT_PATHS.get(chunk.get("event", ""))
+            if pending is not None:
+                if path and chunk["event"] == pending["event"] and cls._without_path(chunk, path) == pending_key:
+                    text = cls._get_path(chunk, path)
+                    pending_texts.append(text)
+                    pending_size += len(text)
+                    if pending_size >= max_size or time.perf_counter() - pending_since >= window:
+                        yield cls._merge_texts(pending, pending_texts)
+                        pending = None
+                    continue
+
+                yield cls._merge_texts(pending, pending_texts)
+                pending = None
+
+            if not path:
+                yield chunk
+                continue
+
+            pending = dict(chunk)
+            pending_key = cls._without_path(chunk, path)
+            pending_texts = [cls._get_path(chunk, path)]
+            pending_size = len(pending_texts[0])
+            pending_since = time.perf_counter()
+            if pending_size >= max_size:
+                yield pending
+                pending = None
+
+        if pending is not None:
+            yield cls._merge_texts(pending, pending_texts)
+
+    @classmethod
+    def _merge_texts(cls, chunk: dict[str, Any], texts: list[str]) -> dict[str, Any]:
+        if len(texts) == 1:
+            return chunk
+
+        *parents, name = COALESCED_TEXT_PATHS[chunk["event"]]
+        value = chunk
+        for parent in parents:
+            value[parent] = dict(value[parent])
+            value = value[parent]
+        value[name] = "".join(texts)
+        return chunk
+
+    @staticmethod
+    def _get_path(chunk: Mapping[str, Any], path: tuple[str, ...]) -> str:
+        value: Any = chunk
+        for name in path:
+            value = value[name]
+        return value or ""
+
+    @classmethod
+    def _without_path(cls, chunk: Mapping[str, Any], path: tuple[str, ...]) -> dict[str, Any]:
+        name, *rest = path
+        result = {key: value for key, value in chunk.items() if key != name}
+        if rest:
+            result[name] = cls._without_path(chunk[name], tuple(rest))
+        return result
 
-                return _generate_simple_response()
+    @staticmethod
+    def _dump_stream_chunk(chunk: Mapping[str, Any]) -> str:
+        if orjson is not None:
+            try:
+                return orjson.dumps(chunk).decode()
+            except TypeError:
+                # values orjson does not support, like non-string keys
+                pass
+        return json.dumps(chunk)
 
     @classmethod
     @abstractmethod
@@ -59,14 +180,14 @@ class AppGenerateResponseConverter(ABC):
     @abstractmethod
     def convert_stream_full_response(
         cls, stream_response: Generator[AppStreamResponse, None, None]
-    ) -> Generator[str, None, None]:
+    ) -> Generator[dict | str, None, None]:
         raise NotImplementedError
 
     @classmethod
     @abstractmethod
     def convert_stream_simple_response(
         cls, stream_response: Generator[AppStreamResponse, None, None]
-    ) -> Generator[str, None, None]:
+    ) -> Generator[dict | str, None, None]:
         raise NotImplementedError
 
     @classmethod
@@ -119,6 +240,7 @@ class AppGenerateResponseConverter(ABC):
             },
             ModelCurrentlyNotSupportError: {"code": "model_currently_not_support", "status": 400},
             InvokeError: {"code": "completion_request_error", "status": 400},
+            AppWorkerPoolFullError: {"code": "rate_limit_error", "status": 429},
         }
 
         # Determine the response based on the type of exception
@@ -1,7 +1,11 @@
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from typing import TYPE_CHECKING, Any, Optional
 
+from configs import dify_config
 from core.app.app_config.entities import VariableEntityType
+from core.app.apps.app_worker_pool import app_worker_pool
+from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
+from core.errors.error import AppWorkerPoolFullError
 from core.file import File, FileUploadConfig
 from factories import file_factory
 
@@ -10,6 +14,32 @@ if TYPE_CHECKING:
 
 
 class BaseAppGenerator:
+    @staticmethod
+    def _run_worker(
+        worker: Callable[..., None], kwargs: Mapping[str, Any], stream: bool, queue_manager: AppQueueManager
+    ) -> None:
+        """
+        Run the worker generating the app response.
+
+        The worker runs in the app worker pool, and its events are read while they are published.
+        With `APP_BLOCKING_INLINE_EXECUTION_ENABLED`, blocking requests run the worker in the current
+        thread before the response is built from the queued events. Nothing interrupts an inline
+        worker, so `APP_MAX_EXECUTION_TIME` does not apply to it.
+        :param worker: worker publishing the events of the app to its queue manager
+        :param kwargs: worker arguments
+        :param stream: is stream
+        :param queue_manager: queue manager of the request
+        """
+        if not stream and dify_config.APP_BLOCKING_INLINE_EXECUTION_ENABLED:
+            worker(**kwargs)
+            return
+
+        try:
+            app_worker_pool.submit(worker, kwargs, queue_manager)
+        except AppWorkerPoolFullError as e:
+            # the rejection is reported to the client and saved like any error of the app
+            queue_manager.publish_error(e, PublishFrom.TASK_PIPELINE)
+
     def _prepare_user_inputs(
         self,
         *,
@@ -1,4 +1,3 @@
-import queue
 import time
 from abc import abstractmethod
 from enum import Enum
@@ -7,17 +6,24 @@ from typing import Any
 from sqlalchemy.orm import DeclarativeMeta
 
 from configs import dify_config
+from core.app.apps.app_queue_channel import AppQueueChannel
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.entities.queue_entities import (
     AppQueueEvent,
     MessageQueueMessage,
+    QueueAgentMessageEvent,
     QueueErrorEvent,
+    QueueLLMChunkEvent,
     QueuePingEvent,
     QueueStopEvent,
+    QueueTextChunkEvent,
     WorkflowQueueMessage,
 )
 from extensions.ext_redis import redis_client
 
+# seconds between reads of the stop flag of a task
+STOP_FLAG_CHECK_INTERVAL = 0.5
+
 
 class PublishFrom(Enum):
     APPLICATION_MANAGER = 1
@@ -38,9 +44,10 @@ class AppQueueManager:
             AppQueueManager._generate_task_belong_cache_key(self._task_id), 1800, f"{user_prefix}-{self._user_id}"
         )
 
-        q: queue.Queue[WorkflowQueueMessage | MessageQueueMessage | None] = queue.Queue()
-
-        self._q = q
+        self._q: AppQueueChannel[WorkflowQueueMessage | MessageQueueMessage | None] = AppQueueChannel()
+        self._stopped = False
+        self._stop_checked_at = float("-inf")
+        self._listen_stopped = False
 
     def listen(self):
         """
@@ -51,18 +58,18 @@ class AppQueueManager:
         listen_timeout = dify_config.APP_MAX_EXECUTION_TIME
         start_time = time.time()
         last_ping_time: int | float = 0
-        while True:
-            try:
-                message = self._q.get(timeout=1)
-                if message is None:
-                    break
-
-                yield message
-            except queue.Empty:
-                continue
-            finally:
+        try:
+            while True:
+                # messages published while the previous ones were processed are taken together
+                for message in self._q.get_batch(timeout=1):
+                    if message is None:
+                        return
+
+                    yield message
+
                 elapsed_time = time.time() - start_time
                 if elapsed_time >= listen_timeout or self._is_stopped():
+                    self._listen_stopped = True
                     # publish two messages to make sure the client can receive the stop signal
                     # and stop listening after the stop signal processed
                     self.publish(
@@ -72,6 +79,15 @@ class AppQueueManager:
                 if elapsed_time // 10 > last_ping_time:
                     self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
                     last_ping_time = elapsed_time // 10
+        finally:
+            self._listen_stopped = True
+
+    def is_listen_stopped(self) -> bool:
+        """
+        Check if the listener timed out, was stopped or is done, so published events are no longer read
+        :return:
+        """
+        return self._listen_stopped
 
     def stop_listen(self) -> None:
         """
@@ -96,7 +112,9 @@ class AppQueueManager:
         :param pub_from:
         :return:
         """
-        self._check_for_sqlalchemy_models(event.model_dump())
+        # chunks are published per token, their typed fields cannot hold models and are not dumped to be checked
+        if not isinstance(event, QueueLLMChunkEvent | QueueTextChunkEvent | QueueAgentMessageEvent):
+            self._check_for_sqlalchemy_models(event.model_dump())
         self._publish(event, pub_from)
 
     @abstractmethod
@@ -131,9 +149,18 @@ class AppQueueManager:
         Check if task is stopped
         :return:
         """
+        # the flag is read at most every STOP_FLAG_CHECK_INTERVAL seconds instead of for every published chunk
+        if self._stopped:
+            return True
+        now = time.monotonic()
+        if now - self._stop_checked_at < STOP_FLAG_CHECK_INTERVAL:
+            return False
+        self._stop_checked_at = now
+
         stopped_cache_key = AppQueueManager._generate_stopped_cache_key(self._task_id)
         result = redis_client.get(stopped_cache_key)
         if result is not None:
+            self._stopped = True
             return True
 
         return False
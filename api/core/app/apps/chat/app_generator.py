@@ -1,5 +1,4 @@
 import logging
-import threading
 import uuid
 from collections.abc import Generator, Mapping
 from typing import Any, Literal, Union, overload
@@ -169,9 +168,9 @@ class ChatAppGenerator(MessageBasedAppGenerator):
             message_id=message.id,
         )
 
-        # new thread
-        worker_thread = threading.Thread(
-            target=self._generate_worker,
+        # run the worker in the app worker pool, or inline with APP_BLOCKING_INLINE_EXECUTION_ENABLED
+        self._run_worker(
+            self._generate_worker,
             kwargs={
                 "flask_app": current_app._get_current_object(),  # type: ignore
                 "application_generate_entity": application_generate_entity,
@@ -179,10 +178,10 @@ class ChatAppGenerator(MessageBasedAppGenerator):
                 "conversation_id": conversation.id,
                 "message_id": message.id,
             },
+            stream=streaming,
+            queue_manager=queue_manager,
         )
 
-        worker_thread.start()
-
         # return response or stream generator
         response = self._handle_response(
             application_generate_entity=application_generate_entity,
@@ -1,4 +1,3 @@
-import json
 from collections.abc import Generator
 from typing import cast
 
@@ -53,7 +52,7 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
     def convert_stream_full_response(
         cls,
         stream_response: Generator[CompletionAppStreamResponse, None, None],  # type: ignore[override]
-    ) -> Generator[str, None, None]:
+    ) -> Generator[dict | str, None, None]:
         """
         Convert stream full response.
         :param stream_response: stream response
@@ -78,13 +77,13 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
                 response_chunk.update(data)
             else:
                 response_chunk.update(sub_stream_response.to_dict())
-            yield json.dumps(response_chunk)
+            yield response_chunk
 
     @classmethod
     def convert_stream_simple_response(
         cls,
         stream_response: Generator[CompletionAppStreamResponse, None, None],  # type: ignore[override]
-    ) -> Generator[str, None, None]:
+    ) -> Generator[dict | str, None, None]:
         """
         Convert stream simple response.
         :param stream_response: stream response
@@ -115,4 +114,4 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
             else:
                 response_chunk.update(sub_stream_response.to_dict())
 
-            yield json.dumps(response_chunk)
+            yield response_chunk
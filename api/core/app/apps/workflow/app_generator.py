@@ -1,6 +1,5 @@
 import contextvars
 import logging
-import threading
 import uuid
 from collections.abc import Generator, Mapping, Sequence
 from typing import Any, Literal, Optional, Union, overload
@@ -155,9 +154,9 @@ class WorkflowAppGenerator(BaseAppGenerator):
             app_mode=app_model.mode,
         )
 
-        # new thread
-        worker_thread = threading.Thread(
-            target=self._generate_worker,
+        # run the worker in the app worker pool, or inline with APP_BLOCKING_INLINE_EXECUTION_ENABLED
+        self._run_worker(
+            self._generate_worker,
             kwargs={
                 "flask_app": current_app._get_current_object(),  # type: ignore
                 "application_generate_entity": application_generate_entity,
@@ -165,10 +164,10 @@ class WorkflowAppGenerator(BaseAppGenerator):
                 "context": contextvars.copy_context(),
                 "workflow_thread_pool_id": workflow_thread_pool_id,
             },
+            stream=streaming,
+            queue_manager=queue_manager,
         )
 
-        worker_thread.start()
-
         # return response or stream generator
         response = self._handle_response(
             application_generate_entity=application_generate_entity,
@@ -524,9 +524,11 @@ class WorkflowAppGenerateTaskPipeline:
                     tts_publisher.publish(queue_message)
 
                 self._task_state.answer += delta_text
-                yield self._text_chunk_to_stream_response(
-                    delta_text, from_variable_selector=event.from_variable_selector
-                )
+                # blocking responses only hold the outputs, chunks are not converted for them
+                if self._base_task_pipeline._stream:
+                    yield self._text_chunk_to_stream_response(
+                        delta_text, from_variable_selector=event.from_variable_selector
+                    )
             else:
                 continue
 
@@ -315,6 +315,9 @@ class EasyUIBasedGenerateTaskPipeline(BasedGenerateTaskPipeline, MessageCycleMan
                 current_content += cast(str, delta_text)
                 self._task_state.llm_result.message.content = current_content
 
+                # blocking responses take the answer from the task state, chunks are not converted for them
+                if not self._stream:
+                    continue
                 if isinstance(event, QueueLLMChunkEvent):
                     yield self._message_to_stream_response(
                         answer=cast(str, delta_text),
@@ -50,6 +50,7 @@ from models.enums import CreatedByRole, WorkflowRunTriggeredFrom
 from models.model import EndUser
 from models.workflow import (
     Workflow,
+    WorkflowGraph,
     WorkflowNodeExecution,
     WorkflowNodeExecutionStatus,
     WorkflowNodeExecutionTriggeredFrom,
@@ -120,7 +121,11 @@ class WorkflowCycleManage:
         workflow_run.type = workflow.type
         workflow_run.triggered_from = triggered_from.value
         workflow_run.version = workflow.version
-        workflow_run.graph = workflow.graph
+        if triggered_from == WorkflowRunTriggeredFrom.DEBUGGING:
+            # drafts change between runs, keep their graph inline
+            workflow_run.graph = workflow.graph
+        else:
+            workflow_run.graph_hash = WorkflowGraph.save(session, workflow.graph)
         workflow_run.inputs = json.dumps(inputs)
         workflow_run.status = WorkflowRunStatus.RUNNING
         workflow_run.created_by_role = created_by_role
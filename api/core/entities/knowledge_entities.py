@@ -17,3 +17,22 @@ class IndexingEstimate(BaseModel):
     total_segments: int
     preview: list[PreviewDetail]
     qa_preview: Optional[list[QAPreviewDetail]] = None
+    # bounds and tokens are set when segments of sampled files are extrapolated
+    total_segments_lower: Optional[int] = None
+    total_segments_upper: Optional[int] = None
+    total_tokens: Optional[int] = None
+    is_estimated: bool = False
+
+
+class SourceIndexingEstimate(BaseModel):
+    """
+    Estimate of the segments of a single source, cached for repeated previews.
+    """
+
+    segments: int
+    segments_lower: int
+    segments_upper: int
+    tokens: Optional[int] = None
+    is_estimated: bool = False
+    preview: list[PreviewDetail] = []
+    qa_preview: list[QAPreviewDetail] = []
@@ -43,6 +43,14 @@ class AppInvokeQuotaExceededError(ValueError):
     description = "App Invoke Quota Exceeded"
 
 
+class AppWorkerPoolFullError(ValueError):
+    """
+    Custom exception raised when all app workers are busy and too many requests are waiting.
+    """
+
+    description = "Too many requests are being processed, please try again later"
+
+
 class ModelCurrentlyNotSupportError(ValueError):
     """
     Custom exception raised when the model not support
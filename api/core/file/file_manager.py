@@ -1,5 +1,10 @@
 import base64
+import io
+import threading
 from collections.abc import Mapping
+from typing import Optional
+
+from cachetools import LRUCache  # type: ignore
 
 from configs import dify_config
 from core.helper import ssrf_proxy
@@ -17,6 +22,17 @@ from .enums import FileAttribute
 from .models import File, FileTransferMethod, FileType
 from .tool_file_parser import ToolFileParser
 
+# images sent with low detail are scaled down to fit in this size by model providers
+LOW_DETAIL_IMAGE_SIZE = 512
+
+# base64 encoded files of the storage, keyed by transfer method, file id and whether the image was downscaled
+_encoded_string_cache: Optional[LRUCache] = (
+    LRUCache(maxsize=dify_config.MULTIMODAL_ENCODED_CACHE_SIZE * 1024 * 1024, getsizeof=len)
+    if dify_config.MULTIMODAL_ENCODED_CACHE_SIZE > 0
+    else None
+)
+_encoded_string_cache_lock = threading.Lock()
+
 
 def get_attr(*, file: File, attr: FileAttribute):
     match attr:
@@ -47,14 +63,20 @@ def to_prompt_message_content(
     if f.mime_type is None:
         raise ValueError("Missing file mime_type")
 
+    image_detail = None
+    if f.type == FileType.IMAGE:
+        image_detail = image_detail_config or ImagePromptMessageContent.DETAIL.LOW
+
     params = {
-        "base64_data": _get_encoded_string(f) if dify_config.MULTIMODAL_SEND_FORMAT == "base64" else "",
+        "base64_data": _get_encoded_string(f, image_detail=image_detail)
+        if dify_config.MULTIMODAL_SEND_FORMAT == "base64"
+        else "",
         "url": _to_url(f) if dify_config.MULTIMODAL_SEND_FORMAT == "url" else "",
         "format": f.extension.removeprefix("."),
         "mime_type": f.mime_type,
     }
-    if f.type == FileType.IMAGE:
-        params["detail"] = image_detail_config or ImagePromptMessageContent.DETAIL.LOW
+    if image_detail is not None:
+        params["detail"] = image_detail
 
     prompt_class_map: Mapping[FileType, type[MultiModalPromptMessageContent]] = {
         FileType.IMAGE: ImagePromptMessageContent,
@@ -100,7 +122,26 @@ def _download_file_content(path: str, /):
     return data
 
 
-def _get_encoded_string(f: File, /):
+def _get_encoded_string(f: File, /, *, image_detail: ImagePromptMessageContent.DETAIL | None = None):
+    downscale = (
+        dify_config.MULTIMODAL_IMAGE_DOWNSCALE_ENABLED
+        and f.type == FileType.IMAGE
+        and image_detail == ImagePromptMessageContent.DETAIL.LOW
+    )
+
+    # files of the storage never change, so their encoded content can be reused across turns
+    cache_key = None
+    if (
+        _encoded_string_cache is not None
+        and f.transfer_method in (FileTransferMethod.LOCAL_FILE, FileTransferMethod.TOOL_FILE)
+        and f.related_id
+    ):
+        cache_key = (f.transfer_method, f.related_id, downscale)
+        with _encoded_string_cache_lock:
+            cached_string = _encoded_string_cache.get(cache_key)
+        if cached_string is not None:
+            return cached_string
+
     match f.transfer_method:
         case FileTransferMethod.REMOTE_URL:
             response = ssrf_proxy.get(f.remote_url, follow_redirects=True)
@@ -111,10 +152,43 @@ def _get_encoded_string(f: File, /):
         case FileTransferMethod.TOOL_FILE:
             data = _download_file_content(f._storage_key)
 
+    if downscale:
+        data = _downscale_image(data, max_size=LOW_DETAIL_IMAGE_SIZE)
+
     encoded_string = base64.b64encode(data).decode("utf-8")
+
+    if (
+        cache_key is not None
+        and _encoded_string_cache is not None
+        and len(encoded_string) <= _encoded_string_cache.maxsize
+    ):
+        with _encoded_string_cache_lock:
+            _encoded_string_cache[cache_key] = encoded_string
+
     return encoded_string
 
 
+def _downscale_image(data: bytes, /, *, max_size: int) -> bytes:
+    """
+    Scale an image down to fit in max_size x max_size, keeping its format.
+    Images that are small enough, animated or not readable are returned unchanged.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if max(image.size) <= max_size or getattr(image, "n_frames", 1) > 1:
+                return data
+
+            image_format = image.format
+            image.thumbnail((max_size, max_size))
+            output = io.BytesIO()
+            image.save(output, format=image_format)
+            return output.getvalue()
+    except (OSError, ValueError):
+        return data
+
+
 def _to_url(f: File, /):
     if f.transfer_method == FileTransferMethod.REMOTE_URL:
         if f.remote_url is None:
@@ -0,0 +1,272 @@
+import logging
+from typing import Optional
+
+from sqlalchemy import select, text, tuple_
+
+from configs import dify_config
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.provider import Provider, ProviderType
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: ledger key, ARGV[1]: amount
+# returns 1 when reserved, -1 when the quota is exhausted, -2 when the entry is not loaded
+# entries holding pending usage do not expire until it is settled, or the usage would be lost
+_RESERVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -2
+end
+local entry = redis.call('HMGET', KEYS[1], 'used', 'pending', 'limit')
+local used = tonumber(entry[1])
+local pending = tonumber(entry[2])
+local limit = tonumber(entry[3])
+if used + pending >= limit then
+    return -1
+end
+redis.call('HINCRBY', KEYS[1], 'pending', ARGV[1])
+redis.call('PERSIST', KEYS[1])
+return 1
+"""
+
+# KEYS[1]: ledger key, ARGV[1]: quota used, ARGV[2]: quota limit, ARGV[3]: ttl
+_LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], 'used', ARGV[1], 'limit', ARGV[2], 'pending', 0)
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return 1
+"""
+
+# KEYS[1]: ledger key, ARGV[1]: ttl
+# moves pending usage into settled usage and returns the moved amount, the entry expires once nothing is pending
+_SETTLE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local pending = tonumber(redis.call('HGET', KEYS[1], 'pending'))
+if pending > 0 then
+    redis.call('HINCRBY', KEYS[1], 'pending', -pending)
+    redis.call('HINCRBY', KEYS[1], 'used', pending)
+end
+if tonumber(redis.call('HGET', KEYS[1], 'pending')) <= 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return pending
+"""
+
+# KEYS[1]: ledger key, ARGV[1]: amount
+# puts settled usage back to pending when it could not be written to the database
+_RESTORE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HINCRBY', KEYS[1], 'used', -ARGV[1])
+redis.call('HINCRBY', KEYS[1], 'pending', ARGV[1])
+redis.call('PERSIST', KEYS[1])
+return 1
+"""
+
+# KEYS[1]: ledger key, ARGV[1]: quota used, ARGV[2]: quota limit
+# replaces settled usage and limit with the values of the database, pending usage is kept
+_REFRESH_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'used', ARGV[1], 'limit', ARGV[2])
+return 1
+"""
+
+_RECONCILE_SQL = text(
+    """
+    UPDATE providers SET quota_used = quota_used + :amount
+    WHERE tenant_id = :tenant_id
+    AND provider_name = :provider_name
+    AND provider_type = :provider_type
+    AND quota_type = :quota_type
+    """
+)
+
+
+class ProviderQuotaLedger:
+    """
+    Ledger of system provider quota usage.
+
+    Usage is reserved against a per-provider counter in Redis that enforces ``quota_limit``
+    atomically, and is written back to the ``providers`` table in periodic batches by
+    ``schedule.reconcile_provider_quota_task``. Concurrent calls of a tenant therefore no
+    longer serialize on the same provider row lock. Every reconciliation also reloads the
+    used quota and ``quota_limit`` of the written entries, so limit changes reach active
+    tenants. Entries expire after ``HOSTED_QUOTA_LEDGER_CACHE_TTL`` only while no usage is
+    pending, so usage that is not reconciled yet, e.g. while the scheduler is down, is kept.
+
+    When the ledger is disabled, usage is written to the database directly.
+    """
+
+    _KEY_PREFIX = "provider_quota_ledger"
+    _DIRTY_KEY = "provider_quota_ledger_dirty"
+
+    @classmethod
+    def deduct(cls, tenant_id: str, provider_name: str, quota_type: str, amount: int) -> bool:
+        """
+        Deduct used quota of a system provider.
+
+        :param tenant_id: tenant id
+        :param provider_name: provider name
+        :param quota_type: quota type
+        :param amount: used quota
+        :return: True if the usage was recorded, False if the quota is exhausted
+        """
+        if not dify_config.HOSTED_QUOTA_LEDGER_ENABLED:
+            return cls._deduct_from_database(tenant_id, provider_name, quota_type, amount)
+
+        key = cls._ledger_key(tenant_id, provider_name, quota_type)
+        result = redis_client.eval(_RESERVE_SCRIPT, 1, key, amount)
+        if result == -2:
+            if not cls._load(key, tenant_id, provider_name, quota_type):
+                return False
+            result = redis_client.eval(_RESERVE_SCRIPT, 1, key, amount)
+
+        if result != 1:
+            return False
+
+        redis_client.sadd(cls._DIRTY_KEY, key)
+        return True
+
+    @classmethod
+    def reconcile(cls) -> int:
+        """
+        Write pending ledger usage to the database in batches.
+
+        :return: number of provider records updated
+        """
+        batch_size = dify_config.HOSTED_QUOTA_LEDGER_RECONCILE_BATCH_SIZE
+        reconciled = 0
+        while True:
+            keys = redis_client.spop(cls._DIRTY_KEY, batch_size)
+            if not keys:
+                break
+
+            settled: list[tuple[str, int]] = []
+            for key in keys:
+                key = key.decode("utf-8") if isinstance(key, bytes) else key
+                amount = int(redis_client.eval(_SETTLE_SCRIPT, 1, key, dify_config.HOSTED_QUOTA_LEDGER_CACHE_TTL))
+                if amount > 0:
+                    settled.append((key, amount))
+
+            if not settled:
+                continue
+
+            params = []
+            for key, amount in settled:
+                tenant_id, provider_name, quota_type = cls._parse_ledger_key(key)
+                params.append(
+                    {
+                        "amount": amount,
+                        "tenant_id": tenant_id,
+                        "provider_name": provider_name,
+                        "provider_type": ProviderType.SYSTEM.value,
+                        "quota_type": quota_type,
+                    }
+                )
+
+            try:
+                db.session.execute(_RECONCILE_SQL, params)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception("Failed to reconcile provider quota ledger, restoring pending usage")
+                for key, amount in settled:
+                    if not redis_client.eval(_RESTORE_SCRIPT, 1, key, amount):
+                        logger.warning(f"Lost {amount} pending quota usage of {key}")
+                redis_client.sadd(cls._DIRTY_KEY, *[key for key, _ in settled])
+                raise
+
+            reconciled += len(settled)
+            cls._refresh([key for key, _ in settled])
+
+        return reconciled
+
+    @classmethod
+    def _refresh(cls, keys: list[str]) -> None:
+        """
+        Reload used quota and quota limit of ledger entries from the database.
+        """
+        entries = {cls._parse_ledger_key(key): key for key in keys}
+        try:
+            providers = db.session.execute(
+                select(
+                    Provider.tenant_id,
+                    Provider.provider_name,
+                    Provider.quota_type,
+                    Provider.quota_used,
+                    Provider.quota_limit,
+                ).where(
+                    Provider.provider_type == ProviderType.SYSTEM.value,
+                    tuple_(Provider.tenant_id, Provider.provider_name, Provider.quota_type).in_(list(entries)),
+                )
+            ).all()
+            for provider in providers:
+                key = entries.get((provider.tenant_id, provider.provider_name, provider.quota_type))
+                if key:
+                    redis_client.eval(
+                        _REFRESH_SCRIPT,
+                        1,
+                        key,
+                        provider.quota_used or 0,
+                        provider.quota_limit if provider.quota_limit is not None else 0,
+                    )
+        except Exception:
+            # entries are reloaded once they expire
+            logger.exception("Failed to refresh provider quota ledger entries")
+
+    @classmethod
+    def _load(cls, key: str, tenant_id: str, provider_name: str, quota_type: str) -> bool:
+        provider: Optional[Provider] = (
+            db.session.query(Provider)
+            .filter(
+                Provider.tenant_id == tenant_id,
+                Provider.provider_name == provider_name,
+                Provider.provider_type == ProviderType.SYSTEM.value,
+                Provider.quota_type == quota_type,
+            )
+            .first()
+        )
+        if not provider:
+            return False
+
+        redis_client.eval(
+            _LOAD_SCRIPT,
+            1,
+            key,
+            provider.quota_used or 0,
+            provider.quota_limit if provider.quota_limit is not None else 0,
+            dify_config.HOSTED_QUOTA_LEDGER_CACHE_TTL,
+        )
+        return True
+
+    @classmethod
+    def _deduct_from_database(cls, tenant_id: str, provider_name: str, quota_type: str, amount: int) -> bool:
+        updated = (
+            db.session.query(Provider)
+            .filter(
+                Provider.tenant_id == tenant_id,
+                Provider.provider_name == provider_name,
+                Provider.provider_type == ProviderType.SYSTEM.value,
+                Provider.quota_type == quota_type,
+                Provider.quota_limit > Provider.quota_used,
+            )
+            .update({"quota_used": Provider.quota_used + amount})
+        )
+        db.session.commit()
+        return updated > 0
+
+    @classmethod
+    def _ledger_key(cls, tenant_id: str, provider_name: str, quota_type: str) -> str:
+        return f"{cls._KEY_PREFIX}:{tenant_id}:{provider_name}:{quota_type}"
+
+    @classmethod
+    def _parse_ledger_key(cls, key: str) -> tuple[str, str, str]:
+        _, tenant_id, remainder = key.split(":", 2)
+        provider_name, quota_type = remainder.rsplit(":", 1)
+        return tenant_id, provider_name, quota_type
@@ -4,6 +4,7 @@ Proxy requests to avoid SSRF
 
 import logging
 import time
+from typing import cast
 
 import httpx
 
@@ -21,6 +22,54 @@ class MaxRetriesExceededError(ValueError):
     pass
 
 
+def _build_client() -> httpx.Client:
+    if dify_config.SSRF_PROXY_ALL_URL:
+        return httpx.Client(proxy=dify_config.SSRF_PROXY_ALL_URL)
+    elif dify_config.SSRF_PROXY_HTTP_URL and dify_config.SSRF_PROXY_HTTPS_URL:
+        proxy_mounts = {
+            "http://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTP_URL),
+            "https://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTPS_URL),
+        }
+        return httpx.Client(mounts=proxy_mounts)
+    else:
+        return httpx.Client()
+
+
+class _ClientClosingStream(httpx.SyncByteStream):
+    """Response stream that closes its client once the response is closed."""
+
+    def __init__(self, stream: httpx.SyncByteStream, client: httpx.Client):
+        self._stream = stream
+        self._client = client
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._client.close()
+
+
+def _stream_request(method, url, **kwargs) -> httpx.Response:
+    """
+    Send a request without reading the response body.
+    The body must be read with `iter_bytes()` and the response closed by the caller.
+    """
+    follow_redirects = kwargs.pop("follow_redirects", False)
+    client = _build_client()
+    try:
+        request = client.build_request(method=method, url=url, **kwargs)
+        response = client.send(request, stream=True, follow_redirects=follow_redirects)
+    except Exception:
+        client.close()
+        raise
+
+    response.stream = _ClientClosingStream(cast(httpx.SyncByteStream, response.stream), client)
+    return response
+
+
 def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     if "allow_redirects" in kwargs:
         allow_redirects = kwargs.pop("allow_redirects")
@@ -39,23 +88,16 @@ def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     stream = kwargs.pop("stream", False)
     while retries <= max_retries:
         try:
-            if dify_config.SSRF_PROXY_ALL_URL:
-                with httpx.Client(proxy=dify_config.SSRF_PROXY_ALL_URL) as client:
-                    response = client.request(method=method, url=url, **kwargs)
-            elif dify_config.SSRF_PROXY_HTTP_URL and dify_config.SSRF_PROXY_HTTPS_URL:
-                proxy_mounts = {
-                    "http://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTP_URL),
-                    "https://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTPS_URL),
-                }
-                with httpx.Client(mounts=proxy_mounts) as client:
-                    response = client.request(method=method, url=url, **kwargs)
+            if stream:
+                response = _stream_request(method=method, url=url, **kwargs)
             else:
-                with httpx.Client() as client:
+                with _build_client() as client:
                     response = client.request(method=method, url=url, **kwargs)
 
             if response.status_code not in STATUS_FORCELIST:
                 return response
             else:
+                response.close()
                 logging.warning(f"Received status code {response.status_code} for URL {url} which is in the force list")
 
         except httpx.RequestError as e:
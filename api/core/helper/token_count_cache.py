@@ -0,0 +1,63 @@
+import hashlib
+import logging
+import threading
+from collections.abc import Callable
+from typing import Optional
+
+from cachetools import LRUCache  # type: ignore
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+_token_counts: Optional[LRUCache] = (
+    LRUCache(maxsize=dify_config.TOKEN_COUNT_CACHE_SIZE) if dify_config.TOKEN_COUNT_CACHE_SIZE > 0 else None
+)
+_token_counts_lock = threading.Lock()
+
+
+def get_num_tokens(namespace: str, content: str, count: Callable[[], int]) -> int:
+    """
+    Get the number of tokens of a content, counting them only when they are not cached yet.
+
+    Counts are cached per process by the hash of the content and, with `TOKEN_COUNT_CACHE_REDIS_ENABLED`,
+    shared between processes through Redis. Contents shorter than `TOKEN_COUNT_CACHE_MIN_LENGTH` are
+    always counted, tokenizing them is cheaper than a cache lookup.
+
+    :param namespace: tokenizer or model the content is counted for, e.g. `gpt2`
+    :param content: content to count the tokens of
+    :param count: function counting the tokens of the content
+    :return: number of tokens
+    """
+    if _token_counts is None or len(content) < dify_config.TOKEN_COUNT_CACHE_MIN_LENGTH:
+        return count()
+
+    key = f"token_count:{namespace}:{hashlib.sha256(content.encode()).hexdigest()}"
+    with _token_counts_lock:
+        num_tokens: Optional[int] = _token_counts.get(key)
+    if num_tokens is not None:
+        return num_tokens
+
+    if dify_config.TOKEN_COUNT_CACHE_REDIS_ENABLED:
+        try:
+            cached_num_tokens = redis_client.get(key)
+        except Exception:
+            logger.warning(f"Failed to get token count {key} from redis", exc_info=True)
+            cached_num_tokens = None
+        if cached_num_tokens is not None:
+            num_tokens = int(cached_num_tokens)
+            with _token_counts_lock:
+                _token_counts[key] = num_tokens
+            return num_tokens
+
+    num_tokens = count()
+    with _token_counts_lock:
+        _token_counts[key] = num_tokens
+    if dify_config.TOKEN_COUNT_CACHE_REDIS_ENABLED:
+        try:
+            redis_client.setex(key, dify_config.TOKEN_COUNT_CACHE_REDIS_TTL, num_tokens)
+        except Exception:
+            logger.warning(f"Failed to set token count {key} to redis", exc_info=True)
+
+    return num_tokens
@@ -2,10 +2,13 @@ import concurrent.futures
 import datetime
 import json
 import logging
+import math
 import re
+import statistics
 import threading
 import time
 import uuid
+from pathlib import Path
 from typing import Any, Optional, cast
 
 from flask import current_app
@@ -13,14 +16,16 @@ from flask_login import current_user  # type: ignore
 from sqlalchemy.orm.exc import ObjectDeletedError
 
 from configs import dify_config
-from core.entities.knowledge_entities import IndexingEstimate, PreviewDetail, QAPreviewDetail
+from core.entities.knowledge_entities import IndexingEstimate, PreviewDetail, QAPreviewDetail, SourceIndexingEstimate
 from core.errors.error import ProviderTokenNotInitError
 from core.model_manager import ModelInstance, ModelManager
 from core.model_runtime.entities.model_entities import ModelType
+from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
 from core.rag.cleaner.clean_processor import CleanProcessor
 from core.rag.datasource.keyword.keyword_factory import Keyword
 from core.rag.docstore.dataset_docstore import DatasetDocumentStore
 from core.rag.extractor.entity.extract_setting import ExtractSetting
+from core.rag.extractor.extract_processor import SAMPLEABLE_FILE_EXTENSIONS
 from core.rag.index_processor.constant.index_type import IndexType
 from core.rag.index_processor.index_processor_base import BaseIndexProcessor
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
@@ -276,56 +281,203 @@ class IndexingRunner:
                     tenant_id=tenant_id,
                     model_type=ModelType.TEXT_EMBEDDING,
                 )
-        preview_texts = []  # type: ignore
-
-        total_segments = 0
+        preview_texts: list[PreviewDetail] = []
+        qa_preview_texts: list[QAPreviewDetail] = []
+        total_segments = total_segments_lower = total_segments_upper = 0
+        total_tokens: Optional[int] = 0 if embedding_model_instance else None
+        is_estimated = False
         index_type = doc_form
         index_processor = IndexProcessorFactory(index_type).init_index_processor()
         for extract_setting in extract_settings:
-            # extract
-            processing_rule = DatasetProcessRule(
-                mode=tmp_processing_rule["mode"], rules=json.dumps(tmp_processing_rule["rules"])
-            )
-            text_docs = index_processor.extract(extract_setting, process_rule_mode=tmp_processing_rule["mode"])
-            documents = index_processor.transform(
-                text_docs,
-                embedding_model_instance=embedding_model_instance,
-                process_rule=processing_rule.to_dict(),
-                tenant_id=current_user.current_tenant_id,
+            source_estimate = self._estimate_source(
+                index_processor=index_processor,
+                extract_setting=extract_setting,
+                tmp_processing_rule=tmp_processing_rule,
+                doc_form=doc_form,
                 doc_language=doc_language,
-                preview=True,
+                embedding_model_instance=embedding_model_instance,
             )
-            total_segments += len(documents)
-            for document in documents:
-                if len(preview_texts) < 10:
-                    if doc_form and doc_form == "qa_model":
-                        preview_detail = QAPreviewDetail(
-                            question=document.page_content, answer=document.metadata.get("answer") or ""
-                        )
-                        preview_texts.append(preview_detail)
-                    else:
-                        preview_detail = PreviewDetail(content=document.page_content)  # type: ignore
-                        if document.children:
-                            preview_detail.child_chunks = [child.page_content for child in document.children]  # type: ignore
-                        preview_texts.append(preview_detail)
-
-                # delete image files and related db records
-                image_upload_file_ids = get_image_upload_file_ids(document.page_content)
-                for upload_file_id in image_upload_file_ids:
-                    image_file = db.session.query(UploadFile).filter(UploadFile.id == upload_file_id).first()
-                    try:
-                        if image_file:
-                            storage.delete(image_file.key)
-                    except Exception:
-                        logging.exception(
-                            "Delete image_files failed while indexing_estimate, \
-                                          image_upload_file_is: {}".format(upload_file_id)
-                        )
-                    db.session.delete(image_file)
-
+            total_segments += source_estimate.segments
+            total_segments_lower += source_estimate.segments_lower
+            total_segments_upper += source_estimate.segments_upper
+            if total_tokens is not None and source_estimate.tokens is not None:
+                total_tokens += source_estimate.tokens
+            is_estimated = is_estimated or source_estimate.is_estimated
+            preview_texts.extend(source_estimate.preview[: 10 - len(preview_texts)])
+            qa_preview_texts.extend(source_estimate.qa_preview[: 10 - len(qa_preview_texts)])
+
+        estimate_details: dict[str, Any] = {"total_tokens": total_tokens, "is_estimated": is_estimated}
+        if is_estimated:
+            estimate_details["total_segments_lower"] = total_segments_lower
+            estimate_details["total_segments_upper"] = total_segments_upper
         if doc_form and doc_form == "qa_model":
-            return IndexingEstimate(total_segments=total_segments * 20, qa_preview=preview_texts, preview=[])
-        return IndexingEstimate(total_segments=total_segments, preview=preview_texts)  # type: ignore
+            if is_estimated:
+                estimate_details["total_segments_lower"] *= 20
+                estimate_details["total_segments_upper"] *= 20
+            return IndexingEstimate(
+                total_segments=total_segments * 20, qa_preview=qa_preview_texts, preview=[], **estimate_details
+            )
+        return IndexingEstimate(total_segments=total_segments, preview=preview_texts, **estimate_details)
+
+    def _estimate_source(
+        self,
+        index_processor: BaseIndexProcessor,
+        extract_setting: ExtractSetting,
+        tmp_processing_rule: dict,
+        doc_form: Optional[str],
+        doc_language: str,
+        embedding_model_instance: Optional[ModelInstance],
+    ) -> SourceIndexingEstimate:
+        """
+        Estimate the segments of a source.
+
+        Only the first bytes of large uploaded text files are extracted and split, the counts of
+        the whole file are extrapolated from them. Estimates of uploaded files are cached by file
+        and processing settings.
+        """
+        max_bytes = dify_config.INDEXING_ESTIMATE_SAMPLE_SIZE
+        upload_file = extract_setting.upload_file if extract_setting.datasource_type == "upload_file" else None
+        cache_key = None
+        if upload_file and dify_config.INDEXING_ESTIMATE_CACHE_TTL > 0:
+            settings = {
+                "process_rule": tmp_processing_rule,
+                "doc_form": doc_form,
+                "doc_language": doc_language,
+                "embedding_model": (
+                    [embedding_model_instance.provider, embedding_model_instance.model]
+                    if embedding_model_instance
+                    else None
+                ),
+                "sample_size": max_bytes,
+            }
+            settings_hash = helper.generate_text_hash(json.dumps(settings, sort_keys=True))
+            cache_key = f"indexing_estimate:{upload_file.id}:{settings_hash}"
+            cached_estimate = redis_client.get(cache_key)
+            if cached_estimate:
+                return SourceIndexingEstimate.model_validate_json(cached_estimate)
+
+        sample_ratio = 1.0
+        if (
+            upload_file
+            and max_bytes
+            and upload_file.size > max_bytes
+            and Path(upload_file.key).suffix.lower() in SAMPLEABLE_FILE_EXTENSIONS
+        ):
+            sample_ratio = upload_file.size / max_bytes
+
+        # extract
+        processing_rule = DatasetProcessRule(
+            mode=tmp_processing_rule["mode"], rules=json.dumps(tmp_processing_rule["rules"])
+        )
+        text_docs = index_processor.extract(
+            extract_setting,
+            process_rule_mode=tmp_processing_rule["mode"],
+            max_bytes=max_bytes if sample_ratio > 1 else None,
+        )
+        documents = index_processor.transform(
+            text_docs,
+            embedding_model_instance=embedding_model_instance,
+            process_rule=processing_rule.to_dict(),
+            tenant_id=current_user.current_tenant_id,
+            doc_language=doc_language,
+            preview=True,
+        )
+
+        preview_texts = []
+        qa_preview_texts = []
+        for document in documents[:10]:
+            if doc_form and doc_form == "qa_model":
+                qa_preview_texts.append(
+                    QAPreviewDetail(question=document.page_content, answer=document.metadata.get("answer") or "")
+                )
+            else:
+                preview_detail = PreviewDetail(content=document.page_content)
+                if document.children:
+                    preview_detail.child_chunks = [child.page_content for child in document.children]
+                preview_texts.append(preview_detail)
+
+        for document in documents:
+            # delete image files and related db records
+            image_upload_file_ids = get_image_upload_file_ids(document.page_content)
+            for upload_file_id in image_upload_file_ids:
+                image_file = db.session.query(UploadFile).filter(UploadFile.id == upload_file_id).first()
+                try:
+                    if image_file:
+                        storage.delete(image_file.key)
+                except Exception:
+                    logging.exception(
+                        "Delete image_files failed while indexing_estimate, \
+                                      image_upload_file_is: {}".format(upload_file_id)
+                    )
+                db.session.delete(image_file)
+
+        segments, segments_lower, segments_upper = self._extrapolate_segments(
+            [len(document.page_content) for document in documents], sample_ratio
+        )
+        tokens = None
+        if embedding_model_instance:
+            tokens = self._estimate_tokens(embedding_model_instance, documents, max_bytes or None)
+            tokens = round(tokens * sample_ratio)
+
+        source_estimate = SourceIndexingEstimate(
+            segments=segments,
+            segments_lower=segments_lower,
+            segments_upper=segments_upper,
+            tokens=tokens,
+            is_estimated=sample_ratio > 1,
+            preview=preview_texts,
+            qa_preview=qa_preview_texts,
+        )
+        if cache_key:
+            redis_client.setex(cache_key, dify_config.INDEXING_ESTIMATE_CACHE_TTL, source_estimate.model_dump_json())
+        return source_estimate
+
+    @staticmethod
+    def _extrapolate_segments(segment_lengths: list[int], sample_ratio: float) -> tuple[int, int, int]:
+        """
+        Extrapolate the segment count of a file from the segments of a sample of `1 / sample_ratio` of it.
+
+        The bounds follow from the 95% confidence interval of the mean segment length in the sample.
+        :return: estimated segment count, lower bound, upper bound
+        """
+        count = len(segment_lengths)
+        if sample_ratio <= 1 or count == 0:
+            return count, count, count
+
+        estimate = round(count * sample_ratio)
+        total_length = sum(segment_lengths) * sample_ratio
+        mean_length = sum(segment_lengths) / count
+        margin = 1.96 * statistics.stdev(segment_lengths) / math.sqrt(count) if count > 1 else mean_length
+        lower = math.floor(total_length / (mean_length + margin))
+        upper = math.ceil(total_length / max(mean_length - margin, 1))
+        return estimate, min(lower, estimate), max(upper, estimate)
+
+    @staticmethod
+    def _estimate_tokens(
+        embedding_model_instance: ModelInstance, documents: list[Document], max_length: Optional[int]
+    ) -> int:
+        """
+        Count the embedding tokens of the documents.
+        With a `max_length`, only the first segments up to that length are counted and the rest extrapolated.
+        Tokens are counted by the model provider, or locally with the GPT-2 tokenizer when that fails.
+        """
+        texts: list[str] = []
+        sample_length = 0
+        for document in documents:
+            if max_length and texts and sample_length + len(document.page_content) > max_length:
+                break
+            texts.append(document.page_content)
+            sample_length += len(document.page_content)
+        if not texts:
+            return 0
+
+        try:
+            tokens = embedding_model_instance.get_text_embedding_num_tokens(texts=texts)
+        except Exception:
+            logging.warning("Failed to count embedding tokens with the model provider, counting locally", exc_info=True)
+            tokens = sum(GPT2Tokenizer.get_num_tokens(text) for text in texts)
+        total_length = sum(len(document.page_content) for document in documents)
+        return round(tokens * total_length / max(sample_length, 1))
 
     def _extract(
         self, index_processor: BaseIndexProcessor, dataset_document: DatasetDocument, process_rule: dict
@@ -7,6 +7,7 @@ from core.entities.embedding_type import EmbeddingInputType
 from core.entities.provider_configuration import ProviderConfiguration, ProviderModelBundle
 from core.entities.provider_entities import ModelLoadBalancingConfiguration
 from core.errors.error import ProviderTokenNotInitError
+from core.helper import token_count_cache
 from core.model_runtime.callbacks.base_callback import Callback
 from core.model_runtime.entities.llm_entities import LLMResult
 from core.model_runtime.entities.message_entities import PromptMessage, PromptMessageTool
@@ -154,16 +155,24 @@ class ModelInstance:
             raise Exception("Model type instance is not LargeLanguageModel")
 
         self.model_type_instance = cast(LargeLanguageModel, self.model_type_instance)
-        return cast(
-            int,
-            self._round_robin_invoke(
-                function=self.model_type_instance.get_num_tokens,
-                model=self.model,
-                credentials=self.credentials,
-                prompt_messages=prompt_messages,
-                tools=tools,
-            ),
-        )
+        model_type_instance = self.model_type_instance
+
+        def count() -> int:
+            return cast(
+                int,
+                self._round_robin_invoke(
+                    function=model_type_instance.get_num_tokens,
+                    model=self.model,
+                    credentials=self.credentials,
+                    prompt_messages=prompt_messages,
+                    tools=tools,
+                ),
+            )
+
+        # the same prompt is counted several times while it is built, e.g. for memory and for the rest tokens
+        content = "\n".join(message.model_dump_json() for message in [*prompt_messages, *(tools or [])])
+        namespace = f"{self.provider_model_bundle.configuration.tenant_id}:{self.provider}:{self.model}"
+        return token_count_cache.get_num_tokens(namespace, content, count)
 
     def invoke_text_embedding(
         self, texts: list[str], user: Optional[str] = None, input_type: EmbeddingInputType = EmbeddingInputType.DOCUMENT
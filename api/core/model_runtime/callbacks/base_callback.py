@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
 from collections.abc import Sequence
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from core.model_runtime.entities.llm_entities import LLMResult, LLMResultChunk
 from core.model_runtime.entities.message_entities import PromptMessage, PromptMessageTool
-from core.model_runtime.model_providers.__base.ai_model import AIModel
+
+if TYPE_CHECKING:
+    from core.model_runtime.model_providers.__base.ai_model import AIModel
 
 _TEXT_COLOR_MAPPING = {
     "blue": "36;1",
@@ -23,10 +25,13 @@ class Callback(ABC):
 
     raise_error: bool = False
 
+    # deliver on_new_chunk once per N stream chunks, merged into a single chunk
+    chunk_batch_size: int = 1
+
     @abstractmethod
     def on_before_invoke(
         self,
-        llm_instance: AIModel,
+        llm_instance: "AIModel",
         model: str,
         credentials: dict,
         prompt_messages: list[PromptMessage],
@@ -54,7 +59,7 @@ class Callback(ABC):
     @abstractmethod
     def on_new_chunk(
         self,
-        llm_instance: AIModel,
+        llm_instance: "AIModel",
         chunk: LLMResultChunk,
         model: str,
         credentials: dict,
@@ -84,7 +89,7 @@ class Callback(ABC):
     @abstractmethod
     def on_after_invoke(
         self,
-        llm_instance: AIModel,
+        llm_instance: "AIModel",
         result: LLMResult,
         model: str,
         credentials: dict,
@@ -114,7 +119,7 @@ class Callback(ABC):
     @abstractmethod
     def on_invoke_error(
         self,
-        llm_instance: AIModel,
+        llm_instance: "AIModel",
         ex: Exception,
         model: str,
         credentials: dict,
@@ -5,6 +5,7 @@ from typing import Optional
 
 from pydantic import ConfigDict
 
+from core.helper import token_count_cache
 from core.helper.position_helper import get_position_map, sort_by_position_map
 from core.model_runtime.entities.common_entities import I18nObject
 from core.model_runtime.entities.defaults import PARAMETER_RULE_TEMPLATE
@@ -327,8 +328,9 @@ class AIModel(ABC):
         Some provider models do not provide an interface for obtaining the number of tokens.
         Here, the gpt2 tokenizer is used to calculate the number of tokens.
         This method can be executed offline, and the gpt2 tokenizer has been cached in the project.
+        Counts of long texts are cached, so static system prompts and history messages are only tokenized once.
 
         :param text: plain text of prompt. You need to convert the original message to plain text
         :return: number of tokens
         """
-        return GPT2Tokenizer.get_num_tokens(text)
+        return token_count_cache.get_num_tokens("gpt2", text, lambda: GPT2Tokenizer.get_num_tokens(text))
@@ -27,6 +27,7 @@ from core.model_runtime.entities.model_entities import (
     PriceType,
 )
 from core.model_runtime.model_providers.__base.ai_model import AIModel
+from core.model_runtime.utils.stream_accumulator import ChunkCoalescer, PromptContentBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -420,44 +421,67 @@ if you are not sure about the structure.
         :return: result generator
         """
         callbacks = callbacks or []
-        prompt_message = AssistantPromptMessage(content="")
+        content_builder = PromptContentBuilder()
         usage = None
         system_fingerprint = None
         real_model = model
 
-        try:
-            for chunk in result:
-                yield chunk
+        # callbacks that opted into coalesced delivery receive merged chunks, in their place among the callbacks
+        coalescers = [
+            ChunkCoalescer(callback.chunk_batch_size) if callback.chunk_batch_size > 1 else None
+            for callback in callbacks
+        ]
+        coalesced = any(coalescers)
 
-                self._trigger_new_chunk_callbacks(
-                    chunk=chunk,
-                    model=model,
-                    credentials=credentials,
-                    prompt_messages=prompt_messages,
-                    model_parameters=model_parameters,
-                    tools=tools,
-                    stop=stop,
-                    stream=stream,
-                    user=user,
-                    callbacks=callbacks,
-                )
+        def trigger_chunk_callbacks(chunk: LLMResultChunk, callbacks: list[Callback]) -> None:
+            self._trigger_new_chunk_callbacks(
+                chunk=chunk,
+                model=model,
+                credentials=credentials,
+                prompt_messages=prompt_messages,
+                model_parameters=model_parameters,
+                tools=tools,
+                stop=stop,
+                stream=stream,
+                user=user,
+                callbacks=callbacks,
+            )
 
-                prompt_message.content += chunk.delta.message.content
-                real_model = chunk.model
-                if chunk.delta.usage:
-                    usage = chunk.delta.usage
+        try:
+            try:
+                for chunk in result:
+                    yield chunk
 
-                if chunk.system_fingerprint:
-                    system_fingerprint = chunk.system_fingerprint
-        except Exception as e:
-            raise self._transform_invoke_error(e)
+                    if not coalesced:
+                        trigger_chunk_callbacks(chunk, callbacks)
+                    else:
+                        for callback, coalescer in zip(callbacks, coalescers):
+                            merged_chunk = coalescer.push(chunk) if coalescer else chunk
+                            if merged_chunk:
+                                trigger_chunk_callbacks(merged_chunk, [callback])
+
+                    content_builder.append(chunk.delta.message.content)
+                    real_model = chunk.model
+                    if chunk.delta.usage:
+                        usage = chunk.delta.usage
+
+                    if chunk.system_fingerprint:
+                        system_fingerprint = chunk.system_fingerprint
+            except Exception as e:
+                raise self._transform_invoke_error(e)
+        finally:
+            # buffered chunks are delivered even when the stream fails or is closed early
+            for callback, coalescer in zip(callbacks, coalescers):
+                merged_chunk = coalescer.flush() if coalescer else None
+                if merged_chunk:
+                    trigger_chunk_callbacks(merged_chunk, [callback])
 
         self._trigger_after_invoke_callbacks(
             model=model,
             result=LLMResult(
                 model=real_model,
                 prompt_messages=prompt_messages,
-                message=prompt_message,
+                message=AssistantPromptMessage(content=content_builder.build()),
                 usage=usage or LLMUsage.empty_usage(),
                 system_fingerprint=system_fingerprint,
             ),
@@ -0,0 +1,122 @@
+from collections.abc import Sequence
+from typing import Optional
+
+from core.model_runtime.entities.llm_entities import LLMResultChunk, LLMResultChunkDelta, LLMUsage
+from core.model_runtime.entities.message_entities import (
+    AssistantPromptMessage,
+    PromptMessageContent,
+    TextPromptMessageContent,
+)
+
+
+class PromptContentBuilder:
+    """
+    Accumulate streamed message content and materialize it once.
+
+    Concatenating onto a pydantic model field for every chunk copies the whole
+    text each time, which is quadratic for long generations. Parts are collected
+    in a list instead and joined on ``build``.
+    """
+
+    def __init__(self) -> None:
+        self._text_parts: list[str] = []
+        self._contents: list[PromptMessageContent] = []
+
+    def append(self, content: Optional[str | Sequence[PromptMessageContent]]) -> None:
+        """
+        Append a content delta
+
+        :param content: text or multi-modal content delta
+        """
+        if not content:
+            return
+
+        if isinstance(content, str):
+            self._text_parts.append(content)
+            return
+
+        # keep the order of text and multi-modal parts
+        self._flush_text()
+        self._contents.extend(content)
+
+    def build(self) -> str | list[PromptMessageContent]:
+        """
+        Materialize the accumulated content
+
+        :return: joined text, or a content list when multi-modal parts were streamed
+        """
+        if not self._contents:
+            return "".join(self._text_parts)
+
+        self._flush_text()
+        return list(self._contents)
+
+    def _flush_text(self) -> None:
+        if self._text_parts:
+            self._contents.append(TextPromptMessageContent(data="".join(self._text_parts)))
+            self._text_parts = []
+
+
+class ChunkCoalescer:
+    """
+    Buffer stream chunks for a callback that opted into coalesced delivery.
+
+    Every ``batch_size`` chunks are merged into a single chunk whose message content is
+    the concatenation of the buffered deltas, and whose usage, finish reason and
+    fingerprint are taken from the latest chunk that carried them.
+    """
+
+    def __init__(self, batch_size: int) -> None:
+        self.batch_size = max(batch_size, 1)
+        self._chunks: list[LLMResultChunk] = []
+
+    def push(self, chunk: LLMResultChunk) -> Optional[LLMResultChunk]:
+        """
+        Buffer a chunk
+
+        :param chunk: stream chunk
+        :return: merged chunk when the batch is full, otherwise None
+        """
+        self._chunks.append(chunk)
+        if len(self._chunks) >= self.batch_size:
+            return self.flush()
+
+        return None
+
+    def flush(self) -> Optional[LLMResultChunk]:
+        """
+        Merge and drop the buffered chunks
+
+        :return: merged chunk, or None when nothing is buffered
+        """
+        if not self._chunks:
+            return None
+
+        chunks, self._chunks = self._chunks, []
+        if len(chunks) == 1:
+            return chunks[0]
+
+        builder = PromptContentBuilder()
+        tool_calls: list[AssistantPromptMessage.ToolCall] = []
+        usage: Optional[LLMUsage] = None
+        finish_reason: Optional[str] = None
+        system_fingerprint: Optional[str] = None
+        for chunk in chunks:
+            builder.append(chunk.delta.message.content)
+            tool_calls.extend(chunk.delta.message.tool_calls)
+            usage = chunk.delta.usage or usage
+            finish_reason = chunk.delta.finish_reason or finish_reason
+            system_fingerprint = chunk.system_fingerprint or system_fingerprint
+
+        last = chunks[-1]
+        return LLMResultChunk(
+            model=last.model,
+            prompt_messages=last.prompt_messages,
+            system_fingerprint=system_fingerprint,
+            delta=LLMResultChunkDelta(
+                index=last.delta.index,
+                message=AssistantPromptMessage(content=builder.build(), tool_calls=tool_calls),
+                usage=usage,
+                finish_reason=finish_reason,
+            ),
+        )
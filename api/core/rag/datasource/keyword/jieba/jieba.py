@@ -1,8 +1,13 @@
+import itertools
 import json
+import multiprocessing
 from collections import defaultdict
-from typing import Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional, cast
 
 from pydantic import BaseModel
+from sqlalchemy import JSON, case, update
+from sqlalchemy import cast as sql_cast
 
 from configs import dify_config
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
@@ -14,6 +19,12 @@ from extensions.ext_storage import storage
 from models.dataset import Dataset, DatasetKeywordTable, DocumentSegment
 
 
+def _extract_keywords(texts: list[str], max_keywords_per_chunk: int) -> list[list[str]]:
+    """Extract the keywords of texts, run in worker processes for large batches."""
+    keyword_table_handler = JiebaKeywordTableHandler()
+    return [list(keyword_table_handler.extract_keywords(text, max_keywords_per_chunk)) for text in texts]
+
+
 class KeywordTableConfig(BaseModel):
     max_keywords_per_chunk: int = 10
 
@@ -24,48 +35,40 @@ class Jieba(BaseKeyword):
         self._config = KeywordTableConfig()
 
     def create(self, texts: list[Document], **kwargs) -> BaseKeyword:
+        texts = [text for text in texts if text.metadata is not None]
+        keywords_list = self._extract_keywords_list([text.page_content for text in texts])
+        node_ids = [text.metadata["doc_id"] for text in texts if text.metadata is not None]
+        self._update_segment_keywords_batch(self.dataset.id, dict(zip(node_ids, keywords_list)))
+
         lock_name = "keyword_indexing_lock_{}".format(self.dataset.id)
         with redis_client.lock(lock_name, timeout=600):
-            keyword_table_handler = JiebaKeywordTableHandler()
-            keyword_table = self._get_dataset_keyword_table()
-            for text in texts:
-                keywords = keyword_table_handler.extract_keywords(
-                    text.page_content, self._config.max_keywords_per_chunk
-                )
-                if text.metadata is not None:
-                    self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
-                    keyword_table = self._add_text_to_keyword_table(
-                        keyword_table or {}, text.metadata["doc_id"], list(keywords)
-                    )
+            keyword_table = self._get_dataset_keyword_table() or {}
+            for node_id, keywords in zip(node_ids, keywords_list):
+                keyword_table = self._add_text_to_keyword_table(keyword_table, node_id, keywords)
 
             self._save_dataset_keyword_table(keyword_table)
 
             return self
 
     def add_texts(self, texts: list[Document], **kwargs):
+        given_keywords_list = kwargs.get("keywords_list") or []
+        texts_with_keywords = [
+            (text, given_keywords_list[i] if i < len(given_keywords_list) else None)
+            for i, text in enumerate(texts)
+            if text.metadata is not None
+        ]
+        keywords_list = self._extract_keywords_list(
+            [text.page_content for text, _ in texts_with_keywords],
+            [keywords for _, keywords in texts_with_keywords],
+        )
+        node_ids = [text.metadata["doc_id"] for text, _ in texts_with_keywords if text.metadata is not None]
+        self._update_segment_keywords_batch(self.dataset.id, dict(zip(node_ids, keywords_list)))
+
         lock_name = "keyword_indexing_lock_{}".format(self.dataset.id)
         with redis_client.lock(lock_name, timeout=600):
-            keyword_table_handler = JiebaKeywordTableHandler()
-
-            keyword_table = self._get_dataset_keyword_table()
-            keywords_list = kwargs.get("keywords_list")
-            for i in range(len(texts)):
-                text = texts[i]
-                if keywords_list:
-                    keywords = keywords_list[i]
-                    if not keywords:
-                        keywords = keyword_table_handler.extract_keywords(
-                            text.page_content, self._config.max_keywords_per_chunk
-                        )
-                else:
-                    keywords = keyword_table_handler.extract_keywords(
-                        text.page_content, self._config.max_keywords_per_chunk
-                    )
-                if text.metadata is not None:
-                    self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
-                    keyword_table = self._add_text_to_keyword_table(
-                        keyword_table or {}, text.metadata["doc_id"], list(keywords)
-                    )
+            keyword_table = self._get_dataset_keyword_table() or {}
+            for node_id, keywords in zip(node_ids, keywords_list):
+                keyword_table = self._add_text_to_keyword_table(keyword_table, node_id, keywords)
 
             self._save_dataset_keyword_table(keyword_table)
 
@@ -211,16 +214,60 @@ class Jieba(BaseKeyword):
         return sorted_chunk_indices[:k]
 
     def _update_segment_keywords(self, dataset_id: str, node_id: str, keywords: list[str]):
-        document_segment = (
-            db.session.query(DocumentSegment)
-            .filter(DocumentSegment.dataset_id == dataset_id, DocumentSegment.index_node_id == node_id)
-            .first()
-        )
-        if document_segment:
-            document_segment.keywords = keywords
-            db.session.add(document_segment)
+        self._update_segment_keywords_batch(dataset_id, {node_id: keywords})
+
+    def _update_segment_keywords_batch(self, dataset_id: str, keywords_by_node_id: dict[str, list[str]]):
+        """
+        Write the keywords of segments, with one UPDATE statement per batch of segments.
+        """
+        node_ids = list(keywords_by_node_id)
+        batch_size = dify_config.KEYWORD_UPDATE_BATCH_SIZE
+        for i in range(0, len(node_ids), batch_size):
+            batch = node_ids[i : i + batch_size]
+            db.session.execute(
+                update(DocumentSegment)
+                .where(DocumentSegment.dataset_id == dataset_id, DocumentSegment.index_node_id.in_(batch))
+                .values(
+                    keywords=case(
+                        {node_id: sql_cast(keywords_by_node_id[node_id], JSON) for node_id in batch},
+                        value=DocumentSegment.index_node_id,
+                    )
+                )
+                .execution_options(synchronize_session=False)
+            )
             db.session.commit()
 
+    def _extract_keywords_list(
+        self, texts: list[str], keywords_list: Optional[list[Optional[list[str]]]] = None
+    ) -> list[list[str]]:
+        """
+        Get the keywords of texts, given keywords are used where present and the others extracted.
+
+        Large batches are extracted by up to `KEYWORD_EXTRACT_MAX_WORKERS` processes.
+        """
+        result = [list(keywords) if keywords else None for keywords in (keywords_list or [])]
+        result += [None] * (len(texts) - len(result))
+        missing = [i for i, keywords in enumerate(result) if keywords is None]
+
+        batch_size = dify_config.KEYWORD_UPDATE_BATCH_SIZE
+        batches = [
+            [texts[i] for i in missing[start : start + batch_size]] for start in range(0, len(missing), batch_size)
+        ]
+        workers = min(dify_config.KEYWORD_EXTRACT_MAX_WORKERS, len(batches))
+        if workers > 1 and not multiprocessing.current_process().daemon:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                extracted = list(
+                    itertools.chain.from_iterable(
+                        executor.map(_extract_keywords, batches, itertools.repeat(self._config.max_keywords_per_chunk))
+                    )
+                )
+        else:
+            extracted = _extract_keywords([texts[i] for i in missing], self._config.max_keywords_per_chunk)
+
+        for i, keywords in zip(missing, extracted):
+            result[i] = keywords
+        return cast(list[list[str]], result)
+
     def create_segment_keywords(self, node_id: str, keywords: list[str]):
         keyword_table = self._get_dataset_keyword_table()
         self._update_segment_keywords(self.dataset.id, node_id, keywords)
@@ -228,21 +275,16 @@ class Jieba(BaseKeyword):
         self._save_dataset_keyword_table(keyword_table)
 
     def multi_create_segment_keywords(self, pre_segment_data_list: list):
-        keyword_table_handler = JiebaKeywordTableHandler()
-        keyword_table = self._get_dataset_keyword_table()
-        for pre_segment_data in pre_segment_data_list:
+        keywords_list = self._extract_keywords_list(
+            [pre_segment_data["segment"].content for pre_segment_data in pre_segment_data_list],
+            [pre_segment_data["keywords"] for pre_segment_data in pre_segment_data_list],
+        )
+        keyword_table = self._get_dataset_keyword_table() or {}
+        for pre_segment_data, keywords in zip(pre_segment_data_list, keywords_list):
             segment = pre_segment_data["segment"]
-            if pre_segment_data["keywords"]:
-                segment.keywords = pre_segment_data["keywords"]
-                keyword_table = self._add_text_to_keyword_table(
-                    keyword_table or {}, segment.index_node_id, pre_segment_data["keywords"]
-                )
-            else:
-                keywords = keyword_table_handler.extract_keywords(segment.content, self._config.max_keywords_per_chunk)
-                segment.keywords = list(keywords)
-                keyword_table = self._add_text_to_keyword_table(
-                    keyword_table or {}, segment.index_node_id, list(keywords)
-                )
+            # segments are saved by the caller
+            segment.keywords = keywords
+            keyword_table = self._add_text_to_keyword_table(keyword_table, segment.index_node_id, keywords)
         self._save_dataset_keyword_table(keyword_table)
 
     def update_segment_keywords_index(self, node_id: str, keywords: list[str]):
@@ -7,6 +7,7 @@ from pydantic import BaseModel
 
 from configs import dify_config
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.embedding.embedding_base import Embeddings
@@ -44,7 +45,13 @@ class ChromaVector(BaseVector):
     def __init__(self, collection_name: str, config: ChromaConfig):
         super().__init__(collection_name)
         self._client_config = config
-        self._client = chromadb.HttpClient(**self._client_config.to_chroma_params())
+        self._client = vector_client_registry.get(
+            VectorType.CHROMA,
+            config,
+            create=lambda: chromadb.HttpClient(**config.to_chroma_params()),
+            health_check=lambda client: client.heartbeat() > 0,
+            label=f"{config.host}:{config.port}/{config.tenant}/{config.database}",
+        )
 
     def get_type(self) -> str:
         return VectorType.CHROMA
@@ -93,6 +100,13 @@ class ChromaVector(BaseVector):
         response = collection.get(ids=[id])
         return len(response) > 0
 
+    def get_existing_ids(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+        collection = self._client.get_or_create_collection(self._collection_name)
+        response = collection.get(ids=ids, include=[])
+        return set(response["ids"])
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         collection = self._client.get_or_create_collection(self._collection_name)
         results: QueryResult = collection.query(query_embeddings=query_vector, n_results=kwargs.get("top_k", 4))
@@ -11,6 +11,7 @@ from pydantic import BaseModel, model_validator
 
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.embedding.embedding_base import Embeddings
@@ -44,8 +45,15 @@ class ElasticSearchConfig(BaseModel):
 class ElasticSearchVector(BaseVector):
     def __init__(self, index_name: str, config: ElasticSearchConfig, attributes: list):
         super().__init__(index_name.lower())
-        self._client = self._init_client(config)
-        self._version = self._get_version()
+        # the version is read once per client instead of once per instance, and is shared with it
+        self._client, self._version = vector_client_registry.get(
+            VectorType.ELASTICSEARCH,
+            config,
+            create=lambda: self._init_client_with_version(config),
+            health_check=lambda client_with_version: client_with_version[0].ping(),
+            close=lambda client_with_version: client_with_version[0].close(),
+            label=f"{config.host}:{config.port}",
+        )
         self._check_version()
         self._attributes = attributes
 
@@ -68,8 +76,13 @@ class ElasticSearchVector(BaseVector):
 
         return client
 
-    def _get_version(self) -> str:
-        info = self._client.info()
+    def _init_client_with_version(self, config: ElasticSearchConfig) -> tuple[Elasticsearch, str]:
+        client = self._init_client(config)
+        return client, self._get_version(client)
+
+    @staticmethod
+    def _get_version(client: Elasticsearch) -> str:
+        info = client.info()
         return cast(str, info["version"]["number"])
 
     def _check_version(self):
@@ -97,6 +110,12 @@ class ElasticSearchVector(BaseVector):
     def text_exists(self, id: str) -> bool:
         return bool(self._client.exists(index=self._collection_name, id=id))
 
+    def get_existing_ids(self, ids: list[str]) -> set[str]:
+        if not ids or not self._client.indices.exists(index=self._collection_name):
+            return set()
+        response = self._client.mget(index=self._collection_name, ids=ids, source=False)
+        return {doc["_id"] for doc in response["docs"] if doc.get("found")}
+
     def delete_by_ids(self, ids: list[str]) -> None:
         if not ids:
             return
@@ -66,6 +66,8 @@ class MilvusVector(BaseVector):
     Milvus vector storage implementation.
     """
 
+    upsert_batch_size = 1000
+
     def __init__(self, collection_name: str, config: MilvusConfig):
         super().__init__(collection_name)
         self._client_config = config
@@ -186,6 +188,17 @@ class MilvusVector(BaseVector):
 
         return len(result) > 0
 
+    def get_existing_ids(self, ids: list[str]) -> set[str]:
+        if not ids or not self._client.has_collection(self._collection_name):
+            return set()
+
+        result = self._client.query(
+            collection_name=self._collection_name,
+            filter=f'metadata["doc_id"] in {json.dumps(ids)}',
+            output_fields=[Field.METADATA_KEY.value],
+        )
+        return {item[Field.METADATA_KEY.value]["doc_id"] for item in result}
+
     def field_exists(self, field: str) -> bool:
         """
         Check if a field exists in the collection.
@@ -11,6 +11,7 @@ from pydantic import BaseModel, model_validator
 from configs import dify_config
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.embedding.embedding_base import Embeddings
@@ -60,7 +61,14 @@ class OpenSearchVector(BaseVector):
     def __init__(self, collection_name: str, config: OpenSearchConfig):
         super().__init__(collection_name)
         self._client_config = config
-        self._client = OpenSearch(**config.to_opensearch_params())
+        self._client = vector_client_registry.get(
+            VectorType.OPENSEARCH,
+            config,
+            create=lambda: OpenSearch(**config.to_opensearch_params()),
+            health_check=lambda client: client.ping(),
+            close=lambda client: client.close(),
+            label=f"{config.host}:{config.port}",
+        )
 
     def get_type(self) -> str:
         return VectorType.OPENSEARCH
@@ -141,6 +149,13 @@ class OpenSearchVector(BaseVector):
         except:
             return False
 
+    def get_existing_ids(self, ids: list[str]) -> set[str]:
+        index_name = self._collection_name.lower()
+        if not ids or not self._client.indices.exists(index=index_name):
+            return set()
+        response = self._client.mget(index=index_name, body={"ids": ids}, _source=False)
+        return {doc["_id"] for doc in response["docs"] if doc.get("found")}
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         # Make sure query_vector is a list
         if not isinstance(query_vector, list):
@@ -1,4 +1,5 @@
 import json
+import threading
 import uuid
 from contextlib import contextmanager
 from typing import Any
@@ -9,6 +10,7 @@ from pydantic import BaseModel, model_validator
 
 from configs import dify_config
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import vector_client_registry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.embedding.embedding_base import Embeddings
@@ -63,17 +65,16 @@ USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 """
 
 
-class PGVector(BaseVector):
-    def __init__(self, collection_name: str, config: PGVectorConfig):
-        super().__init__(collection_name)
-        self.pool = self._create_connection_pool(config)
-        self.table_name = f"embedding_{collection_name}"
+class PGVectorConnectionPool:
+    """
+    Thread-safe connection pool shared by all PGVector instances of a config.
 
-    def get_type(self) -> str:
-        return VectorType.PGVECTOR
+    Once `max_connection` connections are in use, callers wait up to `timeout` seconds for a
+    free one instead of failing. Closed connections are replaced when taken from the pool.
+    """
 
-    def _create_connection_pool(self, config: PGVectorConfig):
-        return psycopg2.pool.SimpleConnectionPool(
+    def __init__(self, config: PGVectorConfig, timeout: float = 30):
+        self._pool = psycopg2.pool.ThreadedConnectionPool(
             config.min_connection,
             config.max_connection,
             host=config.host,
@@ -82,16 +83,80 @@ class PGVector(BaseVector):
             password=config.password,
             database=config.database,
         )
+        self._max_connections = config.max_connection
+        self._semaphore = threading.BoundedSemaphore(config.max_connection)
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._waits = 0
+
+    def getconn(self):
+        if not self._semaphore.acquire(blocking=False):
+            with self._lock:
+                self._waits += 1
+            if not self._semaphore.acquire(timeout=self._timeout):
+                raise psycopg2.pool.PoolError("connection pool exhausted")
+
+        try:
+            conn = self._pool.getconn()
+            if conn.closed:
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+        except Exception:
+            self._semaphore.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+        return conn
+
+    def putconn(self, conn) -> None:
+        try:
+            self._pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._semaphore.release()
+
+    def closeall(self) -> None:
+        self._pool.closeall()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"max_connections": self._max_connections, "in_use": self._in_use, "waits": self._waits}
+
+
+class PGVector(BaseVector):
+    upsert_batch_size = 1000
+
+    def __init__(self, collection_name: str, config: PGVectorConfig):
+        super().__init__(collection_name)
+        self.pool = self._create_connection_pool(config)
+        self.table_name = f"embedding_{collection_name}"
+
+    def get_type(self) -> str:
+        return VectorType.PGVECTOR
+
+    def _create_connection_pool(self, config: PGVectorConfig) -> PGVectorConnectionPool:
+        return vector_client_registry.get(
+            VectorType.PGVECTOR,
+            config,
+            create=lambda: PGVectorConnectionPool(config),
+            close=lambda pool: pool.closeall(),
+            label=f"pgvector://{config.host}:{config.port}/{config.database}",
+        )
 
     @contextmanager
     def _get_cursor(self):
         conn = self.pool.getconn()
-        cur = conn.cursor()
         try:
-            yield cur
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+                conn.commit()
         finally:
-            cur.close()
-            conn.commit()
             self.pool.putconn(conn)
 
     def create(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
@@ -125,6 +190,13 @@ class PGVector(BaseVector):
             cur.execute(f"SELECT id FROM {self.table_name} WHERE id = %s", (id,))
             return cur.fetchone() is not None
 
+    def get_existing_ids(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+        with self._get_cursor() as cur:
+            cur.execute(f"SELECT id FROM {self.table_name} WHERE id IN %s", (tuple(ids),))
+            return {str(record[0]) for record in cur}
+
     def get_by_ids(self, ids: list[str]) -> list[Document]:
         with self._get_cursor() as cur:
             cur.execute(f"SELECT meta, text FROM {self.table_name} WHERE id IN %s", (tuple(ids),))
@@ -7,6 +7,9 @@ from core.rag.models.document import Document
 
 
 class BaseVector(ABC):
+    # number of documents embedded and written together when indexing many documents
+    upsert_batch_size = 500
+
     def __init__(self, collection_name: str):
         self._collection_name = collection_name
 
@@ -30,6 +33,14 @@ class BaseVector(ABC):
     def delete_by_ids(self, ids: list[str]) -> None:
         raise NotImplementedError
 
+    def get_existing_ids(self, ids: list[str]) -> set[str]:
+        """
+        Get which of the ids exist in the collection.
+
+        Vector stores that can look up many ids in one request override this, others check each id.
+        """
+        return {id for id in ids if self.text_exists(id)}
+
     def get_ids_by_metadata_field(self, key: str, value: str):
         raise NotImplementedError
 
@@ -50,14 +61,9 @@ class BaseVector(ABC):
         raise NotImplementedError
 
     def _filter_duplicate_texts(self, texts: list[Document]) -> list[Document]:
-        for text in texts.copy():
-            if text.metadata and "doc_id" in text.metadata:
-                doc_id = text.metadata["doc_id"]
-                exists_duplicate_node = self.text_exists(doc_id)
-                if exists_duplicate_node:
-                    texts.remove(text)
-
-        return texts
+        doc_ids = [text.metadata["doc_id"] for text in texts if text.metadata and "doc_id" in text.metadata]
+        existing_ids = self.get_existing_ids(doc_ids) if doc_ids else set()
+        return [text for text in texts if not (text.metadata and text.metadata.get("doc_id") in existing_ids)]
 
     def _get_uuids(self, texts: list[Document]) -> list[str]:
         return [text.metadata["doc_id"] for text in texts if text.metadata and "doc_id" in text.metadata]
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional, TypeVar, cast
+
+from configs import dify_config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Entry:
+    client: Any
+    label: str
+    health_check: Optional[Callable[[Any], bool]]
+    close: Optional[Callable[[Any], Any]]
+    created_at: float = field(default_factory=time.time)
+    checked_at: float = field(default_factory=time.time)
+    uses: int = 0
+    failed_health_checks: int = 0
+
+
+class VectorClientRegistry:
+    """
+    Process-wide registry of vector store clients and connection pools.
+
+    Vector processors are created for every retrieval and indexing call. Instead of opening new
+    connections each time, they get their clients from this registry, where one client is kept per
+    backend config. Clients are checked with their health check at most every
+    `VECTOR_CLIENT_HEALTH_CHECK_INTERVAL` seconds and replaced when unhealthy. Replaced clients are
+    not closed, other threads may still be using them, they are closed when garbage collected.
+
+    Clients are not shared with forked processes, a forked process creates its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self._pid = os.getpid()
+
+    def get(
+        self,
+        backend: str,
+        config: Any,
+        create: Callable[[], T],
+        health_check: Optional[Callable[[T], bool]] = None,
+        close: Optional[Callable[[T], Any]] = None,
+        label: Optional[str] = None,
+    ) -> T:
+        """
+        Get the shared client of a backend config, creating it on first use.
+
+        :param backend: vector store type
+        :param config: backend config, a pydantic model or anything with a stable `repr`
+        :param create: creates the client
+        :param health_check: returns whether a client is still usable
+        :param close: closes the client when the registry is cleared
+        :param label: name of the client in statistics, must not contain credentials
+        """
+        key = self._key(backend, config)
+        with self._lock:
+            self._reset_after_fork()
+            entry = self._entries.get(key)
+
+        if entry is not None and not self._is_healthy(entry):
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry = None
+
+        if entry is None:
+            client = create()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = _Entry(client=client, label=label or backend, health_check=health_check, close=close)
+                    self._entries[key] = entry
+            if entry.client is not client:
+                # another thread created the client first, this one was never shared
+                self._close(_Entry(client=client, label=label or backend, health_check=None, close=close))
+
+        with self._lock:
+            entry.uses += 1
+        return cast(T, entry.client)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """
+        Get the usage of the shared clients, with the statistics of clients that have a `stats` method
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+
+        result = []
+        for entry in entries:
+            stats = {
+                "label": entry.label,
+                "created_at": entry.created_at,
+                "uses": entry.uses,
+                "failed_health_checks": entry.failed_health_checks,
+            }
+            if callable(getattr(entry.client, "stats", None)):
+                stats.update(entry.client.stats())
+            result.append(stats)
+        return result
+
+    def clear(self) -> None:
+        """
+        Close and remove all clients
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._close(entry)
+
+    @staticmethod
+    def _key(backend: str, config: Any) -> str:
+        if hasattr(config, "model_dump_json"):
+            config_repr = config.model_dump_json()
+        else:
+            config_repr = repr(config)
+        # configs contain credentials, they are only kept hashed
+        return backend + ":" + hashlib.sha256(config_repr.encode()).hexdigest()
+
+    def _is_healthy(self, entry: _Entry) -> bool:
+        now = time.time()
+        if entry.health_check is None or now - entry.checked_at < dify_config.VECTOR_CLIENT_HEALTH_CHECK_INTERVAL:
+            return True
+
+        entry.checked_at = now
+        try:
+            healthy = bool(entry.health_check(entry.client))
+        except Exception:
+            logger.warning(f"Health check of vector store client {entry.label} failed", exc_info=True)
+            healthy = False
+        if not healthy:
+            entry.failed_health_checks += 1
+        return healthy
+
+    @staticmethod
+    def _close(entry: _Entry) -> None:
+        if entry.close is None:
+            return
+        try:
+            entry.close(entry.client)
+        except Exception:
+            logger.warning(f"Failed to close vector store client {entry.label}", exc_info=True)
+
+    def _reset_after_fork(self) -> None:
+        # connections of the parent process must not be used, or closed, by a forked process
+        if self._pid != os.getpid():
+            self._entries.clear()
+            self._pid = os.getpid()
+
+
+vector_client_registry = VectorClientRegistry()
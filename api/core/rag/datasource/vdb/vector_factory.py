@@ -1,6 +1,11 @@
+import concurrent.futures
+import logging
+import time
 from abc import ABC, abstractmethod
 from typing import Any, Optional
 
+from flask import Flask, current_app
+
 from configs import dify_config
 from core.model_manager import ModelManager
 from core.model_runtime.entities.model_entities import ModelType
@@ -13,6 +18,11 @@ from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from models.dataset import Dataset, Whitelist
 
+logger = logging.getLogger(__name__)
+
+# number of document ids checked per request to the vector store
+DUPLICATE_CHECK_BATCH_SIZE = 1000
+
 
 class AbstractVectorFactory(ABC):
     @abstractmethod
@@ -153,15 +163,64 @@ class Vector:
 
     def create(self, texts: Optional[list] = None, **kwargs):
         if texts:
-            embeddings = self._embeddings.embed_documents([document.page_content for document in texts])
-            self._vector_processor.create(texts=texts, embeddings=embeddings, **kwargs)
+            self._embed_and_create(texts, **kwargs)
 
     def add_texts(self, documents: list[Document], **kwargs):
         if kwargs.get("duplicate_check", False):
             documents = self._filter_duplicate_texts(documents)
 
-        embeddings = self._embeddings.embed_documents([document.page_content for document in documents])
-        self._vector_processor.create(texts=documents, embeddings=embeddings, **kwargs)
+        self._embed_and_create(documents, **kwargs)
+
+    def _embed_and_create(self, documents: list[Document], **kwargs) -> None:
+        batch_size = self._vector_processor.upsert_batch_size
+        if not dify_config.VECTOR_INDEXING_PIPELINE_ENABLED or len(documents) <= batch_size:
+            embeddings = self._embeddings.embed_documents([document.page_content for document in documents])
+            self._vector_processor.create(texts=documents, embeddings=embeddings, **kwargs)
+            return
+
+        # embed the next batch while the previous one is written to the vector store, so indexing takes
+        # about as long as the slower stage, and only two batches of embeddings are held at a time
+        flask_app = current_app._get_current_object()  # type: ignore
+        started_at = time.perf_counter()
+        embed_seconds = upsert_seconds = 0.0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            upsert_future: Optional[concurrent.futures.Future[float]] = None
+            for start in range(0, len(documents), batch_size):
+                batch = documents[start : start + batch_size]
+                embed_started_at = time.perf_counter()
+                embeddings = self._embeddings.embed_documents([document.page_content for document in batch])
+                embed_seconds += time.perf_counter() - embed_started_at
+
+                if upsert_future is not None:
+                    upsert_seconds += upsert_future.result()
+                upsert_future = executor.submit(
+                    self._upsert_batch, flask_app, batch, embeddings, create=start == 0, **kwargs
+                )
+            if upsert_future is not None:
+                upsert_seconds += upsert_future.result()
+
+        total_seconds = time.perf_counter() - started_at
+        logger.info(
+            f"Indexed {len(documents)} documents into {self._vector_processor.collection_name} "
+            f"in {total_seconds:.2f}s, "
+            f"embedding {len(documents) / max(embed_seconds, 1e-6):.1f} docs/s ({embed_seconds:.2f}s), "
+            f"upserting {len(documents) / max(upsert_seconds, 1e-6):.1f} docs/s ({upsert_seconds:.2f}s)"
+        )
+
+    def _upsert_batch(
+        self, flask_app: Flask, documents: list[Document], embeddings: list[list[float]], create: bool, **kwargs
+    ) -> float:
+        """
+        Write a batch of documents to the vector store, the first batch creates the collection.
+        :return: seconds taken
+        """
+        started_at = time.perf_counter()
+        with flask_app.app_context():
+            if create:
+                self._vector_processor.create(texts=documents, embeddings=embeddings, **kwargs)
+            else:
+                self._vector_processor.add_texts(documents, embeddings, **kwargs)
+        return time.perf_counter() - started_at
 
     def text_exists(self, id: str) -> bool:
         return self._vector_processor.text_exists(id)
@@ -198,16 +257,12 @@ class Vector:
         return CacheEmbedding(embedding_model)
 
     def _filter_duplicate_texts(self, texts: list[Document]) -> list[Document]:
-        for text in texts.copy():
-            if text.metadata is None:
-                continue
-            doc_id = text.metadata["doc_id"]
-            if doc_id:
-                exists_duplicate_node = self.text_exists(doc_id)
-                if exists_duplicate_node:
-                    texts.remove(text)
-
-        return texts
+        doc_ids = [text.metadata["doc_id"] for text in texts if text.metadata and text.metadata.get("doc_id")]
+        existing_ids: set[str] = set()
+        for i in range(0, len(doc_ids), DUPLICATE_CHECK_BATCH_SIZE):
+            existing_ids.update(self._vector_processor.get_existing_ids(doc_ids[i : i + DUPLICATE_CHECK_BATCH_SIZE]))
+
+        return [text for text in texts if not (text.metadata and text.metadata.get("doc_id") in existing_ids)]
 
     def __getattr__(self, name):
         if self._vector_processor is not None:
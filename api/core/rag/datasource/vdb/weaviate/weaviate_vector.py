@@ -164,6 +164,28 @@ class WeaviateVector(BaseVector):
 
         return True
 
+    def get_existing_ids(self, ids: list[str]) -> set[str]:
+        if not ids or not self._client.schema.contains(self._default_schema(self._collection_name)):
+            return set()
+
+        # objects are stored with their doc_id as uuid, each id matches at most one object
+        result = (
+            self._client.query.get(self._collection_name)
+            .with_additional(["id"])
+            .with_where(
+                {
+                    "operator": "Or",
+                    "operands": [{"path": ["id"], "operator": "Equal", "valueText": id} for id in ids],
+                }
+            )
+            .with_limit(len(ids))
+            .do()
+        )
+        if "errors" in result:
+            raise ValueError(f"Error during query: {result['errors']}")
+
+        return {entry["_additional"]["id"] for entry in result["data"]["Get"][self._collection_name]}
+
     def delete_by_ids(self, ids: list[str]) -> None:
         # check whether the index already exists
         schema = self._default_schema(self._collection_name)
@@ -16,7 +16,7 @@ from core.rag.extractor.html_extractor import HtmlExtractor
 from core.rag.extractor.jina_reader_extractor import JinaReaderWebExtractor
 from core.rag.extractor.markdown_extractor import MarkdownExtractor
 from core.rag.extractor.notion_extractor import NotionExtractor
-from core.rag.extractor.pdf_extractor import PdfExtractor
+from core.rag.extractor.pdf_extractor import PdfExtractor, get_upload_file_cache_key
 from core.rag.extractor.text_extractor import TextExtractor
 from core.rag.extractor.unstructured.unstructured_eml_extractor import UnstructuredEmailExtractor
 from core.rag.extractor.unstructured.unstructured_epub_extractor import UnstructuredEpubExtractor
@@ -35,6 +35,8 @@ USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124"
     " Safari/537.36"
 )
+# text formats that can be extracted from the first bytes of a file
+SAMPLEABLE_FILE_EXTENSIONS = {".txt", ".md", ".markdown", ".mdx", ".csv", ".htm", ".html"}
 
 
 class ExtractProcessor:
@@ -88,17 +90,31 @@ class ExtractProcessor:
 
     @classmethod
     def extract(
-        cls, extract_setting: ExtractSetting, is_automatic: bool = False, file_path: Optional[str] = None
+        cls,
+        extract_setting: ExtractSetting,
+        is_automatic: bool = False,
+        file_path: Optional[str] = None,
+        max_bytes: Optional[int] = None,
     ) -> list[Document]:
+        """
+        :param max_bytes: only extract about the first `max_bytes` bytes of uploaded text files,
+            which are read from the storage without downloading the whole file
+        """
         if extract_setting.datasource_type == DatasourceType.FILE.value:
             with tempfile.TemporaryDirectory() as temp_dir:
+                pdf_cache_key = None
                 if not file_path:
                     assert extract_setting.upload_file is not None, "upload_file is required"
                     upload_file: UploadFile = extract_setting.upload_file
                     suffix = Path(upload_file.key).suffix
                     # FIXME mypy: Cannot determine type of 'tempfile._get_candidate_names' better not use it here
                     file_path = f"{temp_dir}/{next(tempfile._get_candidate_names())}{suffix}"  # type: ignore
-                    storage.download(upload_file.key, file_path)
+                    if max_bytes is not None and suffix.lower() in SAMPLEABLE_FILE_EXTENSIONS:
+                        Path(file_path).write_bytes(cls._read_sample(upload_file.key, max_bytes))
+                    else:
+                        storage.download(upload_file.key, file_path)
+                    if dify_config.PDF_EXTRACT_CACHE_ENABLED:
+                        pdf_cache_key = get_upload_file_cache_key(upload_file.tenant_id, upload_file.id)
                 input_file = Path(file_path)
                 file_extension = input_file.suffix.lower()
                 etl_type = dify_config.ETL_TYPE
@@ -110,7 +126,7 @@ class ExtractProcessor:
                     if file_extension in {".xlsx", ".xls"}:
                         extractor = ExcelExtractor(file_path)
                     elif file_extension == ".pdf":
-                        extractor = PdfExtractor(file_path)
+                        extractor = PdfExtractor(file_path, pdf_cache_key)
                     elif file_extension in {".md", ".markdown", ".mdx"}:
                         extractor = (
                             UnstructuredMarkdownExtractor(file_path, unstructured_api_url, unstructured_api_key)
@@ -144,7 +160,7 @@ class ExtractProcessor:
                     if file_extension in {".xlsx", ".xls"}:
                         extractor = ExcelExtractor(file_path)
                     elif file_extension == ".pdf":
-                        extractor = PdfExtractor(file_path)
+                        extractor = PdfExtractor(file_path, pdf_cache_key)
                     elif file_extension in {".md", ".markdown", ".mdx"}:
                         extractor = MarkdownExtractor(file_path, autodetect_encoding=True)
                     elif file_extension in {".htm", ".html"}:
@@ -193,3 +209,12 @@ class ExtractProcessor:
                 raise ValueError(f"Unsupported website provider: {extract_setting.website_info.provider}")
         else:
             raise ValueError(f"Unsupported datasource type: {extract_setting.datasource_type}")
+
+    @staticmethod
+    def _read_sample(filename: str, max_bytes: int) -> bytes:
+        with storage.open(filename) as remote_file:
+            sample = remote_file.read(max_bytes)
+            if remote_file.tell() < remote_file.size:
+                # drop the last, partial line
+                sample = sample[: sample.rfind(b"\n") + 1] or sample
+        return sample
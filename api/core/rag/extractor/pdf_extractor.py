@@ -1,20 +1,68 @@
 """Abstract interface for document loader implementations."""
 
+import json
+import logging
+import multiprocessing
 from collections.abc import Iterator
-from typing import Optional, cast
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
 
+from configs import dify_config
 from core.rag.extractor.blob.blob import Blob
 from core.rag.extractor.extractor_base import BaseExtractor
 from core.rag.models.document import Document
 from extensions.ext_storage import storage
 
+logger = logging.getLogger(__name__)
+
+# number of pages extracted, and cached, together
+PAGE_RANGE_SIZE = 50
+# lists the cached page ranges of a file
+RANGES_INDEX_FILENAME = "ranges.json"
+
+
+def get_upload_file_cache_key(tenant_id: str, upload_file_id: str) -> str:
+    """Storage key prefix of the cached page ranges of an upload file, uploaded files never change."""
+    return f"pdf_pages/{tenant_id}/{upload_file_id}"
+
+
+def _range_cache_filename(start: int, end: int) -> str:
+    return f"pages_{start}_{end}.json"
+
+
+def _extract_pages(pdf_reader: Any, start: int, end: int) -> list[str]:
+    texts = []
+    for page_number in range(start, end):
+        page = pdf_reader[page_number]
+        text_page = page.get_textpage()
+        texts.append(text_page.get_text_range())
+        text_page.close()
+        page.close()
+    return texts
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> list[str]:
+    """Extract the text of pages `start` to `end` (exclusive), run in worker processes."""
+    import pypdfium2  # type: ignore
+
+    pdf_reader = pypdfium2.PdfDocument(file_path, autoclose=True)
+    try:
+        return _extract_pages(pdf_reader, start, end)
+    finally:
+        pdf_reader.close()
+
 
 class PdfExtractor(BaseExtractor):
     """Load pdf files.
 
+    Pages are extracted in ranges of `PAGE_RANGE_SIZE` pages. Large files are split across
+    `PDF_EXTRACT_MAX_WORKERS` processes, and with a `file_cache_key` the text of every range
+    is cached, so extracting the same file again only parses the missing ranges. Cached ranges
+    are listed in an index next to them, which `delete_cache` uses when the file is deleted.
 
     Args:
         file_path: Path to the file to load.
+        file_cache_key: Storage key prefix of the cached page ranges.
     """
 
     def __init__(self, file_path: str, file_cache_key: Optional[str] = None):
@@ -23,25 +71,7 @@ class PdfExtractor(BaseExtractor):
         self._file_cache_key = file_cache_key
 
     def extract(self) -> list[Document]:
-        plaintext_file_exists = False
-        if self._file_cache_key:
-            try:
-                text = cast(bytes, storage.load(self._file_cache_key)).decode("utf-8")
-                plaintext_file_exists = True
-                return [Document(page_content=text)]
-            except FileNotFoundError:
-                pass
-        documents = list(self.load())
-        text_list = []
-        for document in documents:
-            text_list.append(document.page_content)
-        text = "\n\n".join(text_list)
-
-        # save plaintext file for caching
-        if not plaintext_file_exists and self._file_cache_key:
-            storage.save(self._file_cache_key, text.encode("utf-8"))
-
-        return documents
+        return list(self.load())
 
     def load(
         self,
@@ -57,12 +87,94 @@ class PdfExtractor(BaseExtractor):
         with blob.as_bytes_io() as file_path:
             pdf_reader = pypdfium2.PdfDocument(file_path, autoclose=True)
             try:
-                for page_number, page in enumerate(pdf_reader):
-                    text_page = page.get_textpage()
-                    content = text_page.get_text_range()
-                    text_page.close()
-                    page.close()
-                    metadata = {"source": blob.source, "page": page_number}
-                    yield Document(page_content=content, metadata=metadata)
+                page_count = len(pdf_reader)
+                page_ranges = [
+                    (start, min(start + PAGE_RANGE_SIZE, page_count)) for start in range(0, page_count, PAGE_RANGE_SIZE)
+                ]
+                for (start, _), texts in zip(page_ranges, self._extract_page_ranges(blob, pdf_reader, page_ranges)):
+                    for offset, content in enumerate(texts):
+                        metadata = {"source": blob.source, "page": start + offset}
+                        yield Document(page_content=content, metadata=metadata)
             finally:
                 pdf_reader.close()
+
+    def _extract_page_ranges(
+        self, blob: Blob, pdf_reader: Any, page_ranges: list[tuple[int, int]]
+    ) -> Iterator[list[str]]:
+        """Yield the page texts of every range in order, from the cache or freshly extracted."""
+        cached = {page_range: self._load_cached_range(*page_range) for page_range in page_ranges}
+        missing = [page_range for page_range, texts in cached.items() if texts is None]
+        if missing:
+            self._save_cached_ranges(page_ranges)
+
+        extracted: Iterator[list[str]]
+        executor = None
+        workers = min(dify_config.PDF_EXTRACT_MAX_WORKERS, len(missing))
+        if workers > 1 and blob.path and not multiprocessing.current_process().daemon:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            # map keeps the order of the ranges, results are consumed as they complete
+            extracted = executor.map(
+                _extract_page_range,
+                [str(blob.path)] * len(missing),
+                [start for start, _ in missing],
+                [end for _, end in missing],
+            )
+        else:
+            extracted = (_extract_pages(pdf_reader, start, end) for start, end in missing)
+
+        try:
+            for page_range in page_ranges:
+                texts = cached[page_range]
+                if texts is None:
+                    texts = next(extracted)
+                    self._save_cached_range(*page_range, texts)
+                yield texts
+        finally:
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def delete_cache(file_cache_key: str) -> None:
+        """Delete the cached page ranges of a file, listed by the index saved with them."""
+        index_key = f"{file_cache_key}/{RANGES_INDEX_FILENAME}"
+        try:
+            if not storage.exists(index_key):
+                return
+            page_ranges = json.loads(storage.load_once(index_key))
+            storage.delete_many(
+                [f"{file_cache_key}/{_range_cache_filename(start, end)}" for start, end in page_ranges] + [index_key]
+            )
+        except Exception:
+            logger.warning(f"Failed to delete cached pages of {file_cache_key}", exc_info=True)
+
+    def _range_cache_key(self, start: int, end: int) -> str:
+        return f"{self._file_cache_key}/{_range_cache_filename(start, end)}"
+
+    def _save_cached_ranges(self, page_ranges: list[tuple[int, int]]) -> None:
+        # saved before the ranges themselves, so every cached range can be found when the cache is deleted
+        if not self._file_cache_key:
+            return
+        try:
+            storage.save(f"{self._file_cache_key}/{RANGES_INDEX_FILENAME}", json.dumps(page_ranges).encode("utf-8"))
+        except Exception:
+            logger.warning(f"Failed to cache page ranges of {self._file_cache_key}", exc_info=True)
+
+    def _load_cached_range(self, start: int, end: int) -> Optional[list[str]]:
+        if not self._file_cache_key:
+            return None
+        try:
+            texts: list[str] = json.loads(storage.load_once(self._range_cache_key(start, end)))
+            return texts
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning(f"Failed to load cached pages {start}-{end} of {self._file_cache_key}", exc_info=True)
+            return None
+
+    def _save_cached_range(self, start: int, end: int, texts: list[str]) -> None:
+        if not self._file_cache_key:
+            return
+        try:
+            storage.save(self._range_cache_key(start, end), json.dumps(texts).encode("utf-8"))
+        except Exception:
+            logger.warning(f"Failed to cache pages {start}-{end} of {self._file_cache_key}", exc_info=True)
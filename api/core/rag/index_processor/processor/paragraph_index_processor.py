@@ -24,6 +24,7 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
             is_automatic=(
                 kwargs.get("process_rule_mode") == "automatic" or kwargs.get("process_rule_mode") == "hierarchical"
             ),
+            max_bytes=kwargs.get("max_bytes"),
         )
 
         return text_docs
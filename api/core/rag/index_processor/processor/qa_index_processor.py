@@ -31,6 +31,7 @@ class QAIndexProcessor(BaseIndexProcessor):
             is_automatic=(
                 kwargs.get("process_rule_mode") == "automatic" or kwargs.get("process_rule_mode") == "hierarchical"
             ),
+            max_bytes=kwargs.get("max_bytes"),
         )
         return text_docs
 
@@ -5,7 +5,7 @@ import logging
 import os
 import time
 from mimetypes import guess_extension, guess_type
-from typing import Optional, Union
+from typing import IO, Optional, Union
 from uuid import uuid4
 
 import httpx
@@ -86,6 +86,42 @@ class ToolFileManager:
 
         return tool_file
 
+    @staticmethod
+    def create_file_by_stream(
+        *,
+        user_id: str,
+        tenant_id: str,
+        conversation_id: Optional[str],
+        file_stream: IO[bytes],
+        mimetype: str,
+    ) -> ToolFile:
+        """
+        Create a tool file from a binary file object, e.g. a response body spilled to disk
+        """
+        extension = guess_extension(mimetype) or ".bin"
+        unique_name = uuid4().hex
+        filename = f"{unique_name}{extension}"
+        filepath = f"tools/{tenant_id}/{filename}"
+        file_size = file_stream.seek(0, 2)
+        file_stream.seek(0)
+        storage.save_stream(filepath, file_stream)
+
+        tool_file = ToolFile(
+            user_id=user_id,
+            tenant_id=tenant_id,
+            conversation_id=conversation_id,
+            file_key=filepath,
+            mimetype=mimetype,
+            name=filename,
+            size=file_size,
+        )
+
+        db.session.add(tool_file)
+        db.session.commit()
+        db.session.refresh(tool_file)
+
+        return tool_file
+
     @staticmethod
     def create_file_by_url(
         user_id: str,
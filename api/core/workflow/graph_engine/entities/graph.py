@@ -1,8 +1,10 @@
+import threading
 import uuid
 from collections import defaultdict
 from collections.abc import Mapping
 from typing import Any, Optional, cast
 
+from cachetools import LRUCache  # type: ignore
 from pydantic import BaseModel, Field
 
 from configs import dify_config
@@ -32,6 +34,12 @@ class GraphParallel(BaseModel):
     """end to node id"""
 
 
+_compiled_graphs: Optional[LRUCache] = (
+    LRUCache(maxsize=dify_config.WORKFLOW_GRAPH_CACHE_SIZE) if dify_config.WORKFLOW_GRAPH_CACHE_SIZE > 0 else None
+)
+_compiled_graphs_lock = threading.Lock()
+
+
 class Graph(BaseModel):
     root_node_id: str = Field(..., description="root node id of the graph")
     node_ids: list[str] = Field(default_factory=list, description="graph node ids")
@@ -204,6 +212,34 @@ class Graph(BaseModel):
 
         return graph
 
+    @classmethod
+    def init_cached(
+        cls, cache_key: str, graph_config: Mapping[str, Any], root_node_id: Optional[str] = None
+    ) -> "Graph":
+        """
+        Init graph, reusing the graph compiled earlier in this process for the same cache key
+
+        The returned graph is shared between runs and must not be modified.
+
+        :param cache_key: key identifying the graph config, e.g. the workflow hash
+        :param graph_config: graph config
+        :param root_node_id: root node id
+        :return: graph
+        """
+        if _compiled_graphs is None:
+            return cls.init(graph_config=graph_config, root_node_id=root_node_id)
+
+        key = (cache_key, root_node_id)
+        with _compiled_graphs_lock:
+            graph: Optional[Graph] = _compiled_graphs.get(key)
+
+        if graph is None:
+            graph = cls.init(graph_config=graph_config, root_node_id=root_node_id)
+            with _compiled_graphs_lock:
+                _compiled_graphs[key] = graph
+
+        return graph
+
     def add_extra_edge(
         self, source_node_id: str, target_node_id: str, run_condition: Optional[RunCondition] = None
     ) -> None:
@@ -1,7 +1,7 @@
 import mimetypes
 from collections.abc import Sequence
 from email.message import Message
-from typing import Any, Literal, Optional
+from typing import IO, Any, Literal, Optional
 
 import httpx
 from pydantic import BaseModel, Field, ValidationInfo, field_validator
@@ -96,9 +96,25 @@ class Response:
     headers: dict[str, str]
     response: httpx.Response
 
-    def __init__(self, response: httpx.Response):
+    def __init__(
+        self,
+        response: httpx.Response,
+        *,
+        content: Optional[bytes] = None,
+        content_file: Optional[IO[bytes]] = None,
+        content_sample: Optional[bytes] = None,
+    ):
+        """
+        :param response: http response, its body is only read when no content is given
+        :param content: body read from a streamed response
+        :param content_file: file holding the body read from a streamed response
+        :param content_sample: first bytes of the body, used to detect files before the body is read
+        """
         self.response = response
         self.headers = dict(response.headers)
+        self._content = content
+        self._content_file = content_file
+        self._content_sample = content_sample
 
     @property
     def is_file(self):
@@ -132,7 +148,7 @@ class Response:
             # Try to detect if content is text-based by sampling first few bytes
             try:
                 # Sample first 1024 bytes for text detection
-                content_sample = self.response.content[:1024]
+                content_sample = self._content_sample if self._content_sample is not None else self.content[:1024]
                 content_sample.decode("utf-8")
                 # If we can decode as UTF-8 and find common text patterns, likely not a file
                 text_markers = (b"{", b"[", b"<", b"function", b"var ", b"const ", b"let ")
@@ -156,20 +172,42 @@ class Response:
 
     @property
     def text(self) -> str:
-        return self.response.text
+        if self._content is None and self._content_file is None:
+            return self.response.text
+        return self.content.decode(self.response.encoding or "utf-8", errors="replace")
 
     @property
     def content(self) -> bytes:
+        if self._content is not None:
+            return self._content
+        if self._content_file is not None:
+            self._content_file.seek(0)
+            return self._content_file.read()
         return self.response.content
 
+    @property
+    def content_file(self) -> Optional[IO[bytes]]:
+        """
+        File holding the body, rewound to its start, if the body was spilled to disk
+        """
+        if self._content_file is not None:
+            self._content_file.seek(0)
+        return self._content_file
+
     @property
     def status_code(self) -> int:
         return self.response.status_code
 
     @property
     def size(self) -> int:
+        if self._content_file is not None:
+            return self._content_file.seek(0, 2)
         return len(self.content)
 
+    def close(self) -> None:
+        if self._content_file is not None:
+            self._content_file.close()
+
     @property
     def readable_size(self) -> str:
         if self.size < 1024:
@@ -1,4 +1,5 @@
 import json
+import tempfile
 from collections.abc import Mapping
 from copy import deepcopy
 from random import randint
@@ -35,6 +36,11 @@ BODY_TYPE_TO_CONTENT_TYPE = {
     "raw-text": "text/plain",
 }
 
+# size of the chunks the response body is read in
+RESPONSE_CHUNK_SIZE = 64 * 1024
+# number of leading body bytes used to tell files from text
+RESPONSE_SAMPLE_SIZE = 1024
+
 
 class Executor:
     method: Literal[
@@ -244,22 +250,63 @@ class Executor:
         return headers
 
     def _validate_and_parse_response(self, response: httpx.Response) -> Response:
-        executor_response = Response(response)
+        """
+        Read the response body in chunks, aborting as soon as it exceeds the size limit.
+        The body of file responses is spilled to a temporary file instead of being kept in memory.
+        """
+        chunks = response.iter_bytes(chunk_size=RESPONSE_CHUNK_SIZE)
 
+        # buffer the first bytes, they are needed to tell whether the response is a file
+        head = b""
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= RESPONSE_SAMPLE_SIZE:
+                break
+
+        is_file = Response(response, content_sample=head[:RESPONSE_SAMPLE_SIZE]).is_file
         threshold_size = (
-            dify_config.HTTP_REQUEST_NODE_MAX_BINARY_SIZE
-            if executor_response.is_file
-            else dify_config.HTTP_REQUEST_NODE_MAX_TEXT_SIZE
+            dify_config.HTTP_REQUEST_NODE_MAX_BINARY_SIZE if is_file else dify_config.HTTP_REQUEST_NODE_MAX_TEXT_SIZE
         )
-        if executor_response.size > threshold_size:
+
+        # reject bodies announced as too large before downloading them
+        content_length = response.headers.get("content-length", "")
+        if content_length.isdigit() and "content-encoding" not in response.headers:
+            self._check_response_size(is_file=is_file, size=int(content_length), threshold_size=threshold_size)
+
+        size = len(head)
+        self._check_response_size(is_file=is_file, size=size, threshold_size=threshold_size)
+        if not is_file:
+            content = bytearray(head)
+            for chunk in chunks:
+                size += len(chunk)
+                self._check_response_size(is_file=is_file, size=size, threshold_size=threshold_size)
+                content += chunk
+
+            return Response(response, content=bytes(content))
+
+        content_file = tempfile.TemporaryFile()  # noqa: SIM115
+        try:
+            content_file.write(head)
+            for chunk in chunks:
+                size += len(chunk)
+                self._check_response_size(is_file=is_file, size=size, threshold_size=threshold_size)
+                content_file.write(chunk)
+        except Exception:
+            content_file.close()
+            raise
+
+        return Response(response, content_file=content_file, content_sample=head[:RESPONSE_SAMPLE_SIZE])
+
+    @staticmethod
+    def _check_response_size(*, is_file: bool, size: int, threshold_size: int) -> None:
+        if size > threshold_size:
+            readable_size = f"{size / 1024 / 1024:.2f} MB" if size >= 1024 * 1024 else f"{size / 1024:.2f} KB"
             raise ResponseSizeError(
-                f"{'File' if executor_response.is_file else 'Text'} size is too large,"
+                f"{'File' if is_file else 'Text'} size is too large,"
                 f" max size is {threshold_size / 1024 / 1024:.2f} MB,"
-                f" but current size is {executor_response.readable_size}."
+                f" but current size is at least {readable_size}."
             )
 
-        return executor_response
-
     def _do_http_request(self, headers: dict[str, Any]) -> httpx.Response:
         """
         do http request depending on api bundle
@@ -293,6 +340,7 @@ class Executor:
             "timeout": (self.timeout.connect, self.timeout.read, self.timeout.write),
             "follow_redirects": True,
             "max_retries": self.max_retries,
+            "stream": True,
         }
         # request_args = {k: v for k, v in request_args.items() if v is not None}
         try:
@@ -308,7 +356,12 @@ class Executor:
         # do http request
         response = self._do_http_request(headers)
         # validate response
-        return self._validate_and_parse_response(response)
+        try:
+            return self._validate_and_parse_response(response)
+        except httpx.RequestError as e:
+            raise HttpRequestNodeError(str(e))
+        finally:
+            response.close()
 
     def to_log(self):
         url_parts = urlparse(self.url)
@@ -71,7 +71,11 @@ class HttpRequestNode(BaseNode[HttpRequestNodeData]):
             process_data["request"] = http_executor.to_log()
 
             response = http_executor.invoke()
-            files = self.extract_files(url=http_executor.url, response=response)
+            try:
+                files = self.extract_files(url=http_executor.url, response=response)
+            finally:
+                # file bodies are spilled to a temporary file, which is no longer needed once stored
+                response.close()
             if not response.response.is_success and (self.should_continue_on_error or self.should_retry):
                 return NodeRunResult(
                     status=WorkflowNodeExecutionStatus.FAILED,
@@ -172,20 +176,29 @@ class HttpRequestNode(BaseNode[HttpRequestNodeData]):
         files = []
         is_file = response.is_file
         content_type = response.content_type
-        content = response.content
 
         if is_file:
             # Guess file extension from URL or Content-Type header
             filename = url.split("?")[0].split("/")[-1] or ""
             mime_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
 
-            tool_file = ToolFileManager.create_file_by_raw(
-                user_id=self.user_id,
-                tenant_id=self.tenant_id,
-                conversation_id=None,
-                file_binary=content,
-                mimetype=mime_type,
-            )
+            content_file = response.content_file
+            if content_file is not None:
+                tool_file = ToolFileManager.create_file_by_stream(
+                    user_id=self.user_id,
+                    tenant_id=self.tenant_id,
+                    conversation_id=None,
+                    file_stream=content_file,
+                    mimetype=mime_type,
+                )
+            else:
+                tool_file = ToolFileManager.create_file_by_raw(
+                    user_id=self.user_id,
+                    tenant_id=self.tenant_id,
+                    conversation_id=None,
+                    file_binary=response.content,
+                    mimetype=mime_type,
+                )
 
             mapping = {
                 "tool_file_id": tool_file.id,
@@ -71,6 +71,8 @@ def init_app(app: DifyApp) -> Celery:
         "schedule.clean_messages",
         "schedule.mail_clean_document_notify_task",
     ]
+    if dify_config.HOSTED_QUOTA_LEDGER_ENABLED:
+        imports.append("schedule.reconcile_provider_quota_task")
     day = dify_config.CELERY_BEAT_SCHEDULER_TIME
     beat_schedule = {
         "clean_embedding_cache_task": {
@@ -99,6 +101,11 @@ def init_app(app: DifyApp) -> Celery:
             "schedule": crontab(minute="0", hour="10", day_of_week="1"),
         },
     }
+    if dify_config.HOSTED_QUOTA_LEDGER_ENABLED:
+        beat_schedule["reconcile_provider_quota_task"] = {
+            "task": "schedule.reconcile_provider_quota_task.reconcile_provider_quota_task",
+            "schedule": timedelta(seconds=dify_config.HOSTED_QUOTA_LEDGER_RECONCILE_INTERVAL),
+        }
     celery_app.conf.update(beat_schedule=beat_schedule, imports=imports)
 
     return celery_app
@@ -1,12 +1,13 @@
 import logging
 from collections.abc import Callable, Generator
-from typing import Literal, Union, overload
+from typing import IO, Literal, Union, overload
 
 from flask import Flask
 
 from configs import dify_config
 from dify_app import DifyApp
 from extensions.storage.base_storage import BaseStorage
+from extensions.storage.remote_file import DEFAULT_BLOCK_SIZE, RemoteFile
 from extensions.storage.storage_type import StorageType
 
 logger = logging.getLogger(__name__)
@@ -18,6 +19,19 @@ class Storage:
         with app.app_context():
             self.storage_runner = storage_factory()
 
+        if dify_config.STORAGE_CACHE_ENABLED:
+            from extensions.ext_redis import redis_client
+            from extensions.storage.cached_storage import CachedStorage
+
+            self.storage_runner = CachedStorage(
+                self.storage_runner,
+                cache_dir=dify_config.STORAGE_CACHE_PATH,
+                max_size=dify_config.STORAGE_CACHE_MAX_SIZE * 1024 * 1024,
+                max_file_size=dify_config.STORAGE_CACHE_MAX_FILE_SIZE * 1024 * 1024,
+                ttl=dify_config.STORAGE_CACHE_TTL,
+                redis_client=redis_client,
+            )
+
     @staticmethod
     def get_storage_factory(storage_type: str) -> Callable[[], BaseStorage]:
         match storage_type:
@@ -79,6 +93,13 @@ class Storage:
             logger.exception(f"Failed to save file {filename}")
             raise e
 
+    def save_stream(self, filename: str, stream: IO[bytes]):
+        try:
+            self.storage_runner.save_stream(filename, stream)
+        except Exception as e:
+            logger.exception(f"Failed to save_stream file {filename}")
+            raise e
+
     @overload
     def load(self, filename: str, /, *, stream: Literal[False] = False) -> bytes: ...
 
@@ -109,6 +130,30 @@ class Storage:
             logger.exception(f"Failed to load_stream file {filename}")
             raise e
 
+    def load_range(self, filename: str, start: int, end: int) -> bytes:
+        try:
+            return self.storage_runner.load_range(filename, start, end)
+        except Exception as e:
+            logger.exception(f"Failed to load_range file {filename}")
+            raise e
+
+    def get_size(self, filename: str) -> int:
+        try:
+            return self.storage_runner.get_size(filename)
+        except Exception as e:
+            logger.exception(f"Failed to get_size file {filename}")
+            raise e
+
+    def open(self, filename: str, block_size: int = DEFAULT_BLOCK_SIZE) -> RemoteFile:
+        """
+        Open a file for reading, its content is loaded in blocks as it is read.
+        """
+        try:
+            return RemoteFile(self.storage_runner, filename, block_size=block_size)
+        except Exception as e:
+            logger.exception(f"Failed to open file {filename}")
+            raise e
+
     def download(self, filename, target_filepath):
         try:
             self.storage_runner.download(filename, target_filepath)
@@ -130,6 +175,19 @@ class Storage:
             logger.exception(f"Failed to delete file {filename}")
             raise e
 
+    def delete_many(self, filenames: list[str]) -> list[str]:
+        """
+        Delete files in batches, returning the names of the files that could not be deleted.
+        """
+        try:
+            failed = self.storage_runner.delete_many(filenames)
+        except Exception as e:
+            logger.exception(f"Failed to delete {len(filenames)} files")
+            raise e
+        if failed:
+            logger.warning(f"Failed to delete {len(failed)} of {len(filenames)} files: {failed[:10]}")
+        return failed
+
 
 storage = Storage()
 
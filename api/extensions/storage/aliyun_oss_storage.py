@@ -1,5 +1,6 @@
 import posixpath
 from collections.abc import Generator
+from typing import IO
 
 import oss2 as aliyun_s3  # type: ignore
 
@@ -31,6 +32,10 @@ class AliyunOssStorage(BaseStorage):
     def save(self, filename, data):
         self.client.put_object(self.__wrapper_folder_filename(filename), data)
 
+    def save_stream(self, filename: str, stream: IO[bytes]) -> None:
+        # file objects are sent with chunked transfer encoding
+        self.client.put_object(self.__wrapper_folder_filename(filename), stream)
+
     def load_once(self, filename: str) -> bytes:
         obj = self.client.get_object(self.__wrapper_folder_filename(filename))
         data: bytes = obj.read()
@@ -41,6 +46,22 @@ class AliyunOssStorage(BaseStorage):
         while chunk := obj.read(4096):
             yield chunk
 
+    def load_range(self, filename: str, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        # with the standard range behavior ranges past the end of the file are truncated,
+        # instead of the whole file being returned
+        obj = self.client.get_object(
+            self.__wrapper_folder_filename(filename),
+            byte_range=(start, end - 1),
+            headers={"x-oss-range-behavior": "standard"},
+        )
+        data: bytes = obj.read()
+        return data
+
+    def get_size(self, filename: str) -> int:
+        return int(self.client.head_object(self.__wrapper_folder_filename(filename)).content_length)
+
     def download(self, filename: str, target_filepath):
         self.client.get_object_to_file(self.__wrapper_folder_filename(filename), target_filepath)
 
@@ -50,5 +71,16 @@ class AliyunOssStorage(BaseStorage):
     def delete(self, filename: str):
         self.client.delete_object(self.__wrapper_folder_filename(filename))
 
+    def delete_many(self, filenames: list[str]) -> list[str]:
+        failed = []
+        # a delete multiple objects request deletes at most 1000 keys
+        for i in range(0, len(filenames), 1000):
+            keys = filenames[i : i + 1000]
+            try:
+                self.client.batch_delete_objects([self.__wrapper_folder_filename(key) for key in keys])
+            except aliyun_s3.exceptions.OssError:
+                failed.extend(keys)
+        return failed
+
     def __wrapper_folder_filename(self, filename: str) -> str:
         return posixpath.join(self.folder, filename) if self.folder else filename
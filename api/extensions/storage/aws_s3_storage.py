@@ -1,5 +1,6 @@
 import logging
 from collections.abc import Generator
+from typing import IO
 
 import boto3  # type: ignore
 from botocore.client import Config  # type: ignore
@@ -51,6 +52,10 @@ class AwsS3Storage(BaseStorage):
     def save(self, filename, data):
         self.client.put_object(Bucket=self.bucket_name, Key=filename, Body=data)
 
+    def save_stream(self, filename: str, stream: IO[bytes]) -> None:
+        # large files are uploaded in parts by the managed transfer of boto3
+        self.client.upload_fileobj(stream, self.bucket_name, filename)
+
     def load_once(self, filename: str) -> bytes:
         try:
             data: bytes = self.client.get_object(Bucket=self.bucket_name, Key=filename)["Body"].read()
@@ -73,6 +78,31 @@ class AwsS3Storage(BaseStorage):
             else:
                 raise
 
+    def load_range(self, filename: str, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        try:
+            response = self.client.get_object(Bucket=self.bucket_name, Key=filename, Range=f"bytes={start}-{end - 1}")
+        except ClientError as ex:
+            if ex.response["Error"]["Code"] == "NoSuchKey":
+                raise FileNotFoundError("File not found")
+            elif ex.response["Error"]["Code"] == "InvalidRange":
+                return b""
+            else:
+                raise
+        data: bytes = response["Body"].read()
+        return data
+
+    def get_size(self, filename: str) -> int:
+        try:
+            response = self.client.head_object(Bucket=self.bucket_name, Key=filename)
+        except ClientError as ex:
+            if ex.response["Error"]["Code"] in {"404", "NoSuchKey"}:
+                raise FileNotFoundError("File not found")
+            else:
+                raise
+        return int(response["ContentLength"])
+
     def download(self, filename, target_filepath):
         self.client.download_file(self.bucket_name, filename, target_filepath)
 
@@ -85,3 +115,19 @@ class AwsS3Storage(BaseStorage):
 
     def delete(self, filename):
         self.client.delete_object(Bucket=self.bucket_name, Key=filename)
+
+    def delete_many(self, filenames: list[str]) -> list[str]:
+        failed = []
+        # a delete objects request deletes at most 1000 keys
+        for i in range(0, len(filenames), 1000):
+            keys = filenames[i : i + 1000]
+            try:
+                response = self.client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+                )
+            except ClientError:
+                failed.extend(keys)
+                continue
+            failed.extend(error["Key"] for error in response.get("Errors", []))
+        return failed
@@ -1,7 +1,8 @@
 from collections.abc import Generator
 from datetime import UTC, datetime, timedelta
-from typing import Optional
+from typing import IO, Optional
 
+from azure.core.exceptions import AzureError
 from azure.identity import ChainedTokenCredential, DefaultAzureCredential
 from azure.storage.blob import AccountSasPermissions, BlobServiceClient, ResourceTypes, generate_account_sas
 
@@ -31,6 +32,12 @@ class AzureBlobStorage(BaseStorage):
         blob_container = client.get_container_client(container=self.bucket_name)
         blob_container.upload_blob(filename, data)
 
+    def save_stream(self, filename: str, stream: IO[bytes]) -> None:
+        # large files are uploaded in blocks by the blob client
+        client = self._sync_client()
+        blob_container = client.get_container_client(container=self.bucket_name)
+        blob_container.upload_blob(filename, stream)
+
     def load_once(self, filename: str) -> bytes:
         client = self._sync_client()
         blob = client.get_container_client(container=self.bucket_name)
@@ -44,6 +51,22 @@ class AzureBlobStorage(BaseStorage):
         blob_data = blob.download_blob()
         yield from blob_data.chunks()
 
+    def load_range(self, filename: str, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        client = self._sync_client()
+        blob = client.get_blob_client(container=self.bucket_name, blob=filename)
+        size = blob.get_blob_properties().size
+        if start >= size:
+            return b""
+        data: bytes = blob.download_blob(offset=start, length=min(end, size) - start).readall()
+        return data
+
+    def get_size(self, filename: str) -> int:
+        client = self._sync_client()
+        blob = client.get_blob_client(container=self.bucket_name, blob=filename)
+        return int(blob.get_blob_properties().size)
+
     def download(self, filename, target_filepath):
         client = self._sync_client()
 
@@ -64,6 +87,27 @@ class AzureBlobStorage(BaseStorage):
         blob_container = client.get_container_client(container=self.bucket_name)
         blob_container.delete_blob(filename)
 
+    def delete_many(self, filenames: list[str]) -> list[str]:
+        client = self._sync_client()
+        blob_container = client.get_container_client(container=self.bucket_name)
+
+        failed = []
+        # a blob batch request deletes at most 256 blobs
+        for i in range(0, len(filenames), 256):
+            names = filenames[i : i + 256]
+            try:
+                responses = blob_container.delete_blobs(*names, raise_on_any_failure=False)
+            except AzureError:
+                failed.extend(names)
+                continue
+            # blobs that do not exist are already deleted
+            failed.extend(
+                name
+                for name, response in zip(names, responses)
+                if response.status_code >= 300 and response.status_code != 404
+            )
+        return failed
+
     def _sync_client(self):
         if self.account_key == "managedidentity":
             return BlobServiceClient(account_url=self.account_url, credential=self.credential)  # type: ignore
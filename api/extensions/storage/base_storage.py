@@ -2,6 +2,7 @@
 
 from abc import ABC, abstractmethod
 from collections.abc import Generator
+from typing import IO
 
 
 class BaseStorage(ABC):
@@ -11,6 +12,15 @@ class BaseStorage(ABC):
     def save(self, filename, data):
         raise NotImplementedError
 
+    def save_stream(self, filename: str, stream: IO[bytes]) -> None:
+        """
+        Save the content of a binary file object.
+
+        Storages that support multipart or chunked uploads override this, so the
+        content is never held in memory as a whole. Others fall back to `save`.
+        """
+        self.save(filename, stream.read())
+
     @abstractmethod
     def load_once(self, filename: str) -> bytes:
         raise NotImplementedError
@@ -19,6 +29,22 @@ class BaseStorage(ABC):
     def load_stream(self, filename: str) -> Generator:
         raise NotImplementedError
 
+    def load_range(self, filename: str, start: int, end: int) -> bytes:
+        """
+        Load the bytes from `start` to `end` (exclusive) of a file.
+
+        Storages that support range requests override this, others load the whole file.
+        """
+        return self.load_once(filename)[start:end]
+
+    def get_size(self, filename: str) -> int:
+        """
+        Get the size of a file in bytes.
+
+        Storages that can read file metadata override this, others load the whole file.
+        """
+        return len(self.load_once(filename))
+
     @abstractmethod
     def download(self, filename, target_filepath):
         raise NotImplementedError
@@ -30,3 +56,17 @@ class BaseStorage(ABC):
     @abstractmethod
     def delete(self, filename):
         raise NotImplementedError
+
+    def delete_many(self, filenames: list[str]) -> list[str]:
+        """
+        Delete files, returning the names of the files that could not be deleted.
+
+        Storages with batch delete requests override this, others delete the files one by one.
+        """
+        failed = []
+        for filename in filenames:
+            try:
+                self.delete(filename)
+            except Exception:
+                failed.append(filename)
+        return failed
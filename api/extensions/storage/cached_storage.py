@@ -0,0 +1,311 @@
+import hashlib
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Generator
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from extensions.storage.base_storage import BaseStorage
+
+logger = logging.getLogger(__name__)
+
+
+class CachedStorage(BaseStorage):
+    """
+    Read-through cache on local disk in front of another storage.
+
+    Files loaded with `load_once` are kept in the cache directory, named by the hash of
+    their storage key, and evicted least recently used first once the cache exceeds its
+    size. Cached files are used for at most `ttl` seconds.
+
+    Saving or deleting a file through this storage invalidates its cached copy. When a
+    Redis client is given, the invalidation is also recorded there for `ttl` seconds, so
+    caches of other processes and hosts stop using their copies too.
+
+    Every process caches files in its own subdirectory of the cache directory, so `max_size`
+    applies per process. Subdirectories of processes of this host that no longer run are removed.
+    """
+
+    _INVALIDATION_KEY_PREFIX = "storage_cache_invalidated_at:"
+
+    def __init__(
+        self,
+        storage: BaseStorage,
+        cache_dir: str,
+        max_size: int,
+        max_file_size: int,
+        ttl: int,
+        redis_client: Optional[Any] = None,
+    ):
+        """
+        :param storage: storage to cache
+        :param cache_dir: local directory of the cache
+        :param max_size: maximum total size of the files cached by a process in bytes
+        :param max_file_size: maximum size in bytes of a single cached file
+        :param ttl: seconds a cached file is used for
+        :param redis_client: redis client to share invalidations with other caches
+        """
+        self.storage = storage
+        self.root_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.max_file_size = max_file_size
+        self.ttl = ttl
+        self.redis_client = redis_client
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # cache key -> file size, ordered from least to most recently used
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        with self._lock:
+            self._init_process_dir()
+
+    def save(self, filename, data):
+        self._invalidate(filename)
+        self.storage.save(filename, data)
+        self._invalidate(filename, broadcast=True)
+
+    def save_stream(self, filename: str, stream: IO[bytes]) -> None:
+        self._invalidate(filename)
+        self.storage.save_stream(filename, stream)
+        self._invalidate(filename, broadcast=True)
+
+    def load_once(self, filename: str) -> bytes:
+        key = self._cache_key(filename)
+        if self._is_fresh(key):
+            try:
+                data = self._cache_path(key).read_bytes()
+            except FileNotFoundError:
+                self._remove_entry(key)
+            else:
+                self._count(hit=True)
+                return data
+
+        self._count(hit=False)
+        loaded_at = time.time()
+        data = self.storage.load_once(filename)
+        self._put(key, data, loaded_at)
+        return data
+
+    def load_stream(self, filename: str) -> Generator:
+        key = self._cache_key(filename)
+        if self._is_fresh(key):
+            try:
+                file = self._cache_path(key).open("rb")
+            except FileNotFoundError:
+                self._remove_entry(key)
+            else:
+                self._count(hit=True)
+                return self._read_chunks(file)
+
+        # streamed files are usually large, they are not added to the cache
+        self._count(hit=False)
+        return self.storage.load_stream(filename)
+
+    def load_range(self, filename: str, start: int, end: int) -> bytes:
+        key = self._cache_key(filename)
+        if self._is_fresh(key):
+            try:
+                with self._cache_path(key).open("rb") as file:
+                    file.seek(start)
+                    data = file.read(max(end - start, 0))
+            except FileNotFoundError:
+                self._remove_entry(key)
+            else:
+                self._count(hit=True)
+                return data
+
+        # ranges are read from files too large to load, they are not added to the cache
+        self._count(hit=False)
+        return self.storage.load_range(filename, start, end)
+
+    def get_size(self, filename: str) -> int:
+        key = self._cache_key(filename)
+        if self._is_fresh(key):
+            try:
+                return self._cache_path(key).stat().st_size
+            except FileNotFoundError:
+                self._remove_entry(key)
+
+        return self.storage.get_size(filename)
+
+    def download(self, filename, target_filepath):
+        key = self._cache_key(filename)
+        if self._is_fresh(key):
+            try:
+                shutil.copyfile(self._cache_path(key), target_filepath)
+            except FileNotFoundError:
+                self._remove_entry(key)
+            else:
+                self._count(hit=True)
+                return
+
+        self._count(hit=False)
+        self.storage.download(filename, target_filepath)
+
+    def exists(self, filename):
+        return self.storage.exists(filename)
+
+    def delete(self, filename):
+        self._invalidate(filename)
+        result = self.storage.delete(filename)
+        self._invalidate(filename, broadcast=True)
+        return result
+
+    def delete_many(self, filenames: list[str]) -> list[str]:
+        for filename in filenames:
+            self._invalidate(filename)
+        failed = self.storage.delete_many(filenames)
+        for filename in filenames:
+            self._invalidate(filename, broadcast=True)
+        return failed
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get hit/miss counts and usage of the cache
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "files": len(self._entries),
+                "size": self._size,
+            }
+
+    @staticmethod
+    def _cache_key(filename: str) -> str:
+        return hashlib.sha256(filename.encode()).hexdigest()
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    @staticmethod
+    def _read_chunks(file) -> Generator:
+        with file:
+            while chunk := file.read(4096):
+                yield chunk
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _init_process_dir(self) -> None:
+        self._pid = os.getpid()
+        self.cache_dir = self.root_dir / f"{self._process_dir_prefix()}{self._pid}"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entries.clear()
+        self._size = 0
+        self._remove_stale_process_dirs()
+        self._load_entries()
+
+    def _reset_after_fork(self) -> None:
+        # a forked process gets its own directory, the files of the parent process are counted by the parent
+        if self._pid != os.getpid():
+            self._init_process_dir()
+
+    @staticmethod
+    def _process_dir_prefix() -> str:
+        return f"{socket.gethostname()}-"
+
+    @staticmethod
+    def _is_process_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _remove_stale_process_dirs(self) -> None:
+        prefix = self._process_dir_prefix()
+        for path in self.root_dir.iterdir():
+            pid = path.name.removeprefix(prefix)
+            if not path.is_dir() or pid == path.name or not pid.isdigit():
+                continue
+            if int(pid) != self._pid and not self._is_process_alive(int(pid)):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _load_entries(self) -> None:
+        # files left by a previous process with the same pid are reused, oldest first in eviction order
+        files = [path for path in self.cache_dir.iterdir() if path.is_file() and not path.name.startswith(".")]
+        for path in sorted(files, key=lambda path: path.stat().st_mtime):
+            size = path.stat().st_size
+            self._entries[path.name] = size
+            self._size += size
+        self._evict()
+
+    def _is_fresh(self, key: str) -> bool:
+        with self._lock:
+            self._reset_after_fork()
+            if key not in self._entries:
+                return False
+            self._entries.move_to_end(key)
+
+        # the modification time of a cached file is the time it was loaded from the storage
+        try:
+            loaded_at = self._cache_path(key).stat().st_mtime
+        except FileNotFoundError:
+            self._remove_entry(key)
+            return False
+
+        invalidated_at = None
+        if self.redis_client is not None:
+            invalidated_at = self.redis_client.get(self._INVALIDATION_KEY_PREFIX + key)
+
+        if time.time() - loaded_at > self.ttl or (invalidated_at is not None and float(invalidated_at) >= loaded_at):
+            self._remove_entry(key)
+            return False
+
+        return True
+
+    def _put(self, key: str, data: bytes, loaded_at: float) -> None:
+        if len(data) > self.max_file_size or len(data) > self.max_size:
+            return
+
+        with self._lock:
+            self._reset_after_fork()
+
+        try:
+            # write to a temporary file first, so readers never see a partially written file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.utime(tmp_path, (loaded_at, loaded_at))
+            os.replace(tmp_path, self._cache_path(key))
+        except OSError:
+            logger.warning(f"Failed to write storage cache file {key}", exc_info=True)
+            return
+
+        with self._lock:
+            self._size += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size > self.max_size and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self._cache_path(key).unlink(missing_ok=True)
+
+    def _remove_entry(self, key: str) -> None:
+        with self._lock:
+            self._reset_after_fork()
+            self._size -= self._entries.pop(key, 0)
+        self._cache_path(key).unlink(missing_ok=True)
+
+    def _invalidate(self, filename: str, broadcast: bool = False) -> None:
+        key = self._cache_key(filename)
+        self._remove_entry(key)
+        if broadcast and self.redis_client is not None:
+            self.redis_client.set(self._INVALIDATION_KEY_PREFIX + key, time.time(), ex=self.ttl)
@@ -3,6 +3,7 @@ import io
 import json
 from collections.abc import Generator
 
+from google.api_core.exceptions import NotFound  # type: ignore
 from google.cloud import storage as google_cloud_storage  # type: ignore
 
 from configs import dify_config
@@ -58,3 +59,24 @@ class GoogleCloudStorage(BaseStorage):
     def delete(self, filename):
         bucket = self.client.get_bucket(self.bucket_name)
         bucket.delete_blob(filename)
+
+    def delete_many(self, filenames: list[str]) -> list[str]:
+        bucket = self.client.get_bucket(self.bucket_name)
+        failed = []
+        # a batch request holds at most 100 calls
+        for i in range(0, len(filenames), 100):
+            names = filenames[i : i + 100]
+            try:
+                with self.client.batch():
+                    for name in names:
+                        bucket.delete_blob(name)
+            except Exception:
+                # a batch fails as a whole, including for blobs that do not exist anymore
+                for name in names:
+                    try:
+                        bucket.delete_blob(name)
+                    except NotFound:
+                        pass
+                    except Exception:
+                        failed.append(name)
+        return failed
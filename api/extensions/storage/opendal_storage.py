@@ -2,6 +2,7 @@ import logging
 import os
 from collections.abc import Generator
 from pathlib import Path
+from typing import IO
 
 import opendal  # type: ignore[import]
 from dotenv import dotenv_values
@@ -44,6 +45,13 @@ class OpenDALStorage(BaseStorage):
         self.op.write(path=filename, bs=data)
         logger.debug(f"file {filename} saved")
 
+    def save_stream(self, filename: str, stream: IO[bytes]) -> None:
+        batch_size = 1024 * 1024
+        with self.op.open(path=filename, mode="wb") as file:
+            while chunk := stream.read(batch_size):
+                file.write(chunk)
+        logger.debug(f"file {filename} saved as stream")
+
     def load_once(self, filename: str) -> bytes:
         if not self.exists(filename):
             raise FileNotFoundError("File not found")
@@ -62,6 +70,24 @@ class OpenDALStorage(BaseStorage):
             yield chunk
         logger.debug(f"file {filename} loaded as stream")
 
+    def load_range(self, filename: str, start: int, end: int) -> bytes:
+        if not self.exists(filename):
+            raise FileNotFoundError("File not found")
+        if end <= start:
+            return b""
+
+        with self.op.open(path=filename, mode="rb") as file:
+            file.seek(start)
+            content: bytes = file.read(end - start)
+        logger.debug(f"file {filename} loaded from {start} to {end}")
+        return content
+
+    def get_size(self, filename: str) -> int:
+        if not self.exists(filename):
+            raise FileNotFoundError("File not found")
+
+        return int(self.op.stat(path=filename).content_length)
+
     def download(self, filename: str, target_filepath: str):
         if not self.exists(filename):
             raise FileNotFoundError("File not found")
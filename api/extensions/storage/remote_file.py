@@ -0,0 +1,107 @@
+import io
+from collections import OrderedDict
+from typing import Optional
+
+from extensions.storage.base_storage import BaseStorage
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+DEFAULT_MAX_BLOCKS = 16
+
+
+class RemoteFile(io.RawIOBase):
+    """
+    Read-only, seekable file object over a file in a storage.
+
+    Content is loaded with range reads in blocks of `block_size` bytes, and the most recently
+    used `max_blocks` blocks are kept in memory. Parsers that only read the header or a part
+    of a file, or seek back and forth, load only the blocks they touch instead of the whole file.
+    """
+
+    def __init__(
+        self,
+        storage: BaseStorage,
+        filename: str,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_blocks: int = DEFAULT_MAX_BLOCKS,
+        size: Optional[int] = None,
+    ):
+        """
+        :param storage: storage of the file
+        :param filename: key of the file in the storage
+        :param block_size: bytes loaded per range read
+        :param max_blocks: number of blocks kept in memory
+        :param size: size of the file in bytes, read from the storage when not given
+        """
+        super().__init__()
+        self.storage = storage
+        self.filename = filename
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.size = size if size is not None else storage.get_size(filename)
+        self.bytes_loaded = 0
+
+        self._position = 0
+        # block index -> block content, ordered from least to most recently used
+        self._blocks: OrderedDict[int, bytes] = OrderedDict()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+
+        if position < 0:
+            raise ValueError(f"negative seek position {position}")
+        self._position = position
+        return position
+
+    def read(self, size: int = -1, /) -> bytes:
+        # reads never block, so unlike other raw files this never returns None
+        return super().read(size) or b""
+
+    def readinto(self, buffer) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+
+        view = memoryview(buffer).cast("B")
+        length = min(len(view), self.size - self._position)
+        read = 0
+        while read < length:
+            index, offset = divmod(self._position, self.block_size)
+            chunk = self._load_block(index)[offset : offset + length - read]
+            if not chunk:
+                break
+            view[read : read + len(chunk)] = chunk
+            read += len(chunk)
+            self._position += len(chunk)
+        return read
+
+    def close(self) -> None:
+        self._blocks.clear()
+        super().close()
+
+    def _load_block(self, index: int) -> bytes:
+        if index in self._blocks:
+            self._blocks.move_to_end(index)
+            return self._blocks[index]
+
+        start = index * self.block_size
+        block = self.storage.load_range(self.filename, start, min(start + self.block_size, self.size))
+        self.bytes_loaded += len(block)
+        self._blocks[index] = block
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return block
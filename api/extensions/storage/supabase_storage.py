@@ -54,6 +54,17 @@ class SupabaseStorage(BaseStorage):
     def delete(self, filename):
         self.client.storage.from_(self.bucket_name).remove(filename)
 
+    def delete_many(self, filenames: list[str]) -> list[str]:
+        failed = []
+        # files are removed with one request per 1000 paths
+        for i in range(0, len(filenames), 1000):
+            paths = filenames[i : i + 1000]
+            try:
+                self.client.storage.from_(self.bucket_name).remove(paths)
+            except Exception:
+                failed.extend(paths)
+        return failed
+
     def bucket_exists(self):
         buckets = self.client.storage.list_buckets()
         return any(bucket.name == self.bucket_name for bucket in buckets)
@@ -1,6 +1,7 @@
 from collections.abc import Generator
 
 from qcloud_cos import CosConfig, CosS3Client  # type: ignore
+from qcloud_cos.cos_exception import CosClientError, CosServiceError  # type: ignore
 
 from configs import dify_config
 from extensions.storage.base_storage import BaseStorage
@@ -41,3 +42,19 @@ class TencentCosStorage(BaseStorage):
 
     def delete(self, filename):
         self.client.delete_object(Bucket=self.bucket_name, Key=filename)
+
+    def delete_many(self, filenames: list[str]) -> list[str]:
+        failed = []
+        # a delete objects request deletes at most 1000 keys
+        for i in range(0, len(filenames), 1000):
+            keys = filenames[i : i + 1000]
+            try:
+                response = self.client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Object": [{"Key": key} for key in keys], "Quiet": "true"},
+                )
+            except (CosClientError, CosServiceError):
+                failed.extend(keys)
+                continue
+            failed.extend(error["Key"] for error in response.get("Error", []))
+        return failed
@@ -1,5 +1,60 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+
 class InfiniteScrollPagination:
     def __init__(self, data, limit, has_more):
         self.data = data
         self.limit = limit
         self.has_more = has_more
+
+
+def get_keyset_cursor(
+    query: Query, created_at_column: InstrumentedAttribute, id_column: InstrumentedAttribute, row_id: str
+) -> Optional[tuple[datetime, Any]]:
+    """
+    Resolve a row id to its (created_at, id) keyset cursor, without loading the row.
+
+    :param query: base query the row must belong to
+    :param created_at_column: creation time column
+    :param id_column: primary key column
+    :param row_id: row id
+    :return: cursor, or None if the row does not exist in the query
+    """
+    cursor = query.with_entities(created_at_column, id_column).filter(id_column == row_id).first()
+    if not cursor:
+        return None
+
+    return cursor[0], cursor[1]
+
+
+def paginate_by_keyset(
+    query: Query,
+    created_at_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    limit: int,
+    cursor: Optional[tuple[datetime, Any]] = None,
+) -> InfiniteScrollPagination:
+    """
+    Page through a query from newest to oldest by its (created_at, id) keyset.
+
+    Rows created at the same time are ordered by id, so none is skipped across pages.
+    One extra row is fetched to tell whether more pages exist, instead of counting
+    the rest of the rows.
+
+    :param query: base query
+    :param created_at_column: creation time column
+    :param id_column: primary key column
+    :param limit: page size
+    :param cursor: keyset cursor of the last row of the previous page
+    :return: page of rows
+    """
+    if cursor:
+        query = query.filter(tuple_(created_at_column, id_column) < tuple_(literal(cursor[0]), literal(cursor[1])))
+
+    rows = query.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    return InfiniteScrollPagination(data=rows[:limit], limit=limit, has_more=len(rows) > limit)
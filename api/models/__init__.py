@@ -86,6 +86,7 @@ from .workflow import (
     Workflow,
     WorkflowAppLog,
     WorkflowAppLogCreatedFrom,
+    WorkflowGraph,
     WorkflowNodeExecution,
     WorkflowNodeExecutionStatus,
     WorkflowNodeExecutionTriggeredFrom,
@@ -175,6 +176,7 @@ __all__ = [
     "Workflow",
     "WorkflowAppLog",
     "WorkflowAppLogCreatedFrom",
+    "WorkflowGraph",
     "WorkflowNodeExecution",
     "WorkflowNodeExecutionStatus",
     "WorkflowNodeExecutionTriggeredFrom",
@@ -0,0 +1,159 @@
+import copy
+import threading
+from typing import Any, Optional, TypeVar, cast
+
+from cachetools import TTLCache  # type: ignore
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session, make_transient_to_detached, object_session
+from sqlalchemy.orm.util import identity_key
+
+from configs import dify_config
+
+from .engine import db
+
+T = TypeVar("T")
+
+
+class ModelCache:
+    """
+    Cached lookups for rarely changing rows such as apps, sites and tenants.
+
+    Lookups are first resolved against the identity map of the current session, so
+    within a request each row is fetched at most once. When a TTL is configured, column
+    snapshots are also kept in a per-process cache and attached to the session without
+    a query.
+
+    Entries are evicted when a session of this process commits an update or delete of
+    the row, so no other request can cache the row again before the change is committed.
+    Bulk `update()` and `delete()` statements of a model evict all its entries. Rows
+    changed with plain SQL, or by other processes, are picked up once the TTL expires.
+    """
+
+    _SESSION_INFO_KEY = "model_cache_lookups"
+
+    def __init__(self, ttl: int, max_size: int):
+        self._lock = threading.Lock()
+        self._snapshots: Optional[TTLCache] = TTLCache(maxsize=max_size, ttl=ttl) if ttl > 0 else None
+        self._lookup_columns: dict[type, tuple[str, ...]] = {}
+        # rows changed by a session, evicted once it commits
+        self._evictions_info_key = f"model_cache_evictions_{id(self)}"
+        self._session_events_registered = False
+
+    def register(self, model: type, *lookup_columns: str) -> None:
+        """
+        Register a model whose rows may be looked up by id or by the given unique columns.
+        """
+        self._lookup_columns[model] = ("id", *lookup_columns)
+        if self._snapshots is None:
+            return
+
+        event.listen(model, "after_update", self._add_instance_eviction)
+        event.listen(model, "after_delete", self._add_instance_eviction)
+        if not self._session_events_registered:
+            event.listen(Session, "do_orm_execute", self._add_bulk_eviction)
+            event.listen(Session, "after_commit", self._evict)
+            event.listen(Session, "after_rollback", self._discard_evictions)
+            self._session_events_registered = True
+
+    def get(self, model: type[T], column: str, value: Any) -> Optional[T]:
+        """
+        Get the row of `model` whose `column` equals `value`.
+        """
+        if value is None:
+            return None
+
+        session = db.session()
+        lookup_key = (model, column, value)
+        lookups: dict[tuple, Any] = session.info.setdefault(self._SESSION_INFO_KEY, {})
+
+        primary_key = value if column == "id" else lookups.get(lookup_key)
+        if primary_key is not None:
+            instance = session.identity_map.get(identity_key(model, primary_key))
+            if instance is not None:
+                return instance
+
+        snapshot = self._get_snapshot(lookup_key)
+        if snapshot is not None:
+            instance = self._attach(session, model, snapshot)
+        else:
+            instance = session.query(model).filter(getattr(model, column) == value).first()
+            if instance is None:
+                return None
+            self._set_snapshot(lookup_key, instance)
+
+        lookups[lookup_key] = instance.id  # type: ignore[attr-defined]
+        return instance
+
+    def clear(self) -> None:
+        if self._snapshots is not None:
+            with self._lock:
+                self._snapshots.clear()
+
+    def _get_snapshot(self, lookup_key: tuple) -> Optional[dict[str, Any]]:
+        if self._snapshots is None:
+            return None
+
+        with self._lock:
+            return cast(Optional[dict[str, Any]], self._snapshots.get(lookup_key))
+
+    def _set_snapshot(self, lookup_key: tuple, instance: Any) -> None:
+        if self._snapshots is None:
+            return
+
+        snapshot = {attr.key: getattr(instance, attr.key) for attr in inspect(type(instance)).column_attrs}
+        with self._lock:
+            self._snapshots[lookup_key] = snapshot
+
+    def _attach(self, session, model: type[T], snapshot: dict[str, Any]) -> T:
+        existing = session.identity_map.get(identity_key(model, snapshot["id"]))
+        if existing is not None:
+            return cast(T, existing)
+
+        instance = model()
+        for key, value in copy.deepcopy(snapshot).items():
+            setattr(instance, key, value)
+        make_transient_to_detached(instance)
+        session.add(instance)
+        return instance
+
+    def _add_instance_eviction(self, mapper, connection, instance: Any) -> None:
+        # called at flush, the entries are evicted once the change is committed
+        session = object_session(instance)
+        if session is None:
+            return
+
+        model = type(instance)
+        evictions: set[tuple] = session.info.setdefault(self._evictions_info_key, set())
+        evictions.update((model, column, getattr(instance, column)) for column in self._lookup_columns[model])
+
+    def _add_bulk_eviction(self, orm_execute_state: ORMExecuteState) -> None:
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None or mapper.class_ not in self._lookup_columns:
+            return
+
+        # the changed rows are unknown, all entries of the model are evicted
+        evictions: set[tuple] = orm_execute_state.session.info.setdefault(self._evictions_info_key, set())
+        evictions.add((mapper.class_,))
+
+    def _evict(self, session: Session) -> None:
+        evictions: set[tuple] = session.info.pop(self._evictions_info_key, set())
+        if self._snapshots is None or not evictions:
+            return
+
+        bulk_models = {lookup_key[0] for lookup_key in evictions if len(lookup_key) == 1}
+        with self._lock:
+            for lookup_key in evictions:
+                self._snapshots.pop(lookup_key, None)
+            if bulk_models:
+                for lookup_key in list(self._snapshots.keys()):
+                    if lookup_key[0] in bulk_models:
+                        self._snapshots.pop(lookup_key, None)
+
+    def _discard_evictions(self, session: Session) -> None:
+        session.info.pop(self._evictions_info_key, None)
+
+
+model_cache = ModelCache(ttl=dify_config.APP_MODEL_CACHE_TTL, max_size=dify_config.APP_MODEL_CACHE_MAX_SIZE)
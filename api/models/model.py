@@ -1,7 +1,7 @@
 import json
 import re
 import uuid
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from datetime import datetime
 from enum import Enum, StrEnum
 from typing import TYPE_CHECKING, Any, Literal, Optional, cast
@@ -21,6 +21,7 @@ from models.enums import CreatedByRole
 from models.workflow import WorkflowRunStatus
 
 from .account import Account, Tenant
+from .cache import model_cache
 from .engine import db
 from .types import StringUUID
 
@@ -106,13 +107,12 @@ class App(db.Model):  # type: ignore[name-defined]
 
     @property
     def site(self):
-        site = db.session.query(Site).filter(Site.app_id == self.id).first()
-        return site
+        return model_cache.get(Site, "app_id", self.id)
 
     @property
     def app_model_config(self):
         if self.app_model_config_id:
-            return db.session.query(AppModelConfig).filter(AppModelConfig.id == self.app_model_config_id).first()
+            return model_cache.get(AppModelConfig, "id", self.app_model_config_id)
 
         return None
 
@@ -131,8 +131,7 @@ class App(db.Model):  # type: ignore[name-defined]
 
     @property
     def tenant(self):
-        tenant = db.session.query(Tenant).filter(Tenant.id == self.tenant_id).first()
-        return tenant
+        return model_cache.get(Tenant, "id", self.tenant_id)
 
     @property
     def is_agent(self) -> bool:
@@ -254,8 +253,7 @@ class AppModelConfig(db.Model):  # type: ignore[name-defined]
 
     @property
     def app(self):
-        app = db.session.query(App).filter(App.id == self.app_id).first()
-        return app
+        return model_cache.get(App, "id", self.app_id)
 
     @property
     def model_dict(self) -> dict:
@@ -490,8 +488,7 @@ class RecommendedApp(db.Model):  # type: ignore[name-defined]
 
     @property
     def app(self):
-        app = db.session.query(App).filter(App.id == self.app_id).first()
-        return app
+        return model_cache.get(App, "id", self.app_id)
 
 
 class InstalledApp(db.Model):  # type: ignore[name-defined]
@@ -514,13 +511,11 @@ class InstalledApp(db.Model):  # type: ignore[name-defined]
 
     @property
     def app(self):
-        app = db.session.query(App).filter(App.id == self.app_id).first()
-        return app
+        return model_cache.get(App, "id", self.app_id)
 
     @property
     def tenant(self):
-        tenant = db.session.query(Tenant).filter(Tenant.id == self.tenant_id).first()
-        return tenant
+        return model_cache.get(Tenant, "id", self.tenant_id)
 
 
 class Conversation(db.Model):  # type: ignore[name-defined]
@@ -620,9 +615,7 @@ class Conversation(db.Model):  # type: ignore[name-defined]
                 else:
                     model_config["configs"] = override_model_configs
             else:
-                app_model_config = (
-                    db.session.query(AppModelConfig).filter(AppModelConfig.id == self.app_model_config_id).first()
-                )
+                app_model_config = model_cache.get(AppModelConfig, "id", self.app_model_config_id)
                 if app_model_config:
                     model_config = app_model_config.to_dict()
 
@@ -642,8 +635,89 @@ class Conversation(db.Model):  # type: ignore[name-defined]
             else:
                 return ""
 
+    @classmethod
+    def preload_statistics(cls, conversations: Sequence["Conversation"]) -> None:
+        """
+        Load the message, feedback, annotation and workflow run aggregates of a page
+        of conversations with a few GROUP BY queries, instead of per-row queries issued
+        by the aggregate properties when the page is rendered.
+        """
+        conversation_ids = [conversation.id for conversation in conversations]
+        if not conversation_ids:
+            return
+
+        from .workflow import WorkflowRun
+
+        message_counts = dict(
+            db.session.query(Message.conversation_id, func.count(Message.id))
+            .filter(Message.conversation_id.in_(conversation_ids))
+            .group_by(Message.conversation_id)
+            .all()
+        )
+
+        feedback_counts: dict[tuple[str, str, str], int] = {}
+        feedback_rows = (
+            db.session.query(
+                MessageFeedback.conversation_id,
+                MessageFeedback.from_source,
+                MessageFeedback.rating,
+                func.count(MessageFeedback.id),
+            )
+            .filter(MessageFeedback.conversation_id.in_(conversation_ids))
+            .group_by(MessageFeedback.conversation_id, MessageFeedback.from_source, MessageFeedback.rating)
+            .all()
+        )
+        for conversation_id, from_source, rating, count in feedback_rows:
+            feedback_counts[(conversation_id, from_source, rating)] = count
+
+        annotated_ids = {
+            conversation_id
+            for (conversation_id,) in db.session.query(MessageAnnotation.conversation_id)
+            .filter(MessageAnnotation.conversation_id.in_(conversation_ids))
+            .distinct()
+            .all()
+        }
+
+        status_counts: dict[tuple[str, str], int] = {}
+        status_rows = (
+            db.session.query(Message.conversation_id, WorkflowRun.status, func.count(Message.id))
+            .join(WorkflowRun, WorkflowRun.id == Message.workflow_run_id)
+            .filter(Message.conversation_id.in_(conversation_ids))
+            .group_by(Message.conversation_id, WorkflowRun.status)
+            .all()
+        )
+        for conversation_id, status, count in status_rows:
+            status_counts[(conversation_id, status)] = count
+
+        def feedback_stats(conversation_id: str, from_source: str) -> dict[str, int]:
+            return {
+                rating: feedback_counts.get((conversation_id, from_source, rating), 0) for rating in ("like", "dislike")
+            }
+
+        for conversation in conversations:
+            message_count = message_counts.get(conversation.id, 0)
+            conversation._preloaded_statistics = {
+                "message_count": message_count,
+                "annotated": conversation.id in annotated_ids,
+                "user_feedback_stats": feedback_stats(conversation.id, "user"),
+                "admin_feedback_stats": feedback_stats(conversation.id, "admin"),
+                "status_count": {
+                    "success": status_counts.get((conversation.id, WorkflowRunStatus.SUCCEEDED.value), 0),
+                    "failed": status_counts.get((conversation.id, WorkflowRunStatus.FAILED.value), 0),
+                    "partial_success": status_counts.get(
+                        (conversation.id, WorkflowRunStatus.PARTIAL_SUCCESSED.value), 0
+                    ),
+                }
+                if message_count
+                else None,
+            }
+
     @property
     def annotated(self):
+        preloaded_statistics = getattr(self, "_preloaded_statistics", None)
+        if preloaded_statistics is not None:
+            return preloaded_statistics["annotated"]
+
         return db.session.query(MessageAnnotation).filter(MessageAnnotation.conversation_id == self.id).count() > 0
 
     @property
@@ -652,10 +726,18 @@ class Conversation(db.Model):  # type: ignore[name-defined]
 
     @property
     def message_count(self):
+        preloaded_statistics = getattr(self, "_preloaded_statistics", None)
+        if preloaded_statistics is not None:
+            return preloaded_statistics["message_count"]
+
         return db.session.query(Message).filter(Message.conversation_id == self.id).count()
 
     @property
     def user_feedback_stats(self):
+        preloaded_statistics = getattr(self, "_preloaded_statistics", None)
+        if preloaded_statistics is not None:
+            return preloaded_statistics["user_feedback_stats"]
+
         like = (
             db.session.query(MessageFeedback)
             .filter(
@@ -680,6 +762,10 @@ class Conversation(db.Model):  # type: ignore[name-defined]
 
     @property
     def admin_feedback_stats(self):
+        preloaded_statistics = getattr(self, "_preloaded_statistics", None)
+        if preloaded_statistics is not None:
+            return preloaded_statistics["admin_feedback_stats"]
+
         like = (
             db.session.query(MessageFeedback)
             .filter(
@@ -704,6 +790,10 @@ class Conversation(db.Model):  # type: ignore[name-defined]
 
     @property
     def status_count(self):
+        preloaded_statistics = getattr(self, "_preloaded_statistics", None)
+        if preloaded_statistics is not None:
+            return preloaded_statistics["status_count"]
+
         messages = db.session.query(Message).filter(Message.conversation_id == self.id).all()
         status_counts = {
             WorkflowRunStatus.RUNNING: 0,
@@ -733,7 +823,7 @@ class Conversation(db.Model):  # type: ignore[name-defined]
 
     @property
     def app(self):
-        return db.session.query(App).filter(App.id == self.app_id).first()
+        return model_cache.get(App, "id", self.app_id)
 
     @property
     def from_end_user_session_id(self):
@@ -967,11 +1057,9 @@ class Message(db.Model):  # type: ignore[name-defined]
 
     @property
     def app_model_config(self):
-        conversation = db.session.query(Conversation).filter(Conversation.id == self.conversation_id).first()
+        conversation = db.session.get(Conversation, self.conversation_id)
         if conversation:
-            return (
-                db.session.query(AppModelConfig).filter(AppModelConfig.id == conversation.app_model_config_id).first()
-            )
+            return model_cache.get(AppModelConfig, "id", conversation.app_model_config_id)
 
         return None
 
@@ -1006,7 +1094,7 @@ class Message(db.Model):  # type: ignore[name-defined]
         from factories import file_factory
 
         message_files = db.session.query(MessageFile).filter(MessageFile.message_id == self.id).all()
-        current_app = db.session.query(App).filter(App.id == self.app_id).first()
+        current_app = model_cache.get(App, "id", self.app_id)
         if not current_app:
             raise ValueError(f"App {self.app_id} not found")
 
@@ -1731,3 +1819,9 @@ class TraceAppConfig(db.Model):  # type: ignore[name-defined]
             "created_at": str(self.created_at) if self.created_at else None,
             "updated_at": str(self.updated_at) if self.updated_at else None,
         }
+
+
+model_cache.register(App)
+model_cache.register(AppModelConfig)
+model_cache.register(Site, "app_id")
+model_cache.register(Tenant)
@@ -1,12 +1,15 @@
 import json
+import threading
 from collections.abc import Mapping, Sequence
 from datetime import UTC, datetime
 from enum import Enum, StrEnum
-from typing import TYPE_CHECKING, Any, Optional, Union
+from typing import TYPE_CHECKING, Any, Optional, Union, cast
 
 import sqlalchemy as sa
-from sqlalchemy import func
-from sqlalchemy.orm import Mapped, mapped_column
+from cachetools import LRUCache  # type: ignore
+from sqlalchemy import CursorResult, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, Session, mapped_column
 
 import contexts
 from constants import HIDDEN_VALUE
@@ -366,7 +369,8 @@ class WorkflowRun(db.Model):  # type: ignore[name-defined]
         `app-run` for (published) app execution
 
     - version (string) Version
-    - graph (text) Workflow canvas configuration (JSON)
+    - graph (text) `optional` Workflow canvas configuration (JSON), only kept inline for debugging runs
+    - graph_hash (string) `optional` Hash of the shared graph snapshot in `workflow_graphs`
     - inputs (text) Input parameters
     - status (string) Execution status, `running` / `succeeded` / `failed` / `stopped`
     - outputs (text) `optional` Output content
@@ -390,6 +394,7 @@ class WorkflowRun(db.Model):  # type: ignore[name-defined]
         db.PrimaryKeyConstraint("id", name="workflow_run_pkey"),
         db.Index("workflow_run_triggerd_from_idx", "tenant_id", "app_id", "triggered_from"),
         db.Index("workflow_run_tenant_app_sequence_idx", "tenant_id", "app_id", "sequence_number"),
+        db.Index("workflow_run_graph_hash_idx", "graph_hash"),
     )
 
     id: Mapped[str] = mapped_column(StringUUID, server_default=db.text("uuid_generate_v4()"))
@@ -401,6 +406,7 @@ class WorkflowRun(db.Model):  # type: ignore[name-defined]
     triggered_from: Mapped[str] = mapped_column(db.String(255))
     version: Mapped[str] = mapped_column(db.String(255))
     graph: Mapped[Optional[str]] = mapped_column(db.Text)
+    graph_hash: Mapped[Optional[str]] = mapped_column(db.String(64))
     inputs: Mapped[Optional[str]] = mapped_column(db.Text)
     status: Mapped[str] = mapped_column(db.String(255))  # running, succeeded, failed, stopped, partial-succeeded
     outputs: Mapped[Optional[str]] = mapped_column(sa.Text, default="{}")
@@ -428,7 +434,11 @@ class WorkflowRun(db.Model):  # type: ignore[name-defined]
 
     @property
     def graph_dict(self):
-        return json.loads(self.graph) if self.graph else {}
+        graph = self.graph
+        if not graph and self.graph_hash:
+            graph = WorkflowGraph.get_graph(self.graph_hash)
+
+        return json.loads(graph) if graph else {}
 
     @property
     def inputs_dict(self) -> Mapping[str, Any]:
@@ -502,6 +512,86 @@ class WorkflowRun(db.Model):  # type: ignore[name-defined]
         )
 
 
+# graph snapshots never change once written, so they are cached for the lifetime of the process
+_graph_snapshot_cache: LRUCache = LRUCache(maxsize=128)
+_graph_snapshot_cache_lock = threading.Lock()
+
+
+class WorkflowGraph(db.Model):  # type: ignore[name-defined]
+    """
+    Workflow Graph Snapshot
+
+    Graphs of workflow runs are stored once per distinct content and referenced
+    by `WorkflowRun.graph_hash`, instead of being copied into every run. A snapshot
+    is kept as long as a run references it, snapshots left unreferenced when the
+    runs of an app are deleted are deleted with them.
+
+    Attributes:
+
+    - hash (string) Hash of the graph content
+    - graph (text) Workflow canvas configuration (JSON)
+    - created_at (timestamp) Creation time
+    """
+
+    __tablename__ = "workflow_graphs"
+    __table_args__ = (db.PrimaryKeyConstraint("hash", name="workflow_graph_pkey"),)
+
+    hash: Mapped[str] = mapped_column(db.String(64))
+    graph: Mapped[str] = mapped_column(db.Text)
+    created_at: Mapped[datetime] = mapped_column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+
+    @classmethod
+    def save(cls, session: Session, graph: str) -> str:
+        """
+        Save graph snapshot if it does not exist yet
+
+        :param session: database session
+        :param graph: graph JSON
+        :return: hash of the graph snapshot
+        """
+        graph_hash = helper.generate_text_hash(graph)
+        stmt = insert(cls).values(hash=graph_hash, graph=graph).on_conflict_do_nothing(index_elements=["hash"])
+        session.execute(stmt)
+
+        return graph_hash
+
+    @classmethod
+    def get_graph(cls, graph_hash: str) -> Optional[str]:
+        """
+        Get graph JSON of graph snapshot
+
+        :param graph_hash: hash of the graph snapshot
+        :return: graph JSON, or None if the snapshot does not exist
+        """
+        with _graph_snapshot_cache_lock:
+            graph = cast(Optional[str], _graph_snapshot_cache.get(graph_hash))
+        if graph is not None:
+            return graph
+
+        graph = db.session.scalar(sa.select(cls.graph).where(cls.hash == graph_hash))
+        if graph is not None:
+            with _graph_snapshot_cache_lock:
+                _graph_snapshot_cache[graph_hash] = graph
+
+        return graph
+
+    @classmethod
+    def delete_unreferenced(cls, graph_hashes: Sequence[str]) -> int:
+        """
+        Delete graph snapshots that are no longer referenced by any workflow run
+
+        :param graph_hashes: hashes of the snapshots to check, e.g. of deleted runs
+        :return: number of deleted snapshots
+        """
+        if not graph_hashes:
+            return 0
+
+        referenced = sa.select(WorkflowRun.id).where(WorkflowRun.graph_hash == cls.hash).exists()
+        stmt = sa.delete(cls).where(cls.hash.in_(graph_hashes), ~referenced)
+        result = cast(CursorResult, db.session.execute(stmt))
+        return result.rowcount
+
+
 class WorkflowNodeExecutionTriggeredFrom(Enum):
     """
     Workflow Node Execution Triggered From Enum
@@ -1,8 +1,12 @@
 import datetime
+import json
+import logging
 import time
+from typing import Any, Optional
 
 import click
-from werkzeug.exceptions import NotFound
+from sqlalchemy import ARRAY, and_, any_, cast, delete, or_, select
+from sqlalchemy.dialects.postgresql import UUID
 
 import app
 from configs import dify_config
@@ -20,6 +24,24 @@ from models.model import (
 from models.web import SavedMessage
 from services.feature_service import FeatureService
 
+logger = logging.getLogger(__name__)
+
+# tables deleted together with their messages
+MESSAGE_RELATED_MODELS: list[type[Any]] = [
+    MessageFeedback,
+    MessageAnnotation,
+    MessageChain,
+    MessageAgentThought,
+    MessageFile,
+    SavedMessage,
+]
+
+# messages are scanned from the oldest, the last scanned message is kept here so the next run continues
+# after it; a scan cycle is restarted from the oldest message once it is older than a week, so messages of
+# tenants moving to sandbox, or skipped while their plan was stale, are cleaned too
+PROGRESS_CACHE_KEY = "clean_messages:progress"
+PROGRESS_CYCLE_SECONDS = 7 * 24 * 60 * 60
+
 
 @app.celery.task(queue="dataset")
 def clean_messages():
@@ -28,54 +50,109 @@ def clean_messages():
     plan_sandbox_clean_message_day = datetime.datetime.now() - datetime.timedelta(
         days=dify_config.PLAN_SANDBOX_CLEAN_MESSAGE_DAY_SETTING
     )
+    batch_size = dify_config.MESSAGE_CLEAN_BATCH_SIZE
+    tenant_plans: dict[str, str] = {}
+    scanned = deleted = 0
+
+    cycle_started_at, progress = _load_progress()
     while True:
-        try:
-            # Main query with join and filter
-            # FIXME:for mypy no paginate method error
-            messages = (
-                db.session.query(Message)  # type: ignore
-                .filter(Message.created_at < plan_sandbox_clean_message_day)
-                .order_by(Message.created_at.desc())
-                .limit(100)
-                .all()
+        # scan by (created_at, id), so messages created at the same time are neither skipped nor repeated
+        query = select(Message.id, Message.app_id, Message.created_at).where(
+            Message.created_at < plan_sandbox_clean_message_day
+        )
+        if progress:
+            last_created_at, last_id = progress
+            query = query.where(
+                or_(
+                    Message.created_at > last_created_at,
+                    and_(Message.created_at == last_created_at, Message.id > last_id),
+                )
             )
-
-        except NotFound:
-            break
+        messages = db.session.execute(query.order_by(Message.created_at, Message.id).limit(batch_size)).all()
         if not messages:
             break
-        for message in messages:
-            plan_sandbox_clean_message_day = message.created_at
-            app = App.query.filter_by(id=message.app_id).first()
-            features_cache_key = f"features:{app.tenant_id}"
-            plan_cache = redis_client.get(features_cache_key)
-            if plan_cache is None:
-                features = FeatureService.get_features(app.tenant_id)
-                redis_client.setex(features_cache_key, 600, features.billing.subscription.plan)
-                plan = features.billing.subscription.plan
-            else:
-                plan = plan_cache.decode()
-            if plan == "sandbox":
-                # clean related message
-                db.session.query(MessageFeedback).filter(MessageFeedback.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageAnnotation).filter(MessageAnnotation.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageChain).filter(MessageChain.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageAgentThought).filter(MessageAgentThought.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageFile).filter(MessageFile.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(SavedMessage).filter(SavedMessage.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(Message).filter(Message.id == message.id).delete()
-                db.session.commit()
+
+        app_tenants: dict[str, str] = {
+            app.id: app.tenant_id
+            for app in db.session.execute(select(App.id, App.tenant_id).where(App.id.in_({m.app_id for m in messages})))
+        }
+        message_ids = [
+            message.id
+            for message in messages
+            if message.app_id in app_tenants and _get_plan(app_tenants[message.app_id], tenant_plans) == "sandbox"
+        ]
+        if message_ids:
+            _delete_messages(message_ids)
+        db.session.commit()
+
+        scanned += len(messages)
+        deleted += len(message_ids)
+        progress = (messages[-1].created_at, messages[-1].id)
+        _save_progress(cycle_started_at, progress)
+        logger.info(f"Clean messages: scanned {scanned}, deleted {deleted}, reached {progress[0]}")
+
+        if len(messages) < batch_size:
+            break
+        # give way to other transactions between batches
+        time.sleep(dify_config.MESSAGE_CLEAN_BATCH_INTERVAL)
+
     end_at = time.perf_counter()
-    click.echo(click.style("Cleaned messages from db success latency: {}".format(end_at - start_at), fg="green"))
+    click.echo(
+        click.style(
+            "Cleaned {} of {} messages from db success latency: {}".format(deleted, scanned, end_at - start_at),
+            fg="green",
+        )
+    )
+
+
+def _get_plan(tenant_id: str, tenant_plans: dict[str, str]) -> str:
+    if tenant_id in tenant_plans:
+        return tenant_plans[tenant_id]
+
+    features_cache_key = f"features:{tenant_id}"
+    plan_cache = redis_client.get(features_cache_key)
+    if plan_cache is None:
+        features = FeatureService.get_features(tenant_id)
+        redis_client.setex(features_cache_key, 600, features.billing.subscription.plan)
+        plan = features.billing.subscription.plan
+    else:
+        plan = plan_cache.decode()
+    tenant_plans[tenant_id] = plan
+    return plan
+
+
+def _delete_messages(message_ids: list[str]) -> None:
+    """
+    Delete messages and their related records, one statement per table for all messages.
+    """
+    # a single array parameter, instead of one parameter per id
+    ids = any_(cast(message_ids, ARRAY(UUID(as_uuid=False))))
+    for model in MESSAGE_RELATED_MODELS:
+        db.session.execute(delete(model).where(model.message_id == ids))
+    db.session.execute(delete(Message).where(Message.id == ids))
+
+
+def _load_progress() -> tuple[float, Optional[tuple[datetime.datetime, str]]]:
+    """
+    Load the start time of the current scan cycle and the last scanned message of it.
+    A new cycle, starting from the oldest message, is begun when there is none or it is too old.
+    """
+    now = time.time()
+    progress = redis_client.get(PROGRESS_CACHE_KEY)
+    if not progress:
+        return now, None
+    values = json.loads(progress)
+    # progress saved in an older format starts a new cycle as well
+    if len(values) != 3 or now - values[0] >= PROGRESS_CYCLE_SECONDS:
+        return now, None
+    cycle_started_at, created_at, message_id = values
+    return cycle_started_at, (datetime.datetime.fromisoformat(created_at), message_id)
+
+
+def _save_progress(cycle_started_at: float, progress: tuple[datetime.datetime, str]) -> None:
+    created_at, message_id = progress
+    redis_client.setex(
+        PROGRESS_CACHE_KEY,
+        2 * PROGRESS_CYCLE_SECONDS,
+        json.dumps([cycle_started_at, created_at.isoformat(), message_id]),
+    )
@@ -0,0 +1,24 @@
+import time
+
+import click
+
+import app
+from core.helper.quota_ledger import ProviderQuotaLedger
+
+
+@app.celery.task(queue="dataset")
+def reconcile_provider_quota_task():
+    click.echo(click.style("Start reconcile provider quota ledger.", fg="green"))
+    start_at = time.perf_counter()
+    try:
+        reconciled = ProviderQuotaLedger.reconcile()
+    except Exception as e:
+        click.echo(click.style(f"Error: {e}", fg="red"))
+        return
+
+    end_at = time.perf_counter()
+    click.echo(
+        click.style(
+            "Reconciled {} provider quota records latency: {}".format(reconciled, end_at - start_at), fg="green"
+        )
+    )
@@ -11,6 +11,7 @@ from core.app.apps.completion.app_generator import CompletionAppGenerator
 from core.app.apps.workflow.app_generator import WorkflowAppGenerator
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.features.rate_limiting import RateLimit
+from core.errors.error import AppWorkerPoolFullError
 from models.model import Account, App, AppMode, EndUser
 from models.workflow import Workflow
 from services.errors.llm import InvokeRateLimitError
@@ -108,6 +109,9 @@ class AppGenerateService:
                 raise ValueError(f"Invalid app mode {app_model.mode}")
         except RateLimitError as e:
             raise InvokeRateLimitError(str(e))
+        except AppWorkerPoolFullError as e:
+            rate_limit.exit(request_id)
+            raise InvokeRateLimitError(e.description)
         except Exception:
             rate_limit.exit(request_id)
             raise
@@ -1,7 +1,7 @@
 import datetime
 import hashlib
 import uuid
-from typing import Any, Literal, Union
+from typing import IO, Any, Literal, Union
 
 from flask_login import current_user  # type: ignore
 from werkzeug.exceptions import NotFound
@@ -31,7 +31,7 @@ class FileService:
     def upload_file(
         *,
         filename: str,
-        content: bytes,
+        content: Union[bytes, IO[bytes]],
         mimetype: str,
         user: Union[Account, EndUser, Any],
         source: Literal["datasets"] | None = None,
@@ -45,8 +45,12 @@ class FileService:
         if source == "datasets" and extension not in DOCUMENT_EXTENSIONS:
             raise UnsupportedFileTypeError()
 
-        # get file size
-        file_size = len(content)
+        # get file size, file objects are not read into memory
+        if isinstance(content, bytes):
+            file_size = len(content)
+        else:
+            file_size = content.seek(0, 2)
+            content.seek(0)
 
         # check if the file size is exceeded
         if not FileService.is_file_size_within_limit(extension=extension, file_size=file_size):
@@ -64,7 +68,12 @@ class FileService:
         file_key = "upload_files/" + (current_tenant_id or "") + "/" + file_uuid + "." + extension
 
         # save file to storage
-        storage.save(file_key, content)
+        if isinstance(content, bytes):
+            storage.save(file_key, content)
+            file_hash = hashlib.sha3_256(content).hexdigest()
+        else:
+            file_hash = FileService._hash_stream(content)
+            storage.save_stream(file_key, content)
 
         # save file to db
         upload_file = UploadFile(
@@ -79,7 +88,7 @@ class FileService:
             created_by=user.id,
             created_at=datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
             used=False,
-            hash=hashlib.sha3_256(content).hexdigest(),
+            hash=file_hash,
             source_url=source_url,
         )
 
@@ -88,6 +97,17 @@ class FileService:
 
         return upload_file
 
+    @staticmethod
+    def _hash_stream(stream: IO[bytes]) -> str:
+        """
+        Hash the content of a file object in chunks, then rewind it.
+        """
+        file_hash = hashlib.sha3_256()
+        while chunk := stream.read(1024 * 1024):
+            file_hash.update(chunk)
+        stream.seek(0)
+        return file_hash.hexdigest()
+
     @staticmethod
     def is_file_size_within_limit(*, extension: str, file_size: int) -> bool:
         if extension in IMAGE_EXTENSIONS:
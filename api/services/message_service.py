@@ -11,7 +11,7 @@ from core.ops.entities.trace_entity import TraceTaskName
 from core.ops.ops_trace_manager import TraceQueueManager, TraceTask
 from core.ops.utils import measure_time
 from extensions.ext_database import db
-from libs.infinite_scroll_pagination import InfiniteScrollPagination
+from libs.infinite_scroll_pagination import InfiniteScrollPagination, get_keyset_cursor, paginate_by_keyset
 from models.account import Account
 from models.model import App, AppMode, AppModelConfig, EndUser, Message, MessageFeedback
 from services.conversation_service import ConversationService
@@ -46,51 +46,18 @@ class MessageService:
             app_model=app_model, user=user, conversation_id=conversation_id
         )
 
+        base_query = db.session.query(Message).filter(Message.conversation_id == conversation.id)
+
+        cursor = None
         if first_id:
-            first_message = (
-                db.session.query(Message)
-                .filter(Message.conversation_id == conversation.id, Message.id == first_id)
-                .first()
-            )
+            cursor = get_keyset_cursor(base_query, Message.created_at, Message.id, first_id)
 
-            if not first_message:
+            if not cursor:
                 raise FirstMessageNotExistsError()
 
-            history_messages = (
-                db.session.query(Message)
-                .filter(
-                    Message.conversation_id == conversation.id,
-                    Message.created_at < first_message.created_at,
-                    Message.id != first_message.id,
-                )
-                .order_by(Message.created_at.desc())
-                .limit(limit)
-                .all()
-            )
-        else:
-            history_messages = (
-                db.session.query(Message)
-                .filter(Message.conversation_id == conversation.id)
-                .order_by(Message.created_at.desc())
-                .limit(limit)
-                .all()
-            )
-
-        has_more = False
-        if len(history_messages) == limit:
-            current_page_first_message = history_messages[-1]
-            rest_count = (
-                db.session.query(Message)
-                .filter(
-                    Message.conversation_id == conversation.id,
-                    Message.created_at < current_page_first_message.created_at,
-                    Message.id != current_page_first_message.id,
-                )
-                .count()
-            )
-
-            if rest_count > 0:
-                has_more = True
+        pagination = paginate_by_keyset(base_query, Message.created_at, Message.id, limit, cursor)
+        history_messages = pagination.data
+        has_more = pagination.has_more
 
         if order == "asc":
             history_messages = list(reversed(history_messages))
@@ -122,32 +89,14 @@ class MessageService:
         if include_ids is not None:
             base_query = base_query.filter(Message.id.in_(include_ids))
 
+        cursor = None
         if last_id:
-            last_message = base_query.filter(Message.id == last_id).first()
+            cursor = get_keyset_cursor(base_query, Message.created_at, Message.id, last_id)
 
-            if not last_message:
+            if not cursor:
                 raise LastMessageNotExistsError()
 
-            history_messages = (
-                base_query.filter(Message.created_at < last_message.created_at, Message.id != last_message.id)
-                .order_by(Message.created_at.desc())
-                .limit(limit)
-                .all()
-            )
-        else:
-            history_messages = base_query.order_by(Message.created_at.desc()).limit(limit).all()
-
-        has_more = False
-        if len(history_messages) == limit:
-            current_page_first_message = history_messages[-1]
-            rest_count = base_query.filter(
-                Message.created_at < current_page_first_message.created_at, Message.id != current_page_first_message.id
-            ).count()
-
-            if rest_count > 0:
-                has_more = True
-
-        return InfiniteScrollPagination(data=history_messages, limit=limit, has_more=has_more)
+        return paginate_by_keyset(base_query, Message.created_at, Message.id, limit, cursor)
 
     @classmethod
     def create_feedback(
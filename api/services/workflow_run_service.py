@@ -1,7 +1,7 @@
 from typing import Optional
 
 from extensions.ext_database import db
-from libs.infinite_scroll_pagination import InfiniteScrollPagination
+from libs.infinite_scroll_pagination import InfiniteScrollPagination, get_keyset_cursor, paginate_by_keyset
 from models.enums import WorkflowRunTriggeredFrom
 from models.model import App
 from models.workflow import (
@@ -62,37 +62,14 @@ class WorkflowRunService:
             WorkflowRun.triggered_from == WorkflowRunTriggeredFrom.DEBUGGING.value,
         )
 
+        cursor = None
         if args.get("last_id"):
-            last_workflow_run = base_query.filter(
-                WorkflowRun.id == args.get("last_id"),
-            ).first()
+            cursor = get_keyset_cursor(base_query, WorkflowRun.created_at, WorkflowRun.id, args["last_id"])
 
-            if not last_workflow_run:
+            if not cursor:
                 raise ValueError("Last workflow run not exists")
 
-            workflow_runs = (
-                base_query.filter(
-                    WorkflowRun.created_at < last_workflow_run.created_at, WorkflowRun.id != last_workflow_run.id
-                )
-                .order_by(WorkflowRun.created_at.desc())
-                .limit(limit)
-                .all()
-            )
-        else:
-            workflow_runs = base_query.order_by(WorkflowRun.created_at.desc()).limit(limit).all()
-
-        has_more = False
-        if len(workflow_runs) == limit:
-            current_page_first_workflow_run = workflow_runs[-1]
-            rest_count = base_query.filter(
-                WorkflowRun.created_at < current_page_first_workflow_run.created_at,
-                WorkflowRun.id != current_page_first_workflow_run.id,
-            ).count()
-
-            if rest_count > 0:
-                has_more = True
-
-        return InfiniteScrollPagination(data=workflow_runs, limit=limit, has_more=has_more)
+        return paginate_by_keyset(base_query, WorkflowRun.created_at, WorkflowRun.id, limit, cursor)
 
     def get_workflow_run(self, app_model: App, run_id: str) -> Optional[WorkflowRun]:
         """
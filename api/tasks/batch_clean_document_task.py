@@ -4,6 +4,7 @@ import time
 import click
 from celery import shared_task  # type: ignore
 
+from core.rag.extractor.pdf_extractor import PdfExtractor, get_upload_file_cache_key
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from core.tools.utils.web_reader_tool import get_image_upload_file_ids
 from extensions.ext_database import db
@@ -62,6 +63,8 @@ def batch_clean_document_task(document_ids: list[str], dataset_id: str, doc_form
                     storage.delete(file.key)
                 except Exception:
                     logging.exception("Delete file failed when document deleted, file_id: {}".format(file.id))
+                if file.key.lower().endswith(".pdf"):
+                    PdfExtractor.delete_cache(get_upload_file_cache_key(file.tenant_id, file.id))
                 db.session.delete(file)
             db.session.commit()
 
@@ -1,12 +1,20 @@
+import json
 import logging
 import time
+import uuid
+from typing import Optional, cast
 
 import click
 from celery import shared_task  # type: ignore
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
 
+from configs import dify_config
+from core.rag.extractor.pdf_extractor import PdfExtractor, get_upload_file_cache_key
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from core.tools.utils.web_reader_tool import get_image_upload_file_ids
 from extensions.ext_database import db
+from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
 from models.dataset import (
     AppDatasetJoin,
@@ -18,10 +26,13 @@ from models.dataset import (
 )
 from models.model import UploadFile
 
+# progress of a dataset cleaning, kept so a retried task continues where the failed one stopped
+PROGRESS_CACHE_TTL = 24 * 60 * 60
 
-# Add import statement for ValueError
-@shared_task(queue="dataset")
+
+@shared_task(queue="dataset", bind=True, max_retries=3)
 def clean_dataset_task(
+    self,
     dataset_id: str,
     tenant_id: str,
     indexing_technique: str,
@@ -38,12 +49,18 @@ def clean_dataset_task(
     :param collection_binding_id: collection binding id
     :param doc_form: dataset form
 
+    Documents and segments are deleted in batches of `DATASET_CLEAN_BATCH_SIZE`, together with
+    their upload files, and every batch is committed. When a database error interrupts the cleaning,
+    the task is retried and continues with the remaining records.
+
     Usage: clean_dataset_task.delay(dataset_id, tenant_id, indexing_technique, index_struct)
     """
     logging.info(click.style("Start clean dataset when dataset deleted: {}".format(dataset_id), fg="green"))
     start_at = time.perf_counter()
+    progress_cache_key = f"clean_dataset_progress:{dataset_id}"
 
     try:
+        progress = _load_progress(progress_cache_key)
         dataset = Dataset(
             id=dataset_id,
             tenant_id=tenant_id,
@@ -51,69 +68,146 @@ def clean_dataset_task(
             index_struct=index_struct,
             collection_binding_id=collection_binding_id,
         )
-        documents = db.session.query(Document).filter(Document.dataset_id == dataset_id).all()
-        segments = db.session.query(DocumentSegment).filter(DocumentSegment.dataset_id == dataset_id).all()
-
-        if documents is None or len(documents) == 0:
-            logging.info(click.style("No documents found for dataset: {}".format(dataset_id), fg="green"))
-        else:
-            logging.info(click.style("Cleaning documents for dataset: {}".format(dataset_id), fg="green"))
-            # Specify the index type before initializing the index processor
-            if doc_form is None:
-                raise ValueError("Index type must be specified.")
-            index_processor = IndexProcessorFactory(doc_form).init_index_processor()
-            index_processor.clean(dataset, None, with_keywords=True, delete_child_chunks=True)
-
-            for document in documents:
-                db.session.delete(document)
-
-            for segment in segments:
-                image_upload_file_ids = get_image_upload_file_ids(segment.content)
-                for upload_file_id in image_upload_file_ids:
-                    image_file = db.session.query(UploadFile).filter(UploadFile.id == upload_file_id).first()
-                    if image_file is None:
-                        continue
-                    try:
-                        storage.delete(image_file.key)
-                    except Exception:
-                        logging.exception(
-                            "Delete image_files failed when storage deleted, \
-                                          image_upload_file_is: {}".format(upload_file_id)
-                        )
-                    db.session.delete(image_file)
-                db.session.delete(segment)
+
+        if not progress["index_cleaned"]:
+            has_documents = db.session.execute(
+                select(Document.id).where(Document.dataset_id == dataset_id).limit(1)
+            ).first()
+            if not has_documents:
+                logging.info(click.style("No documents found for dataset: {}".format(dataset_id), fg="green"))
+            else:
+                logging.info(click.style("Cleaning documents for dataset: {}".format(dataset_id), fg="green"))
+                # Specify the index type before initializing the index processor
+                if doc_form is None:
+                    raise ValueError("Index type must be specified.")
+                index_processor = IndexProcessorFactory(doc_form).init_index_processor()
+                index_processor.clean(dataset, None, with_keywords=True, delete_child_chunks=True)
+            progress["index_cleaned"] = True
+            _save_progress(progress_cache_key, progress)
+
+        _clean_documents(dataset_id, tenant_id, progress, progress_cache_key)
+        _clean_segments(dataset_id, progress, progress_cache_key)
 
         db.session.query(DatasetProcessRule).filter(DatasetProcessRule.dataset_id == dataset_id).delete()
         db.session.query(DatasetQuery).filter(DatasetQuery.dataset_id == dataset_id).delete()
         db.session.query(AppDatasetJoin).filter(AppDatasetJoin.dataset_id == dataset_id).delete()
-
-        # delete files
-        if documents:
-            for document in documents:
-                try:
-                    if document.data_source_type == "upload_file":
-                        if document.data_source_info:
-                            data_source_info = document.data_source_info_dict
-                            if data_source_info and "upload_file_id" in data_source_info:
-                                file_id = data_source_info["upload_file_id"]
-                                file = (
-                                    db.session.query(UploadFile)
-                                    .filter(UploadFile.tenant_id == document.tenant_id, UploadFile.id == file_id)
-                                    .first()
-                                )
-                                if not file:
-                                    continue
-                                storage.delete(file.key)
-                                db.session.delete(file)
-                except Exception:
-                    continue
-
         db.session.commit()
+        redis_client.delete(progress_cache_key)
+
         end_at = time.perf_counter()
         logging.info(
             click.style(
-                "Cleaned dataset when dataset deleted: {} latency: {}".format(dataset_id, end_at - start_at), fg="green"
+                "Cleaned dataset when dataset deleted: {} documents: {} segments: {} files: {} latency: {}".format(
+                    dataset_id, progress["documents"], progress["segments"], progress["files"], end_at - start_at
+                ),
+                fg="green",
             )
         )
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logging.exception(f"Database error occurred while cleaning dataset {dataset_id}")
+        raise self.retry(exc=e, countdown=60)
     except Exception:
         logging.exception("Cleaned dataset when dataset deleted failed")
+
+
+def _clean_documents(dataset_id: str, tenant_id: str, progress: dict, progress_cache_key: str) -> None:
+    while True:
+        documents = db.session.execute(
+            select(Document.id, Document.data_source_type, Document.data_source_info)
+            .where(Document.dataset_id == dataset_id)
+            .limit(dify_config.DATASET_CLEAN_BATCH_SIZE)
+        ).all()
+        if not documents:
+            break
+
+        upload_file_ids = []
+        for document in documents:
+            if document.data_source_type != "upload_file" or not document.data_source_info:
+                continue
+            try:
+                data_source_info = json.loads(document.data_source_info)
+            except ValueError:
+                continue
+            if isinstance(data_source_info, dict) and "upload_file_id" in data_source_info:
+                upload_file_ids.append(data_source_info["upload_file_id"])
+
+        files = _delete_upload_files(upload_file_ids, tenant_id)
+        db.session.execute(delete(Document).where(Document.id.in_([document.id for document in documents])))
+        db.session.commit()
+
+        progress["documents"] += len(documents)
+        progress["files"] += files
+        _save_progress(progress_cache_key, progress)
+        logging.info(f"Cleaned {progress['documents']} documents of dataset {dataset_id}")
+
+
+def _clean_segments(dataset_id: str, progress: dict, progress_cache_key: str) -> None:
+    while True:
+        segments = db.session.execute(
+            select(DocumentSegment.id, DocumentSegment.content)
+            .where(DocumentSegment.dataset_id == dataset_id)
+            .limit(dify_config.DATASET_CLEAN_BATCH_SIZE)
+        ).all()
+        if not segments:
+            break
+
+        image_upload_file_ids = [
+            upload_file_id for segment in segments for upload_file_id in get_image_upload_file_ids(segment.content)
+        ]
+        files = _delete_upload_files(image_upload_file_ids)
+        db.session.execute(delete(DocumentSegment).where(DocumentSegment.id.in_([segment.id for segment in segments])))
+        db.session.commit()
+
+        progress["segments"] += len(segments)
+        progress["files"] += files
+        _save_progress(progress_cache_key, progress)
+        logging.info(f"Cleaned {progress['segments']} segments of dataset {dataset_id}")
+
+
+def _delete_upload_files(upload_file_ids: list[str], tenant_id: Optional[str] = None) -> int:
+    """
+    Delete upload files from the storage in batch requests, then their records.
+    :return: number of deleted upload files
+    """
+    # ids are parsed from contents, ids that are not uuids would fail the whole query
+    upload_file_ids = list({upload_file_id for upload_file_id in upload_file_ids if _is_uuid(upload_file_id)})
+    if not upload_file_ids:
+        return 0
+
+    query = select(UploadFile.id, UploadFile.key, UploadFile.tenant_id).where(UploadFile.id.in_(upload_file_ids))
+    if tenant_id:
+        query = query.where(UploadFile.tenant_id == tenant_id)
+    upload_files = db.session.execute(query).all()
+    if not upload_files:
+        return 0
+
+    try:
+        # files that failed to be deleted are logged by the storage, their records are deleted anyway
+        storage.delete_many([upload_file.key for upload_file in upload_files])
+    except Exception:
+        logging.exception(f"Delete {len(upload_files)} upload files failed when storage deleted")
+    for upload_file in upload_files:
+        if upload_file.key.lower().endswith(".pdf"):
+            PdfExtractor.delete_cache(get_upload_file_cache_key(upload_file.tenant_id, upload_file.id))
+    db.session.execute(delete(UploadFile).where(UploadFile.id.in_([upload_file.id for upload_file in upload_files])))
+    return len(upload_files)
+
+
+def _is_uuid(value) -> bool:
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+
+def _load_progress(progress_cache_key: str) -> dict:
+    progress = redis_client.get(progress_cache_key)
+    if progress:
+        return cast(dict, json.loads(progress))
+    return {"index_cleaned": False, "documents": 0, "segments": 0, "files": 0}
+
+
+def _save_progress(progress_cache_key: str, progress: dict) -> None:
+    redis_client.setex(progress_cache_key, PROGRESS_CACHE_TTL, json.dumps(progress))
@@ -5,6 +5,7 @@ from typing import Optional
 import click
 from celery import shared_task  # type: ignore
 
+from core.rag.extractor.pdf_extractor import PdfExtractor, get_upload_file_cache_key
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from core.tools.utils.web_reader_tool import get_image_upload_file_ids
 from extensions.ext_database import db
@@ -64,6 +65,8 @@ def clean_document_task(document_id: str, dataset_id: str, doc_form: str, file_i
                     storage.delete(file.key)
                 except Exception:
                     logging.exception("Delete file failed when document deleted, file_id: {}".format(file_id))
+                if file.key.lower().endswith(".pdf"):
+                    PdfExtractor.delete_cache(get_upload_file_cache_key(file.tenant_id, file.id))
                 db.session.delete(file)
                 db.session.commit()
 
@@ -4,7 +4,7 @@ from collections.abc import Callable
 
 import click
 from celery import shared_task  # type: ignore
-from sqlalchemy import delete
+from sqlalchemy import delete, select
 from sqlalchemy.exc import SQLAlchemyError
 
 from extensions.ext_database import db
@@ -30,7 +30,14 @@ from models.model import (
 )
 from models.tools import WorkflowToolProvider
 from models.web import PinnedConversation, SavedMessage
-from models.workflow import ConversationVariable, Workflow, WorkflowAppLog, WorkflowNodeExecution, WorkflowRun
+from models.workflow import (
+    ConversationVariable,
+    Workflow,
+    WorkflowAppLog,
+    WorkflowGraph,
+    WorkflowNodeExecution,
+    WorkflowRun,
+)
 
 
 @shared_task(queue="app_deletion", bind=True, max_retries=3)
@@ -178,6 +185,17 @@ def _delete_app_workflow_runs(tenant_id: str, app_id: str):
     def del_workflow_run(workflow_run_id: str):
         db.session.query(WorkflowRun).filter(WorkflowRun.id == workflow_run_id).delete(synchronize_session=False)
 
+    # graph snapshots may be shared with runs of other apps, only those left unreferenced are deleted
+    graph_hashes = db.session.scalars(
+        select(WorkflowRun.graph_hash)
+        .where(
+            WorkflowRun.tenant_id == tenant_id,
+            WorkflowRun.app_id == app_id,
+            WorkflowRun.graph_hash.isnot(None),
+        )
+        .distinct()
+    ).all()
+
     _delete_records(
         """select id from workflow_runs where tenant_id=:tenant_id and app_id=:app_id limit 1000""",
         {"tenant_id": tenant_id, "app_id": app_id},
@@ -185,6 +203,10 @@ def _delete_app_workflow_runs(tenant_id: str, app_id: str):
         "workflow run",
     )
 
+    deleted = WorkflowGraph.delete_unreferenced([graph_hash for graph_hash in graph_hashes if graph_hash])
+    db.session.commit()
+    logging.info(click.style(f"Deleted {deleted} workflow graph snapshots", fg="green"))
+
 
 def _delete_app_workflow_node_executions(tenant_id: str, app_id: str):
     def del_workflow_node_execution(workflow_node_execution_id: str):
@@ -0,0 +1,145 @@
+"""
+Benchmark of the channel between app runners and task pipelines.
+
+A producer thread publishes text chunks through a workflow queue manager while the consumer listens,
+formats every chunk as a server-sent event and records when it is ready to be written to the socket.
+Reports the chunk-to-socket latency and the CPU time of the process per 1k chunks, for the current
+queue manager and for the previous one, which passed every chunk through `queue.Queue` and read the
+stop flag from Redis for every published and consumed chunk.
+
+Redis is replaced by an in-memory fake answering after `--redis-latency-us`.
+
+Usage: python -m tests.benchmarks.app_queue_benchmark --chunks 10000 --interval-us 100
+"""
+
+import argparse
+import queue
+import statistics
+import threading
+import time
+from unittest.mock import patch
+
+from core.app.apps.base_app_generate_response_converter import AppGenerateResponseConverter
+from core.app.apps.base_app_queue_manager import PublishFrom
+from core.app.apps.workflow.app_queue_manager import WorkflowAppQueueManager
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import QueuePingEvent, QueueStopEvent, QueueTextChunkEvent
+
+
+class FakeRedis:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, key) -> None:
+        self._call()
+
+    def setex(self, key, ttl, value):
+        self._call()
+
+
+class LegacyWorkflowAppQueueManager(WorkflowAppQueueManager):
+    """Queue manager as it was before the channel, kept here as the baseline."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._q = queue.Queue()  # type: ignore[assignment]
+
+    def listen(self):
+        start_time = time.time()
+        last_ping_time: int | float = 0
+        while True:
+            try:
+                message = self._q.get(timeout=1)  # type: ignore[call-arg]
+                if message is None:
+                    break
+                yield message
+            except queue.Empty:
+                continue
+            finally:
+                elapsed_time = time.time() - start_time
+                if self._is_stopped():
+                    self.publish(
+                        QueueStopEvent(stopped_by=QueueStopEvent.StopBy.USER_MANUAL), PublishFrom.TASK_PIPELINE
+                    )
+                if elapsed_time // 10 > last_ping_time:
+                    self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
+                    last_ping_time = elapsed_time // 10
+
+    def publish(self, event, pub_from):
+        self._check_for_sqlalchemy_models(event.model_dump())
+        self._publish(event, pub_from)
+
+    def _is_stopped(self) -> bool:
+        from core.app.apps import base_app_queue_manager
+
+        return base_app_queue_manager.redis_client.get(self._generate_stopped_cache_key(self._task_id)) is not None
+
+
+def run(queue_manager_class: type[WorkflowAppQueueManager], chunks: int, interval: float, redis_latency: float):
+    redis = FakeRedis(redis_latency)
+    with patch("core.app.apps.base_app_queue_manager.redis_client", redis):
+        queue_manager = queue_manager_class(
+            task_id="benchmark", user_id="benchmark", invoke_from=InvokeFrom.SERVICE_API, app_mode="workflow"
+        )
+        published_at = [0.0] * chunks
+        sent_at = [0.0] * chunks
+
+        def produce():
+            for i in range(chunks):
+                published_at[i] = time.perf_counter()
+                queue_manager.publish(QueueTextChunkEvent(text=str(i)), PublishFrom.APPLICATION_MANAGER)
+                if interval:
+                    time.sleep(interval)
+            queue_manager.publish(
+                QueueStopEvent(stopped_by=QueueStopEvent.StopBy.USER_MANUAL), PublishFrom.TASK_PIPELINE
+            )
+
+        redis.calls = 0
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        producer = threading.Thread(target=produce)
+        producer.start()
+        for message in queue_manager.listen():
+            event = message.event
+            if isinstance(event, QueueTextChunkEvent):
+                chunk = {"event": "text_chunk", "data": {"text": event.text}}
+                f"data: {AppGenerateResponseConverter._dump_stream_chunk(chunk)}\n\n"
+                sent_at[int(event.text)] = time.perf_counter()
+        producer.join()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+    latencies = sorted((sent - published) * 1e6 for published, sent in zip(published_at, sent_at))
+    return {
+        "p50_latency_us": statistics.median(latencies),
+        "p99_latency_us": latencies[int(len(latencies) * 0.99) - 1],
+        "max_latency_us": latencies[-1],
+        "cpu_ms_per_1k_chunks": cpu * 1000 / (chunks / 1000),
+        "wall_ms": wall * 1000,
+        "redis_calls": redis.calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=10000, help="chunks published per run")
+    parser.add_argument("--interval-us", type=float, default=100, help="microseconds between published chunks")
+    parser.add_argument("--redis-latency-us", type=float, default=100, help="microseconds per fake redis call")
+    args = parser.parse_args()
+
+    for name, queue_manager_class in (
+        ("queue.Queue (previous)", LegacyWorkflowAppQueueManager),
+        ("channel", WorkflowAppQueueManager),
+    ):
+        result = run(queue_manager_class, args.chunks, args.interval_us / 1e6, args.redis_latency_us / 1e6)
+        print(f"{name}: " + ", ".join(f"{key}={value:.1f}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
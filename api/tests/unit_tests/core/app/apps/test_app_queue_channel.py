@@ -0,0 +1,55 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from core.app.apps.app_queue_channel import AppQueueChannel
+from core.app.apps.base_app_queue_manager import PublishFrom
+from core.app.apps.workflow.app_queue_manager import WorkflowAppQueueManager
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import QueueStopEvent, QueueTextChunkEvent
+
+
+def test_messages_are_taken_in_batches():
+    channel: AppQueueChannel[int] = AppQueueChannel()
+    for i in range(3):
+        channel.put(i)
+
+    assert channel.get_batch(timeout=1) == [0, 1, 2]
+    assert channel.get_batch(timeout=0.01) == []
+
+
+def test_waiting_consumer_is_woken_up():
+    channel: AppQueueChannel[int] = AppQueueChannel()
+    timer = threading.Timer(0.05, channel.put, args=(1,))
+    timer.start()
+
+    assert channel.get_batch(timeout=5) == [1]
+    timer.join()
+
+
+def test_listen_yields_published_messages_until_stopped():
+    redis_client = MagicMock()
+    redis_client.get.return_value = None
+    with patch("core.app.apps.base_app_queue_manager.redis_client", redis_client):
+        queue_manager = WorkflowAppQueueManager(
+            task_id="task", user_id="user", invoke_from=InvokeFrom.SERVICE_API, app_mode="workflow"
+        )
+
+        def publish():
+            for i in range(100):
+                queue_manager.publish(QueueTextChunkEvent(text=str(i)), PublishFrom.APPLICATION_MANAGER)
+            queue_manager.publish(
+                QueueStopEvent(stopped_by=QueueStopEvent.StopBy.USER_MANUAL), PublishFrom.TASK_PIPELINE
+            )
+
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+        assert not queue_manager.is_listen_stopped()
+        events = [message.event for message in queue_manager.listen()]
+        publisher.join()
+
+        assert queue_manager.is_listen_stopped()
+
+        assert [event.text for event in events[:-1]] == [str(i) for i in range(100)]
+        assert isinstance(events[-1], QueueStopEvent)
+        # the stop flag is not read for every chunk
+        assert redis_client.get.call_count < 10
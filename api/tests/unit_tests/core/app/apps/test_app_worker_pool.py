@@ -0,0 +1,113 @@
+import contextvars
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.app.apps.app_worker_pool import AppWorkerPool
+from core.app.apps.base_app_queue_manager import PublishFrom
+from core.errors.error import AppWorkerPoolFullError
+
+request_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_var", default="unset")
+
+
+def test_workers_beyond_queue_size_are_rejected(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.APP_WORKER_POOL_MAX_WORKERS", 1)
+    monkeypatch.setattr("configs.dify_config.APP_WORKER_POOL_MAX_QUEUE_SIZE", 1)
+    pool = AppWorkerPool()
+    release = threading.Event()
+    done = threading.Semaphore(0)
+
+    def worker():
+        release.wait(5)
+        done.release()
+
+    pool.submit(worker, {})
+    pool.submit(worker, {})
+    with pytest.raises(AppWorkerPoolFullError):
+        pool.submit(worker, {})
+
+    release.set()
+    assert done.acquire(timeout=5)
+    assert done.acquire(timeout=5)
+    pool._executor.shutdown(wait=True)
+
+    stats = pool.stats()
+    assert stats["submitted"] == 2
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["running"] == stats["queued"] == 0
+    assert stats["max_queue_wait"] > 0
+
+
+def test_workers_do_not_share_context_variables(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.APP_WORKER_POOL_MAX_WORKERS", 1)
+    pool = AppWorkerPool()
+    values = []
+
+    def worker(value):
+        values.append(request_var.get())
+        request_var.set(value)
+
+    pool.submit(worker, {"value": "first"})
+    pool.submit(worker, {"value": "second"})
+    pool._executor.shutdown(wait=True)
+
+    assert values == ["unset", "unset"]
+
+
+def _queue_behind_blocked_worker(pool: AppWorkerPool, queue_manager, wait: float) -> MagicMock:
+    release = threading.Event()
+    queued_worker = MagicMock()
+
+    pool.submit(lambda: release.wait(5), {})
+    pool.submit(queued_worker, {}, queue_manager)
+    time.sleep(wait)
+    release.set()
+    pool._executor.shutdown(wait=True)
+    return queued_worker
+
+
+def test_workers_queued_past_max_execution_time_are_skipped(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.APP_WORKER_POOL_MAX_WORKERS", 1)
+    monkeypatch.setattr("configs.dify_config.APP_MAX_EXECUTION_TIME", 0.1)
+    pool = AppWorkerPool()
+    queue_manager = MagicMock()
+    queue_manager.is_listen_stopped.return_value = False
+
+    queued_worker = _queue_behind_blocked_worker(pool, queue_manager, wait=0.2)
+
+    queued_worker.assert_not_called()
+    error, pub_from = queue_manager.publish_error.call_args.args
+    assert isinstance(error, AppWorkerPoolFullError)
+    assert pub_from == PublishFrom.TASK_PIPELINE
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 1
+    assert stats["running"] == stats["queued"] == 0
+
+
+def test_workers_of_stopped_listeners_are_skipped(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.APP_WORKER_POOL_MAX_WORKERS", 1)
+    pool = AppWorkerPool()
+    queue_manager = MagicMock()
+    queue_manager.is_listen_stopped.return_value = True
+
+    queued_worker = _queue_behind_blocked_worker(pool, queue_manager, wait=0)
+
+    queued_worker.assert_not_called()
+    queue_manager.publish_error.assert_called_once()
+    assert pool.stats()["rejected"] == 1
+
+
+def test_queued_workers_of_listening_requests_run(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.APP_WORKER_POOL_MAX_WORKERS", 1)
+    pool = AppWorkerPool()
+    queue_manager = MagicMock()
+    queue_manager.is_listen_stopped.return_value = False
+
+    queued_worker = _queue_behind_blocked_worker(pool, queue_manager, wait=0)
+
+    queued_worker.assert_called_once_with()
+    queue_manager.publish_error.assert_not_called()
@@ -0,0 +1,55 @@
+import json
+
+from core.app.apps.base_app_generate_response_converter import AppGenerateResponseConverter
+
+
+def _message(answer: str, message_id: str = "m1") -> dict:
+    return {"event": "message", "message_id": message_id, "id": message_id, "answer": answer}
+
+
+def _text_chunk(text: str) -> dict:
+    return {"event": "text_chunk", "workflow_run_id": "r1", "data": {"text": text, "from_variable_selector": None}}
+
+
+def test_stream_events_are_sent_per_chunk_by_default(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.APP_STREAM_COALESCE_WINDOW_MS", 0)
+    chunks = ["ping", _message("你"), _message("好")]
+
+    events = list(AppGenerateResponseConverter._generate_stream_events(chunks))
+
+    assert events[0] == "event: ping\n\n"
+    assert [json.loads(event.removeprefix("data: ")) for event in events[1:]] == chunks[1:]
+
+
+def test_message_chunks_are_coalesced_in_order(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.APP_STREAM_COALESCE_WINDOW_MS", 1000)
+    monkeypatch.setattr("configs.dify_config.APP_STREAM_COALESCE_MAX_SIZE", 1024)
+    chunks = [
+        _message("Hello"),
+        _message(", "),
+        "ping",
+        _message("world"),
+        _message("!", message_id="m2"),
+        {"event": "message_end", "message_id": "m2"},
+        _text_chunk("a"),
+        _text_chunk("b"),
+    ]
+
+    events = list(AppGenerateResponseConverter._generate_stream_events(chunks))
+
+    assert events[1] == "event: ping\n\n"
+    assert [json.loads(event.removeprefix("data: ")) for event in events[:1] + events[2:]] == [
+        _message("Hello, "),
+        _message("world"),
+        _message("!", message_id="m2"),
+        {"event": "message_end", "message_id": "m2"},
+        _text_chunk("ab"),
+    ]
+
+
+def test_coalesced_chunks_are_sent_at_max_size():
+    chunks = [_message("ab"), _message("cd"), _message("e")]
+
+    coalesced = list(AppGenerateResponseConverter._coalesce_stream_chunks(chunks, window=60, max_size=4))
+
+    assert coalesced == [_message("abcd"), _message("e")]
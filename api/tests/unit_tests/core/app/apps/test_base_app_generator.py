@@ -1,7 +1,12 @@
+import threading
+from unittest.mock import MagicMock
+
 import pytest
 
 from core.app.app_config.entities import VariableEntity, VariableEntityType
 from core.app.apps.base_app_generator import BaseAppGenerator
+from core.app.apps.base_app_queue_manager import PublishFrom
+from core.errors.error import AppWorkerPoolFullError
 
 
 def test_validate_inputs_with_zero():
@@ -50,3 +55,36 @@ def test_validate_input_with_none_for_required_variable():
             )
 
         assert str(exc_info.value) == "test_var is required in input form"
+
+
+@pytest.mark.parametrize(
+    ("stream", "inline_enabled", "inline"),
+    [(False, True, True), (False, False, False), (True, True, False)],
+)
+def test_run_worker(monkeypatch, stream, inline_enabled, inline):
+    monkeypatch.setattr("configs.dify_config.APP_BLOCKING_INLINE_EXECUTION_ENABLED", inline_enabled)
+    threads = []
+    done = threading.Event()
+
+    def worker(value):
+        threads.append((threading.current_thread(), value))
+        done.set()
+
+    BaseAppGenerator._run_worker(worker, kwargs={"value": 1}, stream=stream, queue_manager=MagicMock())
+
+    assert done.wait(5)
+    assert threads[0][1] == 1
+    assert (threads[0][0] is threading.current_thread()) == inline
+
+
+def test_run_worker_reports_rejection_through_queue(monkeypatch):
+    monkeypatch.setattr(
+        "core.app.apps.base_app_generator.app_worker_pool.submit", MagicMock(side_effect=AppWorkerPoolFullError())
+    )
+    queue_manager = MagicMock()
+
+    BaseAppGenerator._run_worker(MagicMock(), kwargs={}, stream=True, queue_manager=queue_manager)
+
+    error, pub_from = queue_manager.publish_error.call_args.args
+    assert isinstance(error, AppWorkerPoolFullError)
+    assert pub_from == PublishFrom.TASK_PIPELINE
@@ -0,0 +1,110 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.helper.quota_ledger import _RESERVE_SCRIPT, _RESTORE_SCRIPT, _SETTLE_SCRIPT, ProviderQuotaLedger
+
+TENANT_ID = "6b0ea5a4-8b52-4bdf-a6a4-3ff5a1cd5e8d"
+LEDGER_KEY = f"provider_quota_ledger:{TENANT_ID}:openai:trial"
+
+
+@pytest.fixture
+def mock_redis(monkeypatch):
+    mock_redis = MagicMock()
+    monkeypatch.setattr("core.helper.quota_ledger.redis_client", mock_redis)
+    return mock_redis
+
+
+@pytest.fixture
+def ledger_enabled(monkeypatch):
+    monkeypatch.setattr("core.helper.quota_ledger.dify_config.HOSTED_QUOTA_LEDGER_ENABLED", True)
+
+
+@patch.object(ProviderQuotaLedger, "_deduct_from_database", return_value=True)
+def test_deduct_writes_to_database_when_disabled(mock_deduct_from_database, mock_redis):
+    assert ProviderQuotaLedger.deduct(TENANT_ID, "openai", "trial", 10)
+
+    mock_deduct_from_database.assert_called_once_with(TENANT_ID, "openai", "trial", 10)
+    mock_redis.eval.assert_not_called()
+
+
+@patch.object(ProviderQuotaLedger, "_load", return_value=True)
+def test_deduct_loads_missing_entry(mock_load, mock_redis, ledger_enabled):
+    mock_redis.eval.side_effect = [-2, 1]
+
+    assert ProviderQuotaLedger.deduct(TENANT_ID, "openai", "trial", 10)
+
+    mock_load.assert_called_once_with(LEDGER_KEY, TENANT_ID, "openai", "trial")
+    assert mock_redis.eval.call_count == 2
+    mock_redis.sadd.assert_called_once_with(ProviderQuotaLedger._DIRTY_KEY, LEDGER_KEY)
+
+
+def test_entries_with_pending_usage_do_not_expire(mock_redis, ledger_enabled):
+    mock_redis.eval.return_value = 1
+
+    assert ProviderQuotaLedger.deduct(TENANT_ID, "openai", "trial", 10)
+
+    # reserving usage removes the expiry, no ttl is passed to refresh it
+    assert mock_redis.eval.call_args.args == (_RESERVE_SCRIPT, 1, LEDGER_KEY, 10)
+    for script in (_RESERVE_SCRIPT, _RESTORE_SCRIPT):
+        assert "PERSIST" in script
+        assert "EXPIRE" not in script
+    # the expiry is only set again once the pending usage is settled
+    assert _SETTLE_SCRIPT.index("'pending')) <= 0") < _SETTLE_SCRIPT.index("EXPIRE")
+
+
+def test_deduct_rejects_exhausted_quota(mock_redis, ledger_enabled):
+    mock_redis.eval.return_value = -1
+
+    assert not ProviderQuotaLedger.deduct(TENANT_ID, "openai", "trial", 10)
+
+    mock_redis.sadd.assert_not_called()
+
+
+@patch("core.helper.quota_ledger.db")
+def test_reconcile_writes_one_batch(mock_db, mock_redis):
+    other_key = f"provider_quota_ledger:{TENANT_ID}:anthropic:paid"
+    mock_redis.spop.side_effect = [[LEDGER_KEY.encode(), other_key.encode()], []]
+    mock_redis.eval.side_effect = [30, 0, 1]
+    mock_db.session.execute.return_value.all.return_value = [
+        MagicMock(tenant_id=TENANT_ID, provider_name="openai", quota_type="trial", quota_used=130, quota_limit=500)
+    ]
+
+    assert ProviderQuotaLedger.reconcile() == 1
+
+    assert mock_db.session.execute.call_count == 2
+    params = mock_db.session.execute.call_args_list[0].args[1]
+    assert params == [
+        {
+            "amount": 30,
+            "tenant_id": TENANT_ID,
+            "provider_name": "openai",
+            "provider_type": "system",
+            "quota_type": "trial",
+        }
+    ]
+    mock_db.session.commit.assert_called_once()
+
+    # the written entry is reloaded from the database, so limit changes are picked up
+    refresh_call = mock_redis.eval.call_args_list[2]
+    assert refresh_call.args[2:] == (LEDGER_KEY, 130, 500)
+
+
+@patch("core.helper.quota_ledger.db")
+def test_reconcile_restores_pending_usage_on_failure(mock_db, mock_redis):
+    mock_redis.spop.side_effect = [[LEDGER_KEY.encode()], []]
+    mock_redis.eval.side_effect = [30, 1]
+    mock_db.session.execute.side_effect = RuntimeError("database is unavailable")
+
+    with pytest.raises(RuntimeError):
+        ProviderQuotaLedger.reconcile()
+
+    mock_db.session.rollback.assert_called_once()
+    restore_call = mock_redis.eval.call_args_list[1]
+    assert restore_call.args == (_RESTORE_SCRIPT, 1, LEDGER_KEY, 30)
+    mock_redis.sadd.assert_called_once_with(ProviderQuotaLedger._DIRTY_KEY, LEDGER_KEY)
+
+
+def test_parse_ledger_key():
+    assert ProviderQuotaLedger._parse_ledger_key(LEDGER_KEY) == (TENANT_ID, "openai", "trial")
+    assert ProviderQuotaLedger._ledger_key(TENANT_ID, "openai", "trial") == LEDGER_KEY
@@ -0,0 +1,38 @@
+from unittest.mock import MagicMock, patch
+
+from cachetools import LRUCache  # type: ignore
+
+from core.helper import token_count_cache
+
+
+def test_long_contents_are_counted_once(monkeypatch):
+    monkeypatch.setattr(token_count_cache, "_token_counts", LRUCache(maxsize=16))
+    monkeypatch.setattr("configs.dify_config.TOKEN_COUNT_CACHE_MIN_LENGTH", 10)
+    count = MagicMock(return_value=3)
+
+    assert token_count_cache.get_num_tokens("gpt2", "a long system prompt", count) == 3
+    assert token_count_cache.get_num_tokens("gpt2", "a long system prompt", count) == 3
+    assert count.call_count == 1
+
+    # counts are not shared between tokenizers, and short contents are not cached
+    token_count_cache.get_num_tokens("other", "a long system prompt", count)
+    token_count_cache.get_num_tokens("gpt2", "short", count)
+    token_count_cache.get_num_tokens("gpt2", "short", count)
+    assert count.call_count == 4
+
+
+def test_counts_are_shared_through_redis(monkeypatch):
+    monkeypatch.setattr(token_count_cache, "_token_counts", LRUCache(maxsize=16))
+    monkeypatch.setattr("configs.dify_config.TOKEN_COUNT_CACHE_MIN_LENGTH", 0)
+    monkeypatch.setattr("configs.dify_config.TOKEN_COUNT_CACHE_REDIS_ENABLED", True)
+    redis_client = MagicMock()
+    redis_client.get.return_value = b"42"
+    count = MagicMock(return_value=3)
+
+    with patch("core.helper.token_count_cache.redis_client", redis_client):
+        assert token_count_cache.get_num_tokens("gpt2", "cached in redis", count) == 42
+        count.assert_not_called()
+
+        redis_client.get.side_effect = ConnectionError()
+        assert token_count_cache.get_num_tokens("gpt2", "redis is down", count) == 3
+        redis_client.setex.assert_called_once()
@@ -0,0 +1,207 @@
+from collections.abc import Generator, Sequence
+from typing import Optional
+
+import pytest
+
+from core.model_runtime.callbacks.base_callback import Callback
+from core.model_runtime.entities.llm_entities import LLMResult, LLMResultChunk, LLMResultChunkDelta, LLMUsage
+from core.model_runtime.entities.message_entities import (
+    AssistantPromptMessage,
+    ImagePromptMessageContent,
+    PromptMessage,
+    PromptMessageTool,
+    TextPromptMessageContent,
+)
+from core.model_runtime.errors.invoke import InvokeError
+from core.model_runtime.model_providers.__base.ai_model import AIModel
+from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.utils.stream_accumulator import ChunkCoalescer, PromptContentBuilder
+
+
+class _MockLargeLanguageModel(LargeLanguageModel):
+    def validate_credentials(self, model: str, credentials: dict) -> None:
+        pass
+
+    @property
+    def _invoke_error_mapping(self):
+        return {}
+
+    def _invoke(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def get_num_tokens(self, *args, **kwargs) -> int:
+        return 0
+
+
+class _RecordingCallback(Callback):
+    def __init__(self, chunk_batch_size: int = 1, calls: Optional[list["_RecordingCallback"]] = None):
+        self.chunk_batch_size = chunk_batch_size
+        self.chunks: list[LLMResultChunk] = []
+        self.calls = calls
+        self.result: Optional[LLMResult] = None
+
+    def on_before_invoke(self, *args, **kwargs) -> None:
+        pass
+
+    def on_new_chunk(
+        self,
+        llm_instance: AIModel,
+        chunk: LLMResultChunk,
+        model: str,
+        credentials: dict,
+        prompt_messages: list[PromptMessage],
+        model_parameters: dict,
+        tools: Optional[list[PromptMessageTool]] = None,
+        stop: Optional[Sequence[str]] = None,
+        stream: bool = True,
+        user: Optional[str] = None,
+    ):
+        self.chunks.append(chunk)
+        if self.calls is not None:
+            self.calls.append(self)
+
+    def on_after_invoke(self, llm_instance: AIModel, result: LLMResult, *args, **kwargs) -> None:
+        self.result = result
+
+    def on_invoke_error(self, *args, **kwargs) -> None:
+        pass
+
+
+def _make_chunk(content: str, usage: Optional[LLMUsage] = None, finish_reason: Optional[str] = None):
+    return LLMResultChunk(
+        model="mock",
+        prompt_messages=[],
+        delta=LLMResultChunkDelta(
+            index=0,
+            message=AssistantPromptMessage(content=content),
+            usage=usage,
+            finish_reason=finish_reason,
+        ),
+    )
+
+
+def _make_stream(count: int) -> Generator[LLMResultChunk, None, None]:
+    for i in range(count):
+        last = i == count - 1
+        yield _make_chunk(
+            f"t{i} ",
+            usage=LLMUsage.empty_usage() if last else None,
+            finish_reason="stop" if last else None,
+        )
+
+
+def _invoke(result: Generator[LLMResultChunk, None, None], callbacks: list[Callback]) -> Generator:
+    llm = _MockLargeLanguageModel()
+    return llm._invoke_result_generator(
+        model="mock",
+        result=result,
+        credentials={},
+        prompt_messages=[],
+        model_parameters={},
+        callbacks=callbacks,
+    )
+
+
+def _consume(count: int, callbacks: list[Callback]) -> list[LLMResultChunk]:
+    return list(_invoke(_make_stream(count), callbacks))
+
+
+def test_prompt_content_builder_joins_text():
+    builder = PromptContentBuilder()
+    for part in ["Hello", "", None, ", ", "world"]:
+        builder.append(part)
+
+    assert builder.build() == "Hello, world"
+
+
+def test_prompt_content_builder_keeps_multimodal_order():
+    image = ImagePromptMessageContent(format="png", mime_type="image/png", url="https://example.com/a.png")
+    builder = PromptContentBuilder()
+    builder.append("before ")
+    builder.append("image")
+    builder.append([image])
+    builder.append("after")
+
+    content = builder.build()
+    assert isinstance(content, list)
+    assert [type(c) for c in content] == [TextPromptMessageContent, ImagePromptMessageContent, TextPromptMessageContent]
+    assert content[0].data == "before image"
+    assert content[2].data == "after"
+
+
+def test_chunk_coalescer_merges_batches():
+    coalescer = ChunkCoalescer(batch_size=3)
+    assert coalescer.push(_make_chunk("a")) is None
+    assert coalescer.push(_make_chunk("b")) is None
+    merged = coalescer.push(_make_chunk("c", usage=LLMUsage.empty_usage(), finish_reason="stop"))
+
+    assert merged is not None
+    assert merged.delta.message.content == "abc"
+    assert merged.delta.usage is not None
+    assert merged.delta.finish_reason == "stop"
+    assert coalescer.flush() is None
+
+
+def test_invoke_result_generator_accumulates_content():
+    callback = _RecordingCallback()
+    chunks = _consume(100, [callback])
+
+    assert len(chunks) == 100
+    assert len(callback.chunks) == 100
+    assert callback.result is not None
+    assert callback.result.message.content == "".join(f"t{i} " for i in range(100))
+
+
+def test_invoke_result_generator_coalesces_opted_in_callbacks():
+    per_chunk_callback = _RecordingCallback()
+    coalesced_callback = _RecordingCallback(chunk_batch_size=16)
+    _consume(100, [per_chunk_callback, coalesced_callback])
+
+    assert len(per_chunk_callback.chunks) == 100
+    # 6 full batches plus the flushed remainder
+    assert len(coalesced_callback.chunks) == 7
+    assert "".join(c.delta.message.content for c in coalesced_callback.chunks) == "".join(f"t{i} " for i in range(100))
+    assert coalesced_callback.chunks[-1].delta.finish_reason == "stop"
+    assert coalesced_callback.result.message.content == per_chunk_callback.result.message.content
+
+
+def test_invoke_result_generator_keeps_callback_order():
+    calls: list[_RecordingCallback] = []
+    coalesced_callback = _RecordingCallback(chunk_batch_size=2, calls=calls)
+    per_chunk_callback = _RecordingCallback(calls=calls)
+    _consume(4, [coalesced_callback, per_chunk_callback])
+
+    assert calls == [per_chunk_callback, coalesced_callback, per_chunk_callback] * 2
+
+
+def test_invoke_result_generator_flushes_when_closed_early():
+    coalesced_callback = _RecordingCallback(chunk_batch_size=16)
+    generator = _invoke(_make_stream(100), [coalesced_callback])
+    for _ in range(6):
+        next(generator)
+    generator.close()
+
+    # the callbacks of the last chunk had not run when the generator was closed
+    assert len(coalesced_callback.chunks) == 1
+    assert coalesced_callback.chunks[0].delta.message.content == "".join(f"t{i} " for i in range(5))
+    assert coalesced_callback.result is None
+
+
+def test_invoke_result_generator_flushes_when_stream_fails():
+    def failing_stream() -> Generator[LLMResultChunk, None, None]:
+        yield from _make_stream(3)
+        raise ValueError("stream failed")
+
+    coalesced_callback = _RecordingCallback(chunk_batch_size=16)
+    with pytest.raises(InvokeError):
+        list(_invoke(failing_stream(), [coalesced_callback]))
+
+    assert len(coalesced_callback.chunks) == 1
+    assert coalesced_callback.chunks[0].delta.message.content == "t0 t1 t2 "
+
+
+def test_invoke_result_generator_per_chunk_overhead(benchmark):
+    callbacks: list[Callback] = [_RecordingCallback(chunk_batch_size=32)]
+    chunks = benchmark(_consume, 2000, callbacks)
+
+    assert len(chunks) == 2000
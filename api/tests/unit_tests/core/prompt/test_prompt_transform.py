@@ -23,6 +23,7 @@ def test__calculate_rest_token():
     provider_mock.provider = "openai"
 
     provider_configuration_mock = MagicMock(spec=ProviderConfiguration)
+    provider_configuration_mock.tenant_id = "tenant"
     provider_configuration_mock.provider = provider_mock
     provider_configuration_mock.model_settings = None
 
@@ -0,0 +1,50 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core.rag.datasource.keyword.jieba import jieba
+from core.rag.datasource.keyword.jieba.jieba import Jieba
+
+TEXTS = [
+    "Dify is an open source platform for building LLM applications.",
+    "Keyword indexing splits documents into segments and extracts keywords.",
+    "Vector stores keep the embeddings of segments.",
+]
+
+
+class _KeywordTableHandler:
+    def extract_keywords(self, text, max_keywords_per_chunk=10):
+        return set(text.rstrip(".").split()[:max_keywords_per_chunk])
+
+
+@pytest.fixture
+def keyword(monkeypatch):
+    monkeypatch.setattr(jieba, "JiebaKeywordTableHandler", _KeywordTableHandler)
+    return Jieba(MagicMock(id="dataset-1"))
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_extract_keywords_list(keyword, monkeypatch, max_workers):
+    monkeypatch.setattr("configs.dify_config.KEYWORD_EXTRACT_MAX_WORKERS", max_workers)
+    monkeypatch.setattr("configs.dify_config.KEYWORD_UPDATE_BATCH_SIZE", 1)
+
+    keywords_list = keyword._extract_keywords_list(TEXTS, [None, ["given"]])
+
+    assert keywords_list[1] == ["given"]
+    assert "Dify" in keywords_list[0]
+    assert "embeddings" in keywords_list[2]
+
+
+def test_segment_keywords_are_updated_in_batches(keyword, monkeypatch):
+    monkeypatch.setattr("configs.dify_config.KEYWORD_UPDATE_BATCH_SIZE", 2)
+    mock_db = MagicMock()
+    monkeypatch.setattr(jieba, "db", mock_db)
+
+    keyword._update_segment_keywords_batch("dataset-1", {"node-1": ["a"], "node-2": ["b"], "node-3": ["c"]})
+
+    assert mock_db.session.execute.call_count == 2
+    assert mock_db.session.commit.call_count == 2
+    statement = mock_db.session.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect())
+    assert str(statement).startswith("UPDATE document_segments SET keywords=CASE document_segments.index_node_id")
+    assert statement.params["index_node_id_1"] == ["node-1", "node-2"]
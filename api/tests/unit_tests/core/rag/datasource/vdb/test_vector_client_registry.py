@@ -0,0 +1,98 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import psycopg2.pool
+import pytest
+
+from core.rag.datasource.vdb.pgvector import pgvector
+from core.rag.datasource.vdb.pgvector.pgvector import PGVectorConfig, PGVectorConnectionPool
+from core.rag.datasource.vdb.vector_client_registry import VectorClientRegistry
+
+
+def test_clients_are_shared_by_config():
+    registry = VectorClientRegistry()
+    create = MagicMock(side_effect=lambda: object())
+
+    first = registry.get("qdrant", {"url": "http://a"}, create)
+    assert registry.get("qdrant", {"url": "http://a"}, create) is first
+    assert registry.get("qdrant", {"url": "http://b"}, create) is not first
+    assert registry.get("chroma", {"url": "http://a"}, create) is not first
+
+    assert create.call_count == 3
+    assert [stats["uses"] for stats in registry.stats()] == [2, 1, 1]
+
+
+def test_unhealthy_clients_are_replaced(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.VECTOR_CLIENT_HEALTH_CHECK_INTERVAL", 10)
+    registry = VectorClientRegistry()
+    healthy = {"value": True}
+    close = MagicMock()
+
+    def get():
+        return registry.get("opensearch", "config", object, health_check=lambda _: healthy["value"], close=close)
+
+    first = get()
+    healthy["value"] = False
+    # checked at most once per interval
+    assert get() is first
+
+    now = time.time()
+    monkeypatch.setattr("core.rag.datasource.vdb.vector_client_registry.time.time", lambda: now + 11)
+    second = get()
+
+    assert second is not first
+    # other threads may still use the replaced client
+    close.assert_not_called()
+    assert registry.stats()[0]["failed_health_checks"] == 0
+
+
+def test_clients_are_not_shared_with_forked_processes(monkeypatch):
+    registry = VectorClientRegistry()
+    close = MagicMock()
+    first = registry.get("pgvector", "config", object, close=close)
+
+    monkeypatch.setattr("core.rag.datasource.vdb.vector_client_registry.os.getpid", lambda: -1)
+
+    assert registry.get("pgvector", "config", object, close=close) is not first
+    close.assert_not_called()
+
+
+@pytest.fixture
+def pg_config():
+    return PGVectorConfig(
+        host="localhost",
+        port=5432,
+        user="postgres",
+        password="password",
+        database="dify",
+        min_connection=1,
+        max_connection=2,
+    )
+
+
+def test_pgvector_pool_waits_for_free_connections(pg_config, monkeypatch):
+    threaded_pool = MagicMock()
+    threaded_pool.getconn.side_effect = lambda: MagicMock(closed=0)
+    monkeypatch.setattr(pgvector.psycopg2.pool, "ThreadedConnectionPool", MagicMock(return_value=threaded_pool))
+    pool = PGVectorConnectionPool(pg_config, timeout=0.1)
+
+    connections = [pool.getconn(), pool.getconn()]
+    assert pool.stats() == {"max_connections": 2, "in_use": 2, "waits": 0}
+    with pytest.raises(psycopg2.pool.PoolError):
+        pool.getconn()
+
+    threading.Timer(0.01, pool.putconn, args=(connections[0],)).start()
+    pool.getconn()
+    assert pool.stats() == {"max_connections": 2, "in_use": 2, "waits": 2}
+
+
+def test_pgvector_pool_replaces_closed_connections(pg_config, monkeypatch):
+    closed, open_ = MagicMock(closed=1), MagicMock(closed=0)
+    threaded_pool = MagicMock()
+    threaded_pool.getconn.side_effect = [closed, open_]
+    monkeypatch.setattr(pgvector.psycopg2.pool, "ThreadedConnectionPool", MagicMock(return_value=threaded_pool))
+    pool = PGVectorConnectionPool(pg_config)
+
+    assert pool.getconn() is open_
+    threaded_pool.putconn.assert_called_once_with(closed, close=True)
@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock
+
+from flask import Flask
+
+from core.rag.datasource.vdb import vector_factory
+from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_factory import Vector
+from core.rag.models.document import Document
+
+
+def _documents(count: int) -> list[Document]:
+    return [Document(page_content=f"text {i}", metadata={"doc_id": f"id-{i}"}) for i in range(count)]
+
+
+def test_filter_duplicate_texts_checks_ids_in_batches(monkeypatch):
+    monkeypatch.setattr(vector_factory, "DUPLICATE_CHECK_BATCH_SIZE", 2)
+    vector_processor = MagicMock(spec=BaseVector)
+    vector_processor.get_existing_ids.side_effect = lambda ids: {id for id in ids if id in {"id-1", "id-4"}}
+    vector = Vector.__new__(Vector)
+    vector._vector_processor = vector_processor
+
+    documents = _documents(5) + [Document(page_content="no id", metadata={})]
+    filtered = vector._filter_duplicate_texts(documents)
+
+    assert [document.page_content for document in filtered] == ["text 0", "text 2", "text 3", "no id"]
+    assert [call.args[0] for call in vector_processor.get_existing_ids.call_args_list] == [
+        ["id-0", "id-1"],
+        ["id-2", "id-3"],
+        ["id-4"],
+    ]
+    vector_processor.text_exists.assert_not_called()
+
+
+def test_get_existing_ids_falls_back_to_text_exists():
+    vector_processor = MagicMock(spec=BaseVector)
+    vector_processor.text_exists.side_effect = lambda id: id == "id-1"
+
+    assert BaseVector.get_existing_ids(vector_processor, ["id-0", "id-1"]) == {"id-1"}
+
+
+def test_documents_are_embedded_and_upserted_in_batches(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.VECTOR_INDEXING_PIPELINE_ENABLED", True)
+    vector_processor = MagicMock(spec=BaseVector)
+    vector_processor.upsert_batch_size = 2
+    embeddings = MagicMock()
+    embeddings.embed_documents.side_effect = lambda texts: [[float(len(text))] for text in texts]
+    vector = Vector.__new__(Vector)
+    vector._vector_processor = vector_processor
+    vector._embeddings = embeddings
+
+    with Flask(__name__).app_context():
+        vector.add_texts(_documents(5))
+
+    assert [len(call.args[0]) for call in embeddings.embed_documents.call_args_list] == [2, 2, 1]
+    vector_processor.create.assert_called_once()
+    assert len(vector_processor.create.call_args.kwargs["texts"]) == 2
+    assert [len(call.args[0]) for call in vector_processor.add_texts.call_args_list] == [2, 1]
+    assert vector_processor.add_texts.call_args_list[-1].args[1] == [[6.0]]
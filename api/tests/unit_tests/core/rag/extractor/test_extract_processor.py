@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock
+
+from core.rag.extractor import extract_processor
+from core.rag.extractor.entity.extract_setting import ExtractSetting
+from core.rag.extractor.extract_processor import ExtractProcessor
+from extensions.storage.base_storage import BaseStorage
+from extensions.storage.remote_file import RemoteFile
+from models.model import UploadFile
+
+
+def test_extract_sample_of_text_file(monkeypatch):
+    content = b"".join(b"line %d\n" % i for i in range(10000))
+    backend = MagicMock(spec=BaseStorage)
+    backend.get_size.return_value = len(content)
+    backend.load_range.side_effect = lambda filename, start, end: content[start:end]
+    mock_storage = MagicMock()
+    mock_storage.open.side_effect = lambda filename: RemoteFile(backend, filename, block_size=64)
+    monkeypatch.setattr(extract_processor, "storage", mock_storage)
+    monkeypatch.setattr("configs.dify_config.ETL_TYPE", "dify")
+
+    upload_file = MagicMock(spec=UploadFile, key="upload_files/1/a.txt", tenant_id="1", id="a")
+    extract_setting = ExtractSetting(
+        datasource_type="upload_file", upload_file=upload_file, document_model="text_model"
+    )
+    documents = ExtractProcessor.extract(extract_setting, max_bytes=100)
+
+    assert documents[0].page_content == "".join(f"line {i}\n" for i in range(13))
+    mock_storage.download.assert_not_called()
+    assert sum(len(content[c.args[1] : c.args[2]]) for c in backend.load_range.call_args_list) <= 128
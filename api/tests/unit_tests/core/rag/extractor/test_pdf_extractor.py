@@ -0,0 +1,107 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.rag.extractor import pdf_extractor
+from core.rag.extractor.pdf_extractor import PdfExtractor
+
+
+def _write_pdf(path, page_count: int) -> None:
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    font_id = 3
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    page_ids = []
+    for page_number in range(page_count):
+        stream = f"BT /F1 12 Tf 72 720 Td (Page {page_number}) Tj ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (content_id, font_id)
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, page_count)
+
+    content = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(content))
+        content += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(content)
+    content += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    content += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    content += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(content)
+
+
+@pytest.fixture
+def pdf_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_extractor, "PAGE_RANGE_SIZE", 2)
+    path = tmp_path / "test.pdf"
+    _write_pdf(path, 5)
+    return str(path)
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_extract_pages_in_order(pdf_file, monkeypatch, max_workers):
+    monkeypatch.setattr("configs.dify_config.PDF_EXTRACT_MAX_WORKERS", max_workers)
+
+    documents = PdfExtractor(pdf_file).extract()
+
+    assert [document.page_content.strip() for document in documents] == [f"Page {i}" for i in range(5)]
+    assert [document.metadata["page"] for document in documents] == list(range(5))
+
+
+@pytest.fixture
+def storage_files(monkeypatch) -> dict[str, bytes]:
+    files: dict[str, bytes] = {}
+
+    def load_once(filename):
+        if filename not in files:
+            raise FileNotFoundError(filename)
+        return files[filename]
+
+    def delete_many(filenames):
+        for filename in filenames:
+            del files[filename]
+        return []
+
+    mock_storage = MagicMock()
+    mock_storage.load_once.side_effect = load_once
+    mock_storage.save.side_effect = files.__setitem__
+    mock_storage.exists.side_effect = files.__contains__
+    mock_storage.delete_many.side_effect = delete_many
+    monkeypatch.setattr(pdf_extractor, "storage", mock_storage)
+    return files
+
+
+def test_page_ranges_are_cached(pdf_file, storage_files, monkeypatch):
+    files = storage_files
+
+    documents = PdfExtractor(pdf_file, file_cache_key="pdf_pages/1").extract()
+    assert sorted(files) == [
+        "pdf_pages/1/pages_0_2.json",
+        "pdf_pages/1/pages_2_4.json",
+        "pdf_pages/1/pages_4_5.json",
+        "pdf_pages/1/ranges.json",
+    ]
+
+    # only the missing range is extracted again
+    del files["pdf_pages/1/pages_2_4.json"]
+    extract_pages = MagicMock(wraps=pdf_extractor._extract_pages)
+    monkeypatch.setattr(pdf_extractor, "_extract_pages", extract_pages)
+
+    assert PdfExtractor(pdf_file, file_cache_key="pdf_pages/1").extract() == documents
+    assert [call.args[1:] for call in extract_pages.call_args_list] == [(2, 4)]
+
+
+def test_delete_cache(pdf_file, storage_files):
+    storage_files["pdf_pages/2/ranges.json"] = b"[]"
+    PdfExtractor(pdf_file, file_cache_key="pdf_pages/1").extract()
+
+    PdfExtractor.delete_cache("pdf_pages/1")
+    # deleting a file that was never cached does nothing
+    PdfExtractor.delete_cache("pdf_pages/3")
+
+    assert list(storage_files) == ["pdf_pages/2/ranges.json"]
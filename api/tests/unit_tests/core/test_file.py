@@ -1,6 +1,12 @@
+import base64
+import io
 import json
+from unittest.mock import MagicMock
 
-from core.file import File, FileTransferMethod, FileType, FileUploadConfig
+from PIL import Image
+
+from core.file import File, FileTransferMethod, FileType, FileUploadConfig, file_manager
+from core.model_runtime.entities import ImagePromptMessageContent
 from models.workflow import Workflow
 
 
@@ -54,3 +60,38 @@ def test_workflow_features_with_image():
         FileTransferMethod.LOCAL_FILE,
     ]
     assert list(file_upload_config.allowed_file_extensions) == []
+
+
+def test_to_prompt_message_content_reuses_encoded_file(monkeypatch):
+    image = Image.new("RGB", (1024, 768))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    load = MagicMock(return_value=output.getvalue())
+    monkeypatch.setattr("core.file.file_manager._download_file_content", load)
+    monkeypatch.setattr("configs.dify_config.MULTIMODAL_SEND_FORMAT", "base64")
+    monkeypatch.setattr("configs.dify_config.MULTIMODAL_IMAGE_DOWNSCALE_ENABLED", True)
+
+    file = File(
+        tenant_id="tenant1",
+        type=FileType.IMAGE,
+        transfer_method=FileTransferMethod.LOCAL_FILE,
+        related_id="test_to_prompt_message_content_reuses_encoded_file",
+        extension=".png",
+        mime_type="image/png",
+        storage_key="storage_key",
+    )
+
+    content = file_manager.to_prompt_message_content(file)
+    assert file_manager.to_prompt_message_content(file).base64_data == content.base64_data
+    assert load.call_count == 1
+
+    # low detail images are downscaled before they are encoded
+    with Image.open(io.BytesIO(base64.b64decode(content.base64_data))) as downscaled:
+        assert downscaled.size == (512, 384)
+
+    high_detail = file_manager.to_prompt_message_content(
+        file, image_detail_config=ImagePromptMessageContent.DETAIL.HIGH
+    )
+    with Image.open(io.BytesIO(base64.b64decode(high_detail.base64_data))) as original:
+        assert original.size == (1024, 768)
+    assert load.call_count == 2
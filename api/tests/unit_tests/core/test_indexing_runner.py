@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+
+from core.indexing_runner import IndexingRunner
+from core.rag.models.document import Document
+
+
+def test_extrapolate_segments_of_whole_file():
+    assert IndexingRunner._extrapolate_segments([100, 200, 300], 1.0) == (3, 3, 3)
+    assert IndexingRunner._extrapolate_segments([], 4.0) == (0, 0, 0)
+
+
+def test_extrapolate_segments_of_sample():
+    estimate, lower, upper = IndexingRunner._extrapolate_segments([500, 480, 520, 500] * 25, 10.0)
+
+    assert estimate == 1000
+    assert 950 < lower < estimate < upper < 1050
+
+    # bounds are wider for segments of varying length
+    _, wide_lower, wide_upper = IndexingRunner._extrapolate_segments([100, 900, 300, 700] * 25, 10.0)
+    assert wide_lower < lower
+    assert wide_upper > upper
+
+
+def test_estimate_tokens_of_sample():
+    embedding_model_instance = MagicMock()
+    embedding_model_instance.get_text_embedding_num_tokens.side_effect = lambda texts: sum(
+        len(text) // 4 for text in texts
+    )
+    documents = [Document(page_content="a" * 400) for _ in range(10)]
+
+    assert IndexingRunner._estimate_tokens(embedding_model_instance, documents, 1000) == 1000
+    assert embedding_model_instance.get_text_embedding_num_tokens.call_args.kwargs["texts"] == ["a" * 400] * 2
+
+
+def test_estimate_tokens_counts_locally_when_provider_fails():
+    embedding_model_instance = MagicMock()
+    embedding_model_instance.get_text_embedding_num_tokens.side_effect = ConnectionError("provider is unavailable")
+    documents = [Document(page_content="hello world")]
+
+    assert IndexingRunner._estimate_tokens(embedding_model_instance, documents, None) == 2
@@ -0,0 +1,48 @@
+import io
+from unittest.mock import patch
+
+from core.tools.tool_file_manager import ToolFileManager
+
+
+def test_create_file_by_raw_saves_binary():
+    content = b"hello world"
+
+    with (
+        patch("core.tools.tool_file_manager.storage") as storage,
+        patch("core.tools.tool_file_manager.db"),
+    ):
+        tool_file = ToolFileManager.create_file_by_raw(
+            user_id="user_id",
+            tenant_id="tenant_id",
+            conversation_id=None,
+            file_binary=content,
+            mimetype="text/plain",
+        )
+
+    storage.save.assert_called_once_with(tool_file.file_key, content)
+    assert tool_file.file_key.startswith("tools/tenant_id/")
+    assert tool_file.size == len(content)
+
+
+def test_create_file_by_stream_saves_stream_from_start():
+    content = b"hello world" * 1024
+    file_stream = io.BytesIO(content)
+    file_stream.seek(len(content))
+
+    with (
+        patch("core.tools.tool_file_manager.storage") as storage,
+        patch("core.tools.tool_file_manager.db"),
+    ):
+        tool_file = ToolFileManager.create_file_by_stream(
+            user_id="user_id",
+            tenant_id="tenant_id",
+            conversation_id=None,
+            file_stream=file_stream,
+            mimetype="application/octet-stream",
+        )
+
+    storage.save.assert_not_called()
+    key, stream = storage.save_stream.call_args.args
+    assert key == tool_file.file_key
+    assert stream.read() == content
+    assert tool_file.size == len(content)
@@ -1,3 +1,6 @@
+import httpx
+import pytest
+
 from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.nodes.http_request import (
     BodyData,
@@ -6,6 +9,7 @@ from core.workflow.nodes.http_request import (
     HttpRequestNodeData,
 )
 from core.workflow.nodes.http_request.entities import HttpRequestNodeTimeout
+from core.workflow.nodes.http_request.exc import ResponseSizeError
 from core.workflow.nodes.http_request.executor import Executor
 
 
@@ -334,3 +338,72 @@ def test_init_params():
     executor = create_executor("key1:value1\n\nkey2:value2\n\n")
     executor._init_params()
     assert executor.params == [("key1", "value1"), ("key2", "value2")]
+
+
+def _get_executor() -> Executor:
+    node_data = HttpRequestNodeData(
+        title="Test Streamed Response",
+        method="get",
+        url="https://api.example.com/file",
+        authorization=HttpRequestNodeAuthorization(type="no-auth"),
+        headers="",
+        params="",
+    )
+    return Executor(
+        node_data=node_data,
+        timeout=HttpRequestNodeTimeout(connect=10, read=30, write=30),
+        variable_pool=VariablePool(system_variables={}, user_inputs={}),
+    )
+
+
+def test_streamed_file_response_is_spilled_to_file(monkeypatch):
+    monkeypatch.setattr(
+        "core.helper.ssrf_proxy.get",
+        lambda *args, **kwargs: httpx.Response(
+            200, headers={"content-type": "image/png"}, content=iter([b"\x89PNG", b"\x00" * 4096])
+        ),
+    )
+
+    response = _get_executor().invoke()
+
+    assert response.is_file
+    assert response.content_file is not None
+    assert response.size == 4100
+    assert response.content == b"\x89PNG" + b"\x00" * 4096
+    response.close()
+
+
+def test_streamed_response_aborts_when_exceeding_size_limit(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.HTTP_REQUEST_NODE_MAX_TEXT_SIZE", 1024 * 1024)
+    read_chunks = []
+
+    def body():
+        for i in range(100):
+            read_chunks.append(i)
+            yield b"a" * 64 * 1024
+
+    monkeypatch.setattr(
+        "core.helper.ssrf_proxy.get",
+        lambda *args, **kwargs: httpx.Response(200, headers={"content-type": "text/plain"}, content=body()),
+    )
+
+    with pytest.raises(ResponseSizeError):
+        _get_executor().invoke()
+
+    # the body is not read past the first chunk over the limit
+    assert len(read_chunks) == 17
+
+
+def test_response_with_too_large_content_length_is_rejected_early(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.HTTP_REQUEST_NODE_MAX_TEXT_SIZE", 1024)
+    monkeypatch.setattr(
+        "core.helper.ssrf_proxy.get",
+        lambda *args, **kwargs: httpx.Response(
+            200,
+            headers={"content-type": "text/plain", "content-length": str(1024 * 1024)},
+            content=iter([b"a" * 100]),
+        ),
+    )
+
+    with pytest.raises(ResponseSizeError):
+        _get_executor().invoke()
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import DateTime, String, create_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from libs.infinite_scroll_pagination import get_keyset_cursor, paginate_by_keyset
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Row(_Base):
+    __tablename__ = "rows"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        start = datetime(2024, 1, 1)
+        # rows 00-04 share one timestamp to exercise the id tie-breaker
+        for i in range(12):
+            session.add(_Row(id=f"{i:02d}", created_at=start + timedelta(seconds=max(i - 4, 0))))
+        session.commit()
+        yield session
+
+
+def test_paginate_by_keyset_walks_all_rows(session):
+    query = session.query(_Row)
+    seen = []
+    cursor = None
+    while True:
+        pagination = paginate_by_keyset(query, _Row.created_at, _Row.id, 5, cursor)
+        seen.extend(row.id for row in pagination.data)
+        if not pagination.has_more:
+            break
+        cursor = get_keyset_cursor(query, _Row.created_at, _Row.id, pagination.data[-1].id)
+
+    assert seen == [f"{i:02d}" for i in reversed(range(12))]
+
+
+def test_paginate_by_keyset_has_more_on_exact_page(session):
+    pagination = paginate_by_keyset(session.query(_Row), _Row.created_at, _Row.id, 12)
+
+    assert len(pagination.data) == 12
+    assert not pagination.has_more
+
+
+def test_get_keyset_cursor_missing_row(session):
+    assert get_keyset_cursor(session.query(_Row), _Row.created_at, _Row.id, "missing") is None
@@ -0,0 +1,115 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy import String, create_engine, event
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from models.cache import ModelCache
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Site(_Base):
+    __tablename__ = "sites"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    app_id: Mapped[str] = mapped_column(String)
+    title: Mapped[str] = mapped_column(String)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(_Site(id="site-1", app_id="app-1", title="first"))
+        session.commit()
+    return engine
+
+
+def _count_selects(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def _use_session(session):
+    return mock.patch("models.cache.db", mock.MagicMock(session=lambda: session))
+
+
+def test_lookups_are_cached_per_session(engine):
+    cache = ModelCache(ttl=0, max_size=16)
+    cache.register(_Site, "app_id")
+    statements = _count_selects(engine)
+
+    with Session(engine) as session, _use_session(session):
+        site = cache.get(_Site, "app_id", "app-1")
+        assert cache.get(_Site, "app_id", "app-1") is site
+        assert cache.get(_Site, "id", "site-1") is site
+        assert cache.get(_Site, "app_id", "missing") is None
+
+    # one lookup for the site, one for the missing app
+    assert len(statements) == 2
+
+
+def test_process_cache_attaches_snapshot_without_query(engine):
+    cache = ModelCache(ttl=60, max_size=16)
+    cache.register(_Site, "app_id")
+
+    with Session(engine) as session, _use_session(session):
+        cache.get(_Site, "app_id", "app-1")
+
+    statements = _count_selects(engine)
+    with Session(engine) as session, _use_session(session):
+        site = cache.get(_Site, "app_id", "app-1")
+        assert site is not None
+        assert site.title == "first"
+        assert site in session
+        assert not session.dirty
+
+    assert statements == []
+
+
+def test_process_cache_is_evicted_on_update(engine):
+    cache = ModelCache(ttl=60, max_size=16)
+    cache.register(_Site, "app_id")
+
+    with Session(engine) as session, _use_session(session):
+        site = cache.get(_Site, "app_id", "app-1")
+        site.title = "second"
+        session.commit()
+
+    with Session(engine) as session, _use_session(session):
+        site = cache.get(_Site, "app_id", "app-1")
+        assert site.title == "second"
+
+
+def test_process_cache_is_evicted_on_commit_only(engine):
+    cache = ModelCache(ttl=60, max_size=16)
+    cache.register(_Site, "app_id")
+
+    with Session(engine) as session, _use_session(session):
+        site = cache.get(_Site, "app_id", "app-1")
+        site.title = "second"
+        session.flush()
+        # the change is not committed yet, other requests still get the committed row
+        assert cache._get_snapshot((_Site, "app_id", "app-1"))["title"] == "first"
+        session.rollback()
+
+    assert cache._get_snapshot((_Site, "app_id", "app-1"))["title"] == "first"
+
+
+def test_process_cache_is_evicted_on_bulk_update(engine):
+    cache = ModelCache(ttl=60, max_size=16)
+    cache.register(_Site, "app_id")
+
+    with Session(engine) as session, _use_session(session):
+        cache.get(_Site, "app_id", "app-1")
+        session.query(_Site).filter(_Site.app_id == "app-1").update({"title": "second"})
+        session.commit()
+
+    with Session(engine) as session, _use_session(session):
+        site = cache.get(_Site, "app_id", "app-1")
+        assert site.title == "second"
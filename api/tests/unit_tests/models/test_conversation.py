@@ -0,0 +1,61 @@
+from unittest import mock
+
+from models.model import Conversation
+
+
+def _query_returning(rows):
+    query = mock.MagicMock()
+    query.filter.return_value = query
+    query.join.return_value = query
+    query.group_by.return_value = query
+    query.distinct.return_value = query
+    query.all.return_value = rows
+    return query
+
+
+def test_preload_statistics_fills_page_aggregates():
+    first = Conversation(id="conversation-1", app_id="app_id", mode="advanced-chat")
+    second = Conversation(id="conversation-2", app_id="app_id", mode="advanced-chat")
+
+    queries = [
+        # message counts
+        _query_returning([("conversation-1", 3)]),
+        # feedback counts
+        _query_returning(
+            [
+                ("conversation-1", "user", "like", 2),
+                ("conversation-1", "admin", "dislike", 1),
+            ]
+        ),
+        # annotated conversations
+        _query_returning([("conversation-1",)]),
+        # workflow run status counts
+        _query_returning([("conversation-1", "succeeded", 2), ("conversation-1", "failed", 1)]),
+    ]
+
+    with mock.patch("models.model.db.session") as session:
+        session.query.side_effect = queries
+        Conversation.preload_statistics([first, second])
+
+        assert session.query.call_count == 4
+
+        assert first.message_count == 3
+        assert first.annotated is True
+        assert first.user_feedback_stats == {"like": 2, "dislike": 0}
+        assert first.admin_feedback_stats == {"like": 0, "dislike": 1}
+        assert first.status_count == {"success": 2, "failed": 1, "partial_success": 0}
+
+        assert second.message_count == 0
+        assert second.annotated is False
+        assert second.user_feedback_stats == {"like": 0, "dislike": 0}
+        assert second.status_count is None
+
+        # reading the aggregates does not issue per-row queries
+        assert session.query.call_count == 4
+
+
+def test_preload_statistics_skips_empty_page():
+    with mock.patch("models.model.db.session") as session:
+        Conversation.preload_statistics([])
+
+        session.query.assert_not_called()
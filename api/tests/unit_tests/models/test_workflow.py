@@ -1,10 +1,12 @@
 from unittest import mock
 from uuid import uuid4
 
+from sqlalchemy.dialects import postgresql
+
 import contexts
 from constants import HIDDEN_VALUE
 from core.variables import FloatVariable, IntegerVariable, SecretVariable, StringVariable
-from models.workflow import Workflow
+from models.workflow import Workflow, WorkflowGraph, WorkflowRun
 
 
 def test_environment_variables():
@@ -137,3 +139,38 @@ def test_to_dict():
         workflow_dict = workflow.to_dict(include_secret=True)
         assert workflow_dict["environment_variables"][0]["value"] == "secret"
         assert workflow_dict["environment_variables"][1]["value"] == "text"
+
+
+def test_workflow_run_graph_dict_resolves_graph_snapshot():
+    session = mock.MagicMock()
+    graph_hash = WorkflowGraph.save(session, '{"nodes": [], "edges": []}')
+
+    # the snapshot is inserted once, later runs with the same graph reuse it
+    statement = session.execute.call_args.args[0]
+    assert "ON CONFLICT (hash) DO NOTHING" in str(statement.compile(dialect=postgresql.dialect()))
+
+    workflow_run = WorkflowRun(graph=None, graph_hash=graph_hash)
+    with mock.patch("models.workflow.db.session") as db_session:
+        db_session.scalar.return_value = '{"nodes": [], "edges": []}'
+
+        assert workflow_run.graph_dict == {"nodes": [], "edges": []}
+        assert workflow_run.graph_dict == {"nodes": [], "edges": []}
+        # snapshots are immutable, so they are only loaded once per process
+        assert db_session.scalar.call_count == 1
+
+    inline_run = WorkflowRun(graph='{"nodes": [{"id": "start"}]}')
+    assert inline_run.graph_dict == {"nodes": [{"id": "start"}]}
+
+
+@mock.patch("models.workflow.db.session")
+def test_delete_unreferenced_graph_snapshots(db_session):
+    assert WorkflowGraph.delete_unreferenced([]) == 0
+    db_session.execute.assert_not_called()
+
+    db_session.execute.return_value.rowcount = 1
+    assert WorkflowGraph.delete_unreferenced(["hash-1", "hash-2"]) == 1
+
+    sql = str(db_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("DELETE FROM workflow_graphs WHERE workflow_graphs.hash IN")
+    assert "NOT (EXISTS (SELECT workflow_runs.id" in sql
+    assert "workflow_runs.graph_hash = workflow_graphs.hash" in sql
@@ -0,0 +1,174 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from extensions.storage.base_storage import BaseStorage
+from extensions.storage.cached_storage import CachedStorage
+
+
+@pytest.fixture
+def backend():
+    files = {"a.png": b"a" * 10, "b.png": b"b" * 10, "c.png": b"c" * 10}
+    backend = MagicMock(spec=BaseStorage)
+    backend.load_once.side_effect = lambda filename: files[filename]
+    return backend
+
+
+def test_load_once_reads_through_cache(backend, tmp_path):
+    storage = CachedStorage(backend, cache_dir=str(tmp_path), max_size=100, max_file_size=100, ttl=60)
+
+    assert storage.load_once("a.png") == b"a" * 10
+    assert storage.load_once("a.png") == b"a" * 10
+    assert b"".join(storage.load_stream("a.png")) == b"a" * 10
+
+    assert backend.load_once.call_count == 1
+    backend.load_stream.assert_not_called()
+    assert storage.stats() == {"hits": 2, "misses": 1, "files": 1, "size": 10}
+
+
+def test_least_recently_used_files_are_evicted(backend, tmp_path):
+    storage = CachedStorage(backend, cache_dir=str(tmp_path), max_size=25, max_file_size=100, ttl=60)
+
+    storage.load_once("a.png")
+    storage.load_once("b.png")
+    storage.load_once("a.png")
+    storage.load_once("c.png")
+
+    assert storage.stats()["size"] == 20
+    backend.load_once.reset_mock()
+    storage.load_once("a.png")
+    storage.load_once("c.png")
+    backend.load_once.assert_not_called()
+    storage.load_once("b.png")
+    backend.load_once.assert_called_once_with("b.png")
+
+
+def test_save_and_delete_invalidate_cache(backend, tmp_path):
+    storage = CachedStorage(backend, cache_dir=str(tmp_path), max_size=100, max_file_size=100, ttl=60)
+
+    storage.load_once("a.png")
+    storage.save("a.png", b"new")
+    storage.load_once("a.png")
+    storage.delete("a.png")
+    storage.load_once("a.png")
+
+    assert backend.load_once.call_count == 3
+    backend.save.assert_called_once_with("a.png", b"new")
+    backend.delete.assert_called_once_with("a.png")
+
+
+def test_cache_is_reused_across_instances(backend, tmp_path):
+    CachedStorage(backend, cache_dir=str(tmp_path), max_size=100, max_file_size=100, ttl=60).load_once("a.png")
+
+    storage = CachedStorage(backend, cache_dir=str(tmp_path), max_size=100, max_file_size=100, ttl=60)
+
+    assert storage.load_once("a.png") == b"a" * 10
+    assert backend.load_once.call_count == 1
+
+
+def test_large_files_are_not_cached(backend, tmp_path):
+    storage = CachedStorage(backend, cache_dir=str(tmp_path), max_size=100, max_file_size=5, ttl=60)
+
+    storage.load_once("a.png")
+    storage.load_once("a.png")
+
+    assert backend.load_once.call_count == 2
+    assert storage.stats()["files"] == 0
+
+
+def test_invalidation_is_shared_through_redis(backend, tmp_path):
+    redis_client = MagicMock()
+    redis_client.get.return_value = None
+    first, second = (
+        CachedStorage(
+            backend,
+            cache_dir=str(tmp_path / name),
+            max_size=100,
+            max_file_size=100,
+            ttl=60,
+            redis_client=redis_client,
+        )
+        for name in ("first", "second")
+    )
+
+    second.load_once("a.png")
+    first.save("a.png", b"new")
+
+    invalidated_at = redis_client.set.call_args.args[1]
+    redis_client.get.return_value = str(invalidated_at)
+    second.load_once("a.png")
+
+    assert backend.load_once.call_count == 2
+
+
+def test_expired_files_are_loaded_again(backend, tmp_path, monkeypatch):
+    storage = CachedStorage(backend, cache_dir=str(tmp_path), max_size=100, max_file_size=100, ttl=60)
+
+    storage.load_once("a.png")
+    now = time.time()
+    monkeypatch.setattr("extensions.storage.cached_storage.time.time", lambda: now + 61)
+    storage.load_once("a.png")
+
+    assert backend.load_once.call_count == 2
+
+
+def test_load_range_uses_cached_file(backend, tmp_path):
+    storage = CachedStorage(backend, cache_dir=str(tmp_path), max_size=100, max_file_size=100, ttl=60)
+
+    storage.load_range("b.png", 0, 2)
+    storage.load_once("b.png")
+
+    assert storage.load_range("b.png", 2, 5) == b"bbb"
+    assert storage.get_size("b.png") == 10
+    backend.load_range.assert_called_once_with("b.png", 0, 2)
+    backend.get_size.assert_not_called()
+
+
+def test_delete_many_invalidates_cache(backend, tmp_path):
+    storage = CachedStorage(backend, cache_dir=str(tmp_path), max_size=100, max_file_size=100, ttl=60)
+    backend.delete_many.return_value = ["b.png"]
+
+    storage.load_once("a.png")
+    storage.load_once("b.png")
+    assert storage.delete_many(["a.png", "b.png"]) == ["b.png"]
+    storage.load_once("a.png")
+
+    backend.delete_many.assert_called_once_with(["a.png", "b.png"])
+    assert backend.load_once.call_count == 3
+    assert storage.stats()["files"] == 1
+
+
+def test_processes_cache_in_their_own_directories(backend, tmp_path, monkeypatch):
+    storage = CachedStorage(backend, cache_dir=str(tmp_path), max_size=15, max_file_size=100, ttl=60)
+    storage.load_once("a.png")
+    parent_dir = storage.cache_dir
+
+    # a forked process starts with an empty cache in its own directory, the size limit applies per process
+    monkeypatch.setattr("extensions.storage.cached_storage.os.getpid", lambda: 999999)
+    monkeypatch.setattr(CachedStorage, "_is_process_alive", staticmethod(lambda pid: True))
+    storage.load_once("b.png")
+
+    assert storage.cache_dir != parent_dir
+    assert storage.cache_dir.name.endswith("-999999")
+    assert storage.stats()["files"] == 1
+    assert storage.stats()["size"] == 10
+    assert len(list(parent_dir.iterdir())) == 1
+    assert backend.load_once.call_count == 2
+
+
+def test_directories_of_stopped_processes_are_removed(backend, tmp_path, monkeypatch):
+    storage = CachedStorage(backend, cache_dir=str(tmp_path), max_size=100, max_file_size=100, ttl=60)
+    stale_dir = tmp_path / storage.cache_dir.name.replace(f"-{storage._pid}", "-999999")
+    stale_dir.mkdir()
+    (stale_dir / "file").write_bytes(b"stale")
+    other_dir = tmp_path / "other-host-999999"
+    other_dir.mkdir()
+
+    monkeypatch.setattr(CachedStorage, "_is_process_alive", staticmethod(lambda pid: False))
+    CachedStorage(backend, cache_dir=str(tmp_path), max_size=100, max_file_size=100, ttl=60)
+
+    assert not stale_dir.exists()
+    # directories of other hosts sharing the cache directory are kept
+    assert other_dir.exists()
+    assert storage.cache_dir.exists()
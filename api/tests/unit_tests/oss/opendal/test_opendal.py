@@ -1,3 +1,4 @@
+import io
 from collections.abc import Generator
 from pathlib import Path
 
@@ -45,6 +46,24 @@ class TestOpenDAL:
         self.storage.save(filename, data)
         assert self.storage.exists(filename)
 
+    def test_save_stream(self):
+        """Test saving data from a file object."""
+        filename = get_example_filename()
+        data = get_example_data() * 1024 * 512
+
+        self.storage.save_stream(filename, io.BytesIO(data))
+        assert self.storage.load_once(filename) == data
+
+    def test_load_range(self):
+        """Test loading part of a file."""
+        filename = get_example_filename()
+        data = b"0123456789"
+
+        self.storage.save(filename, data)
+        assert self.storage.get_size(filename) == 10
+        assert self.storage.load_range(filename, 2, 5) == b"234"
+        assert self.storage.load_range(filename, 8, 20) == b"89"
+
     def test_load_once(self):
         """Test loading data once."""
         filename = get_example_filename()
@@ -0,0 +1,47 @@
+import io
+from unittest.mock import MagicMock
+
+import pytest
+
+from extensions.storage.base_storage import BaseStorage
+from extensions.storage.remote_file import RemoteFile
+
+DATA = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def backend():
+    backend = MagicMock(spec=BaseStorage)
+    backend.get_size.return_value = len(DATA)
+    backend.load_range.side_effect = lambda filename, start, end: DATA[start:end]
+    return backend
+
+
+def test_read_and_seek(backend):
+    file = RemoteFile(backend, "a.csv", block_size=100, max_blocks=4)
+
+    assert file.read(10) == DATA[:10]
+    assert file.seek(-24, io.SEEK_END) == 1000
+    assert file.read() == DATA[1000:]
+    assert file.read(10) == b""
+    file.seek(250)
+    assert file.read(100) == DATA[250:350]
+
+    # only the blocks read are loaded
+    assert file.bytes_loaded == 100 + 24 + 200
+    backend.get_size.assert_called_once_with("a.csv")
+
+
+def test_least_recently_used_blocks_are_dropped(backend):
+    file = RemoteFile(backend, "a.csv", block_size=100, max_blocks=2)
+
+    for position in (0, 100, 0, 200, 0):
+        file.seek(position)
+        file.read(1)
+
+    assert [call.args[1] for call in backend.load_range.call_args_list] == [0, 100, 200]
+
+
+def test_works_with_buffered_readers(backend):
+    with io.BufferedReader(RemoteFile(backend, "a.csv", block_size=100)) as file:
+        assert file.read() == DATA
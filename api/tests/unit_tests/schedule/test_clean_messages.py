@@ -0,0 +1,98 @@
+import datetime
+import importlib
+import json
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+
+@pytest.fixture
+def clean_messages_module(monkeypatch):
+    # the task module registers itself on the celery app of the api, which is not created in unit tests
+    celery = SimpleNamespace(task=lambda **kwargs: lambda func: func)
+    monkeypatch.setitem(sys.modules, "app", SimpleNamespace(celery=celery))
+    monkeypatch.delitem(sys.modules, "schedule.clean_messages", raising=False)
+    yield importlib.import_module("schedule.clean_messages")
+    sys.modules.pop("schedule.clean_messages", None)
+
+
+def _compile(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_clean_messages_deletes_sandbox_messages_after_saved_progress(clean_messages_module):
+    last_created_at = datetime.datetime(2024, 1, 1)
+    messages = [
+        SimpleNamespace(id="message-1", app_id="sandbox-app", created_at=datetime.datetime(2024, 1, 2)),
+        SimpleNamespace(id="message-2", app_id="paid-app", created_at=datetime.datetime(2024, 1, 2)),
+        SimpleNamespace(id="message-3", app_id="deleted-app", created_at=datetime.datetime(2024, 1, 3)),
+    ]
+    statements = []
+
+    def execute(statement):
+        statements.append(statement)
+        if len(statements) == 1:
+            return MagicMock(all=MagicMock(return_value=messages))
+        if len(statements) == 2:
+            return iter(
+                [
+                    SimpleNamespace(id="sandbox-app", tenant_id="sandbox-tenant"),
+                    SimpleNamespace(id="paid-app", tenant_id="paid-tenant"),
+                ]
+            )
+        return MagicMock()
+
+    cycle_started_at = time.time() - 60
+    plans = {b"features:sandbox-tenant": b"sandbox", b"features:paid-tenant": b"professional"}
+    redis_client = MagicMock()
+    redis_client.get.side_effect = lambda key: (
+        json.dumps([cycle_started_at, last_created_at.isoformat(), "message-0"])
+        if key == clean_messages_module.PROGRESS_CACHE_KEY
+        else plans[key.encode()]
+    )
+
+    with (
+        patch.object(clean_messages_module, "db") as db,
+        patch.object(clean_messages_module, "redis_client", redis_client),
+        patch.object(clean_messages_module.dify_config, "MESSAGE_CLEAN_BATCH_SIZE", 10),
+    ):
+        db.session.execute.side_effect = execute
+        clean_messages_module.clean_messages()
+
+    # the scan continues after the saved (created_at, id) position
+    scan, params = _compile(statements[0]), statements[0].compile().params
+    assert "messages.created_at > " in scan
+    assert "messages.id > " in scan
+    assert last_created_at in params.values()
+    assert "message-0" in params.values()
+
+    # only messages of sandbox tenants are deleted, with one statement per table
+    deletes = statements[2:]
+    assert len(deletes) == len(clean_messages_module.MESSAGE_RELATED_MODELS) + 1
+    for statement in deletes:
+        sql = _compile(statement)
+        assert sql.startswith("DELETE FROM")
+        assert "= ANY (CAST(" in sql
+        assert list(statement.compile().params.values()) == [["message-1"]]
+    assert _compile(deletes[-1]).startswith("DELETE FROM messages WHERE messages.id = ANY")
+    db.session.commit.assert_called_once()
+
+    # progress moves to the last scanned message and keeps the start of the cycle
+    key, _, value = redis_client.setex.call_args.args
+    assert key == clean_messages_module.PROGRESS_CACHE_KEY
+    assert json.loads(value) == [cycle_started_at, messages[-1].created_at.isoformat(), "message-3"]
+
+
+def test_load_progress_restarts_expired_cycle(clean_messages_module):
+    cycle_started_at = time.time() - clean_messages_module.PROGRESS_CYCLE_SECONDS - 1
+    redis_client = MagicMock()
+    with patch.object(clean_messages_module, "redis_client", redis_client):
+        redis_client.get.return_value = json.dumps([cycle_started_at, "2024-01-01T00:00:00", "message-0"])
+        new_cycle_started_at, progress = clean_messages_module._load_progress()
+
+    assert progress is None
+    assert new_cycle_started_at > cycle_started_at
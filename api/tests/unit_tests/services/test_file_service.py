@@ -0,0 +1,29 @@
+import hashlib
+import io
+from unittest.mock import MagicMock, patch
+
+from models.account import Account
+from services.file_service import FileService
+
+
+def test_upload_file_streams_file_objects_to_storage():
+    content = b"hello world" * 1024
+    user = MagicMock(spec=Account, id="account_id", current_tenant_id="tenant_id")
+
+    with (
+        patch("services.file_service.storage") as storage,
+        patch("services.file_service.db"),
+    ):
+        upload_file = FileService.upload_file(
+            filename="test.txt",
+            content=io.BytesIO(content),
+            mimetype="text/plain",
+            user=user,
+        )
+
+    storage.save.assert_not_called()
+    key, stream = storage.save_stream.call_args.args
+    assert key == upload_file.key
+    assert stream.read() == content
+    assert upload_file.size == len(content)
+    assert upload_file.hash == hashlib.sha3_256(content).hexdigest()
@@ -0,0 +1,121 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from tasks import clean_dataset_task as task_module
+
+PROGRESS_CACHE_KEY = "clean_dataset_progress:dataset-1"
+
+
+def _new_progress() -> dict:
+    return {"index_cleaned": False, "documents": 0, "segments": 0, "files": 0}
+
+
+def _mock_execute(batches: list[list]):
+    """
+    Return the batches for select statements in turn, then no rows.
+    """
+    statements = []
+    remaining = iter(batches)
+
+    def execute(statement):
+        statements.append(statement)
+        if statement.is_select:
+            return MagicMock(all=MagicMock(return_value=next(remaining, [])))
+        return MagicMock()
+
+    return execute, statements
+
+
+@pytest.fixture
+def batch_size(monkeypatch):
+    monkeypatch.setattr("configs.dify_config.DATASET_CLEAN_BATCH_SIZE", 2)
+    return 2
+
+
+def test_clean_documents_in_batches(batch_size):
+    batches = [
+        [
+            SimpleNamespace(
+                id="document-1",
+                data_source_type="upload_file",
+                data_source_info=json.dumps({"upload_file_id": "file-1"}),
+            ),
+            SimpleNamespace(id="document-2", data_source_type="notion_import", data_source_info="{}"),
+        ],
+        [SimpleNamespace(id="document-3", data_source_type="upload_file", data_source_info="not json")],
+    ]
+    execute, statements = _mock_execute(batches)
+    progress = _new_progress()
+
+    with (
+        patch.object(task_module, "db") as db,
+        patch.object(task_module, "redis_client", MagicMock()) as redis_client,
+        patch.object(task_module, "_delete_upload_files", side_effect=lambda ids, tenant_id: len(ids)) as delete_files,
+    ):
+        db.session.execute.side_effect = execute
+        task_module._clean_documents("dataset-1", "tenant-1", progress, PROGRESS_CACHE_KEY)
+
+    assert progress == {"index_cleaned": False, "documents": 3, "segments": 0, "files": 1}
+    # every batch is committed and its progress saved before the next one is selected
+    assert db.session.commit.call_count == len(batches)
+    assert [json.loads(call.args[2])["documents"] for call in redis_client.setex.call_args_list] == [2, 3]
+    assert [call.args for call in delete_files.call_args_list] == [(["file-1"], "tenant-1"), ([], "tenant-1")]
+
+    selects = [statement for statement in statements if statement.is_select]
+    assert len(selects) == len(batches) + 1
+    assert selects[0].compile(dialect=postgresql.dialect()).params["param_1"] == batch_size
+
+
+def test_clean_segments_in_batches(batch_size):
+    batches = [
+        [SimpleNamespace(id="segment-1", content="image-1"), SimpleNamespace(id="segment-2", content="")],
+        [SimpleNamespace(id="segment-3", content="image-2 image-3")],
+    ]
+    execute, _ = _mock_execute(batches)
+    progress = {"index_cleaned": True, "documents": 3, "segments": 0, "files": 1}
+
+    with (
+        patch.object(task_module, "db") as db,
+        patch.object(task_module, "redis_client", MagicMock()) as redis_client,
+        patch.object(task_module, "get_image_upload_file_ids", side_effect=lambda content: content.split()),
+        patch.object(task_module, "_delete_upload_files", side_effect=lambda ids: len(ids)) as delete_files,
+    ):
+        db.session.execute.side_effect = execute
+        task_module._clean_segments("dataset-1", progress, PROGRESS_CACHE_KEY)
+
+    assert progress == {"index_cleaned": True, "documents": 3, "segments": 3, "files": 4}
+    assert db.session.commit.call_count == len(batches)
+    assert [json.loads(call.args[2])["segments"] for call in redis_client.setex.call_args_list] == [2, 3]
+    assert [call.args for call in delete_files.call_args_list] == [(["image-1"],), (["image-2", "image-3"],)]
+
+
+def test_clean_dataset_resumes_from_saved_progress(batch_size):
+    saved_progress = {"index_cleaned": True, "documents": 4, "segments": 0, "files": 2}
+    batches = [[SimpleNamespace(id="document-5", data_source_type="notion_import", data_source_info="{}")]]
+    execute, statements = _mock_execute(batches)
+
+    with (
+        patch.object(task_module, "db") as db,
+        patch.object(task_module, "redis_client", MagicMock()) as redis_client,
+        patch.object(task_module, "IndexProcessorFactory") as index_processor_factory,
+    ):
+        db.session.execute.side_effect = execute
+        redis_client.get.return_value = json.dumps(saved_progress)
+        task_module.clean_dataset_task("dataset-1", "tenant-1", "high_quality", "{}", "binding-1", "text_model")
+
+    # the index was already cleaned by the failed run, only the remaining documents are deleted
+    index_processor_factory.assert_not_called()
+    saved = [json.loads(call.args[2]) for call in redis_client.setex.call_args_list]
+    assert saved == [{"index_cleaned": True, "documents": 5, "segments": 0, "files": 2}]
+    assert len([statement for statement in statements if statement.is_select]) == 3
+    redis_client.delete.assert_called_once_with(PROGRESS_CACHE_KEY)
+
+
+def test_load_progress_of_new_cleaning():
+    with patch.object(task_module, "redis_client", MagicMock()) as redis_client:
+        redis_client.get.return_value = None
+        assert task_module._load_progress(PROGRESS_CACHE_KEY) == _new_progress()